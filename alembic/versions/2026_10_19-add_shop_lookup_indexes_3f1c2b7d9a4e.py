@@ -0,0 +1,26 @@
+"""add_shop_lookup_indexes
+
+Revision ID: 3f1c2b7d9a4e
+Revises: af8df38b63e8
+Create Date: 2026-10-19 17:20:11.412305
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "3f1c2b7d9a4e"
+down_revision = "af8df38b63e8"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_shops_city_id", "shops", ["city_id"], unique=False)
+    # Serves the case insensitive lookup of coffee shops by city name
+    op.create_index("idx_cities_lower_name", "cities", [sa.text("lower(name)")], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("idx_cities_lower_name", table_name="cities")
+    op.drop_index("ix_shops_city_id", table_name="shops")
@@ -0,0 +1,114 @@
+"""Cost of the coffee shop objects built while answering one location message.
+
+A request for a city without cached results builds the shops from database rows, stores them in Redis, reads them
+back and ranks them by distance. The same hops are run with the pydantic model the shops used to be, and with the
+slotted dataclass used now. Distances are precomputed, so only the object handling is measured.
+
+    python benchmarks/coffee_shops.py --shops 5000 --runs 20
+"""
+import random
+import statistics
+import time
+import tracemalloc
+import typing as t
+from argparse import ArgumentParser
+from collections import abc, namedtuple
+from operator import attrgetter
+
+from pydantic import AnyHttpUrl, BaseModel, ConfigDict, Field
+
+from brew_scout.libs.domains.shops import CoffeeShop
+from brew_scout.libs.services.kv import KVService
+
+
+Row = namedtuple("Row", ["id", "name", "web_url", "latitude", "longitude"])
+
+
+class PydanticCoffeeShop(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    name: str
+    latitude: float
+    longitude: float
+    web_url: AnyHttpUrl
+    distance: float | None = Field(default=None)
+
+
+def make_rows(count: int) -> list[Row]:
+    return [
+        Row(
+            id=i,
+            name=f"Coffee shop {i}",
+            web_url=f"https://coffee-{i}.example.com",
+            latitude=random.uniform(51.3, 51.7),
+            longitude=random.uniform(-0.5, 0.3),
+        )
+        for i in range(count)
+    ]
+
+
+def to_members(shops: abc.Iterable[t.Any]) -> list[tuple[str, float]]:
+    return [(f"{cs.name}:{cs.latitude}:{cs.longitude}:{cs.web_url}", 0.0) for cs in shops]
+
+
+def run_pydantic(rows: abc.Sequence[Row], distances: abc.Sequence[float]) -> list[PydanticCoffeeShop]:
+    shops = [PydanticCoffeeShop.model_validate(row) for row in rows]
+    cached = [
+        PydanticCoffeeShop.model_validate({"name": name, "latitude": latitude, "longitude": longitude, "web_url": url})
+        for member, _ in to_members(shops)
+        for name, latitude, longitude, url in [member.split(":", 3)]
+    ]
+    ranked = []
+
+    for cs, distance in zip(cached, distances):
+        cs.distance = distance
+        ranked.append(cs.model_dump())
+
+    return [PydanticCoffeeShop(**data) for data in sorted(ranked, key=lambda data: data["distance"])]
+
+
+def run_dataclass(rows: abc.Sequence[Row], distances: abc.Sequence[float]) -> list[CoffeeShop]:
+    shops = [CoffeeShop.from_row(row) for row in rows]
+    cached = KVService._parse_zscan_result(to_members(shops))
+    ranked = [
+        CoffeeShop(cs.name, cs.latitude, cs.longitude, cs.web_url, distance) for cs, distance in zip(cached, distances)
+    ]
+
+    return sorted(ranked, key=attrgetter("distance"))
+
+
+def measure(func: abc.Callable[..., t.Any], runs: int, *args: t.Any) -> tuple[list[float], int]:
+    timings = []
+
+    for _ in range(runs):
+        started_at = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - started_at)
+
+    tracemalloc.start()
+    func(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return timings, peak
+
+
+def main() -> None:
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument("--shops", type=int, default=5000)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    rows = make_rows(args.shops)
+    distances = [random.uniform(0, 30) for _ in rows]
+
+    for name, func in (("pydantic", run_pydantic), ("dataclass", run_dataclass)):
+        timings, peak = measure(func, args.runs, rows, distances)
+        print(
+            f"{name:<10} median {statistics.median(timings) * 1000:8.2f} ms"
+            f"   min {min(timings) * 1000:8.2f} ms   peak memory {peak / 1024:8.1f} KiB"
+        )
+
+
+if __name__ == "__main__":
+    main()
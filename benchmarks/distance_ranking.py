@@ -0,0 +1,82 @@
+"""Event loop stalls while a big city is ranked by distance.
+
+A ticker measures how late the event loop wakes it up while several location messages for the same city are ranked
+concurrently. The geodesic distances are measured inline on the loop, and in the process pool the city coordinates
+are shared with the workers through shared memory.
+
+    python benchmarks/distance_ranking.py --shops 2000 --requests 8 --workers 2
+"""
+import asyncio
+import random
+import time
+from argparse import ArgumentParser
+
+from brew_scout.libs.domains.shops import CoffeeShop
+from brew_scout.libs.services.geo.client import GeoClient
+from brew_scout.libs.services.geo.ranking import DistanceRanker
+from brew_scout.libs.services.geo.service import GeoService
+
+
+TICK = 0.005
+
+
+def make_shops(count: int) -> list[CoffeeShop]:
+    return [
+        CoffeeShop(
+            name=f"Coffee shop {i}",
+            latitude=random.uniform(51.3, 51.7),
+            longitude=random.uniform(-0.5, 0.3),
+            web_url=f"https://coffee-{i}.example.com",
+        )
+        for i in range(count)
+    ]
+
+
+async def tick(delays: list[float], stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        started_at = time.perf_counter()
+        await asyncio.sleep(TICK)
+        delays.append(time.perf_counter() - started_at - TICK)
+
+
+async def run(service: GeoService, shops: list[CoffeeShop], requests: int) -> tuple[float, float]:
+    delays: list[float] = []
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(tick(delays, stop))
+    started_at = time.perf_counter()
+
+    await asyncio.gather(
+        *(
+            service.find_nearest_coffee_shops(random.uniform(51.3, 51.7), random.uniform(-0.5, 0.3), shops)
+            for _ in range(requests)
+        )
+    )
+    elapsed = time.perf_counter() - started_at
+    stop.set()
+    await ticker
+
+    return elapsed, max(delays, default=0.0)
+
+
+async def main() -> None:
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument("--shops", type=int, default=2000)
+    parser.add_argument("--requests", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args()
+
+    shops = make_shops(args.shops)
+    rankers = (("inline", DistanceRanker()), ("pool", DistanceRanker(max_workers=args.workers, threshold=1)))
+
+    for name, ranker in rankers:
+        service = GeoService(client=GeoClient(), distance_ranker=ranker)
+        # The first call starts the workers and shares the city, it is not a part of the steady state
+        await service.find_nearest_coffee_shops(51.5, -0.1, shops)
+        elapsed, max_delay = await run(service, shops, args.requests)
+        ranker.close()
+
+        print(f"{name:<8} total {elapsed * 1000:9.1f} ms   longest loop stall {max_delay * 1000:9.1f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,79 @@
+"""Startup time of the application.
+
+Measures, in fresh interpreters, the cold import of the application and the time until the first request is answered.
+Settings are read from the environment like in production, e.g. DATABASE_DSN, REDIS_DSN, TELEGRAM_API_TOKEN.
+
+    python benchmarks/startup.py --runs 10
+"""
+import statistics
+import subprocess
+import sys
+import time
+from argparse import ArgumentParser
+from pathlib import Path
+
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+BASELINE_CODE = "pass"
+IMPORT_CODE = "import brew_scout.libs.setup_app"
+FIRST_REQUEST_CODE = """
+import asyncio
+
+from asgi_lifespan import LifespanManager
+from httpx import ASGITransport, AsyncClient
+
+from brew_scout.libs.settings import AppSettings
+from brew_scout.libs.setup_app import setup_app
+
+
+async def main():
+    app = setup_app(AppSettings())
+
+    async with LifespanManager(app, startup_timeout=None):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://benchmark") as client:
+            response = await client.get("{path}")
+            response.raise_for_status()
+
+
+asyncio.run(main())
+"""
+
+
+def measure(code: str, runs: int) -> list[float]:
+    timings = []
+
+    for _ in range(runs):
+        started_at = time.perf_counter()
+        subprocess.run([sys.executable, "-W", "ignore", "-c", code], cwd=PROJECT_ROOT, check=True)
+        timings.append(time.perf_counter() - started_at)
+
+    return timings
+
+
+def report(name: str, timings: list[float], baseline: float = 0.0) -> None:
+    timings = [timing - baseline for timing in timings]
+    print(
+        f"{name:<16} median {statistics.median(timings) * 1000:8.1f} ms"
+        f"   min {min(timings) * 1000:8.1f} ms   max {max(timings) * 1000:8.1f} ms"
+    )
+
+
+def main() -> None:
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--path", type=str, default="/api/v1/health")
+    parser.add_argument("--skip_first_request", action="store_true")
+    args = parser.parse_args()
+
+    # Interpreter start up is the same for every variant, so it is subtracted
+    baseline = statistics.median(measure(BASELINE_CODE, args.runs))
+    print(f"interpreter      median {baseline * 1000:8.1f} ms (subtracted below)")
+    report("cold import", measure(IMPORT_CODE, args.runs), baseline)
+
+    if not args.skip_first_request:
+        report("first request", measure(FIRST_REQUEST_CODE.format(path=args.path), args.runs), baseline)
+
+
+if __name__ == "__main__":
+    main()
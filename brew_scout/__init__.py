@@ -1,9 +1,13 @@
-import toml
-
+import tomllib
+from collections import abc
 from functools import cache
+from importlib import metadata
 from pathlib import Path
 
 
+DISTRIBUTION_NAME = "brew-scout"
+
+
 @cache
 def _project_root() -> Path | None:
     current_path = Path(__file__)
@@ -15,37 +19,27 @@ def _project_root() -> Path | None:
     return None
 
 
-def _get_path_to_pyproject_toml() -> str | None:
-    if project_root_path := _project_root():
-        return f"{project_root_path}/pyproject.toml"
-
-    return None
-
-
-def _get_version() -> str | None:
-    if path_to_pyproject_toml := _get_path_to_pyproject_toml():
-        if pyproject_version := toml.load(path_to_pyproject_toml)["tool"]["poetry"]["version"]:
-            return pyproject_version
-
-    return None
-
-
-def _get_name() -> str | None:
-    if path_to_pyproject_toml := _get_path_to_pyproject_toml():
-        if pyproject_name := toml.load(path_to_pyproject_toml)["tool"]["poetry"]["name"]:
-            return pyproject_name
-
-    return None
-
-
-def _get_description() -> str | None:
-    if path_to_pyproject_toml := _get_path_to_pyproject_toml():
-        if pyproject_description := toml.load(path_to_pyproject_toml)["tool"]["poetry"]["description"]:
-            return pyproject_description
-
-    return None
-
-
-VERSION = _get_version() or "DEFAULT-0.0.1"
-MODULE_NAME = _get_name() or "DEFAULT NAME"
-DESCRIPTION = _get_description() or "DEFAULT DESCRIPTION"
+@cache
+def _get_project_metadata() -> abc.Mapping[str, str]:
+    # Installed package has its metadata on disk already, pyproject.toml is read only when running from sources
+    try:
+        package_metadata = metadata.metadata(DISTRIBUTION_NAME)
+    except metadata.PackageNotFoundError:
+        pass
+    else:
+        return {
+            "name": package_metadata["Name"],
+            "version": package_metadata["Version"],
+            "description": package_metadata["Summary"],
+        }
+
+    if (project_root_path := _project_root()) is None:
+        return {}
+
+    with (project_root_path / "pyproject.toml").open("rb") as file:
+        return tomllib.load(file).get("tool", {}).get("poetry", {})
+
+
+VERSION = _get_project_metadata().get("version") or "DEFAULT-0.0.1"
+MODULE_NAME = _get_project_metadata().get("name") or "DEFAULT NAME"
+DESCRIPTION = _get_project_metadata().get("description") or "DEFAULT DESCRIPTION"
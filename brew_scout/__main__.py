@@ -1,10 +1,15 @@
+import asyncio
+import logging
+import sys
 import typing as t
-import uvicorn
 from argparse import ArgumentParser
+from pathlib import Path
 from pydantic import PostgresDsn, RedisDsn, HttpUrl
 
+from .libs.domains.server import AppRole
+from .libs.domains.shops import ExportFormat
+from .libs.domains.telegram import IngestionMode
 from .libs.settings import AppSettings
-from .libs.setup_app import setup_app
 
 
 def init_args_parser() -> ArgumentParser:
@@ -20,6 +25,23 @@ def init_args_parser() -> ArgumentParser:
     arg_parser.add_argument("--oauth_server_metadata_url", type=str)
     arg_parser.add_argument("--allowed_users", type=str)
     arg_parser.add_argument("--secret_key", type=str)
+    arg_parser.add_argument(
+        "--ingestion_mode", type=IngestionMode, choices=list(IngestionMode), default=IngestionMode.WEBHOOK
+    )
+    arg_parser.add_argument("--role", type=AppRole, choices=list(AppRole), default=AppRole.ALL)
+
+    commands = arg_parser.add_subparsers(dest="command")
+    import_parser = commands.add_parser("import", help="Import coffee shops from CSV or GeoJSON files")
+    import_parser.add_argument("paths", type=Path, nargs="+")
+    import_parser.add_argument("--database_dsn", type=str, required=True)
+    import_parser.add_argument("--redis_dsn", type=str, required=True)
+    import_parser.add_argument("--batch_size", type=int, default=5000)
+
+    export_parser = commands.add_parser("export", help="Export coffee shops, `-` writes to stdout")
+    export_parser.add_argument("output", type=str)
+    export_parser.add_argument("--database_dsn", type=str, required=True)
+    export_parser.add_argument("--format", type=ExportFormat, choices=list(ExportFormat), default=ExportFormat.GEOJSON)
+    export_parser.add_argument("--gzip", action="store_true")
 
     return arg_parser
 
@@ -30,12 +52,14 @@ def main(
     sentry_dsn: str,
     telegram_api_url: str,
     telegram_api_token: str,
-    oauth_app_name: str,
-    oauth_client_id: str,
-    oauth_client_secret: str,
-    oauth_server_metadata_url: str,
-    allowed_users: str,
+    oauth_app_name: str | None,
+    oauth_client_id: str | None,
+    oauth_client_secret: str | None,
+    oauth_server_metadata_url: str | None,
+    allowed_users: str | None,
     secret_key: str,
+    ingestion_mode: IngestionMode = IngestionMode.WEBHOOK,
+    role: AppRole = AppRole.ALL,
 ) -> None:
     settings = AppSettings(
         database_dsn=t.cast(PostgresDsn, database_dsn),
@@ -47,17 +71,94 @@ def main(
         oauth_client_id=oauth_client_id,
         oauth_client_secret=oauth_client_secret,
         oauth_server_metadata_url=t.cast(HttpUrl, oauth_server_metadata_url),
-        allowed_users=allowed_users,
+        allowed_users=allowed_users or frozenset(),
         secret_key=secret_key,
+        ingestion_mode=ingestion_mode,
+        role=role,
+    )
+    # Every command imports only what it runs, the server stack is not needed by the import and export
+    from .libs.server import run_server
+
+    run_server(settings)
+
+
+async def import_catalogue(database_dsn: str, redis_dsn: str, paths: t.Sequence[Path], batch_size: int) -> None:
+    from .libs.dal.imports import CatalogueImportRepository
+    from .libs.dal.models.shops import CoffeeShopModel
+    from .libs.dal.shop import CoffeeShopRepository
+    from .libs.managers import DatabaseSessionManager, RedisSessionManager
+    from .libs.services.catalogue import CatalogueService
+    from .libs.services.imports import CatalogueImportService
+    from .libs.services.kv import KVService
+
+    database_session_manager = DatabaseSessionManager.init(database_dsn)
+    redis_session_manager = RedisSessionManager.init(redis_dsn)
+    kv_service = KVService(client=redis_session_manager.get_client())
+    import_service = CatalogueImportService(
+        repository=CatalogueImportRepository(model=CoffeeShopModel, session_manager=database_session_manager),
+        kv_service=kv_service,
+        catalogue_service=CatalogueService(
+            repository=CoffeeShopRepository(model=CoffeeShopModel, session_manager=database_session_manager),
+            kv_service=kv_service,
+        ),
+        batch_size=batch_size,
     )
-    app = setup_app(settings)
-    uvicorn.run(app=app, host=settings.host, port=settings.port, http="httptools")
+
+    try:
+        for path in paths:
+            stats = await import_service.import_file(path)
+            print(
+                f"{path}: {stats.shops_created} shops created, {stats.shops_updated} updated, "
+                f"{stats.cities_created} cities and {stats.countries_created} countries created, "
+                f"{stats.rejected} rows rejected"
+            )
+    finally:
+        await database_session_manager.close()
+        await redis_session_manager.close()
+
+
+async def export_catalogue(database_dsn: str, output: str, export_format: ExportFormat, gzip: bool) -> None:
+    from .libs.dal.models.shops import CoffeeShopModel
+    from .libs.dal.shop import CoffeeShopRepository
+    from .libs.managers import DatabaseSessionManager
+    from .libs.services.shop import CoffeeShopService
+    from .libs.utils.orj import EXPORT_ENCODERS
+    from .libs.utils.streams import iter_buffered, iter_gzip
+
+    database_session_manager = DatabaseSessionManager.init(database_dsn)
+    shop_service = CoffeeShopService(
+        repository=CoffeeShopRepository(model=CoffeeShopModel, session_manager=database_session_manager)
+    )
+    content = iter_buffered(EXPORT_ENCODERS[export_format](shop_service.stream_catalogue()))
+
+    if gzip:
+        content = iter_gzip(content)
+
+    file = sys.stdout.buffer if output == "-" else open(output, "wb")
+
+    try:
+        async for chunk in content:
+            file.write(chunk)
+    finally:
+        if file is not sys.stdout.buffer:
+            file.close()
+
+        await database_session_manager.close()
 
 
 if __name__ == "__main__":
     parser = init_args_parser()
     args = parser.parse_args()
 
+    if args.command == "export":
+        asyncio.run(export_catalogue(args.database_dsn, args.output, args.format, args.gzip))
+        raise SystemExit(0)
+
+    if args.command == "import":
+        logging.basicConfig(level=logging.INFO)
+        asyncio.run(import_catalogue(args.database_dsn, args.redis_dsn, args.paths, args.batch_size))
+        raise SystemExit(0)
+
     main(
         args.database_dsn,
         args.redis_dsn,
@@ -70,4 +171,6 @@ if __name__ == "__main__":
         args.oauth_server_metadata_url,
         args.allowed_users,
         args.secret_key,
+        args.ingestion_mode,
+        args.role,
     )
@@ -1,16 +1,24 @@
 from fastapi import APIRouter
 
-from . import common, admin, shops, hooks
+from . import common, admin, cities, shops, hooks, metrics
 
 
 API_BASE_URL_PREFIX = "/api/v1"
 
 
+common_router = APIRouter(prefix=API_BASE_URL_PREFIX)
+common_router.include_router(common.router)
+
+
 router = APIRouter(prefix=API_BASE_URL_PREFIX)
-router.include_router(common.router)
+router.include_router(cities.router)
 router.include_router(shops.router)
 router.include_router(hooks.router)
 
 
+admin_router = APIRouter()
+admin_router.include_router(admin.router)
+
+
 internal_router = APIRouter()
-internal_router.include_router(admin.router)
+internal_router.include_router(metrics.router)
@@ -0,0 +1,23 @@
+from fastapi import APIRouter, Depends, Request, Response, status
+from fastapi.responses import ORJSONResponse
+
+from ...libs.dependencies.common import resource_provider_factory
+from ...libs.managers import ResourceProvider
+from ...libs.serializers.cities import CityOut
+from ...libs.utils.http import is_not_modified, make_validator_headers
+
+
+router = APIRouter(tags=["Cities"])
+
+
+@router.get("/cities", response_model=None)
+async def get_cities(request: Request, rp: ResourceProvider = Depends(resource_provider_factory)) -> Response:
+    version = await rp.catalogue_service.get_version()
+    headers = make_validator_headers(version)
+
+    if is_not_modified(request.headers, version):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    cities = await rp.city_service.get_cities()
+
+    return ORJSONResponse([CityOut.model_validate(city).model_dump(mode="json") for city in cities], headers=headers)
@@ -1,15 +1,41 @@
+import typing as t
+from collections import abc
+
 from fastapi import APIRouter, Response, Depends, status
+from fastapi.responses import ORJSONResponse
 
-from ...libs.dependencies.common import settings_factory
-from ...libs.settings import AppSettings
+from ...libs.dependencies.common import resource_provider_factory
+from ...libs.domains.health import HealthStatus
+from ...libs.managers import ResourceProvider
 
 
 router = APIRouter(tags=["Common API's"])
 
 
 @router.get("/health", response_class=Response)
-async def health(settings: AppSettings = Depends(settings_factory)) -> Response:
-    if settings.database_dsn:
-        return Response(status_code=status.HTTP_200_OK)
+@router.get("/health/live", response_class=Response)
+async def health() -> Response:
+    # The process answers, so its event loop is not stuck, the datastores are checked by the readiness probe
+    return Response(status_code=status.HTTP_200_OK)
+
+
+@router.get("/health/ready", response_class=ORJSONResponse)
+async def readiness(rp: ResourceProvider = Depends(resource_provider_factory)) -> ORJSONResponse:
+    report = await rp.health_service.get_report()
+
+    return ORJSONResponse(
+        {"status": report.status, "checks": report.checks},
+        status_code=(
+            status.HTTP_200_OK if report.status == HealthStatus.READY else status.HTTP_503_SERVICE_UNAVAILABLE
+        ),
+    )
+
+
+@router.get("/health/circuits")
+async def circuits(rp: ResourceProvider = Depends(resource_provider_factory)) -> abc.Sequence[abc.Mapping[str, t.Any]]:
+    return [circuit_breaker.snapshot() for circuit_breaker in rp.circuit_breakers]
+
 
-    return Response(status_code=status.HTTP_503_SERVICE_UNAVAILABLE)
+@router.get("/health/executor")
+async def executor(rp: ResourceProvider = Depends(resource_provider_factory)) -> abc.Mapping[str, int]:
+    return rp.background_executor.stats()
@@ -1,18 +1,40 @@
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi.responses import ORJSONResponse
 
-from ...libs.dependencies.common import background_runner_factory, BackgroundRunner
-from ...libs.dependencies.handlers import telegram_hook_handler_factory
+from ...libs.dependencies.common import background_runner_factory, settings_factory, BackgroundRunner
+from ...libs.dependencies.handlers import telegram_hook_handler_factory, telegram_hook_payload, verify_telegram_secret
+from ...libs.domains.runner import OverflowPolicy
 from ...libs.serializers.telegram import TelegramHookIn
 from ...libs.handlers.handle_telegram_hook import TelegramHookHandler
+from ...libs.settings import AppSettings
 
 
 router = APIRouter(tags=["Hooks"])
 
 
-@router.post("/hook/telegram", status_code=status.HTTP_204_NO_CONTENT)
+@router.post(
+    "/hook/telegram",
+    status_code=status.HTTP_204_NO_CONTENT,
+    response_model=None,
+    # Route dependencies are solved first, so the token is checked before the body is read
+    dependencies=[Depends(verify_telegram_secret)],
+)
 async def handle_hook(
-    hook_in: TelegramHookIn,
+    hook_in: TelegramHookIn | None = Depends(telegram_hook_payload),
     bg_runner: BackgroundRunner = Depends(background_runner_factory),
     handler: TelegramHookHandler = Depends(telegram_hook_handler_factory),
-) -> None:
-    return await bg_runner(handler.process_hook, payload=hook_in)
+    settings: AppSettings = Depends(settings_factory),
+) -> Response | None:
+    if hook_in is None or not await handler.register_update(hook_in):
+        return None
+
+    if await bg_runner(hook_in.message.chat.id, handler.process_hook, payload=hook_in):
+        return None
+
+    match settings.background_overflow_policy:
+        case OverflowPolicy.BUSY:
+            return ORJSONResponse(handler.make_busy_reply(hook_in))
+        case OverflowPolicy.REJECT:
+            # Telegram redelivers the update later, so it must not be marked as processed
+            await handler.release_update(hook_in)
+            raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, headers={"Retry-After": "5"})
@@ -0,0 +1,12 @@
+from fastapi import APIRouter, Response
+from prometheus_client import CONTENT_TYPE_LATEST
+
+from ...libs.utils.metrics import render_latest
+
+
+router = APIRouter(tags=["Metrics"])
+
+
+@router.get("/metrics", response_class=Response, include_in_schema=False)
+async def metrics() -> Response:
+    return Response(content=render_latest(), media_type=CONTENT_TYPE_LATEST)
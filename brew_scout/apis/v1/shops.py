@@ -1,16 +1,86 @@
-from collections import abc
+import typing as t
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query, Request, Response, status
+from fastapi.responses import ORJSONResponse, StreamingResponse
 
 from ...libs.dependencies.common import resource_provider_factory
+from ...libs.domains.shops import CoffeeShopField, ExportFormat
 from ...libs.managers import ResourceProvider
-from ...libs.serializers.shops import CoffeeShopsOut
-from ...libs.dal.models.shops import CoffeeShopModel
+from ...libs.serializers.shops import CoffeeShopsOut, CoffeeShopsQueryIn
+from ...libs.utils.http import is_not_modified, make_validator_headers
+from ...libs.utils.orj import EXPORT_ENCODERS
+from ...libs.utils.streams import iter_buffered, iter_gzip
+
+
+NEXT_AFTER_ID_HEADER = "X-Next-After-Id"
+GZIP_ENCODING = "gzip"
+STREAM_MEDIA_TYPES = {
+    ExportFormat.NDJSON: "application/x-ndjson",
+    ExportFormat.JSON: "application/json",
+    ExportFormat.GEOJSON: "application/geo+json",
+}
 
 
 router = APIRouter(tags=["Coffee Shops"])
 
 
-@router.get("/shops", response_model=abc.Sequence[CoffeeShopsOut])
-async def get_shops(rp: ResourceProvider = Depends(resource_provider_factory)) -> abc.Sequence[CoffeeShopModel]:
-    return await rp.coffee_shop_service.get_coffee_shops()
+@router.get("/shops", response_model=None)
+async def get_shops(
+    request: Request,
+    query: t.Annotated[CoffeeShopsQueryIn, Query()],
+    rp: ResourceProvider = Depends(resource_provider_factory),
+) -> Response:
+    version = await rp.catalogue_service.get_version()
+    headers = make_validator_headers(version)
+
+    if is_not_modified(request.headers, version):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    filters = query.to_filter()
+
+    if query.stream is not None:
+        rows = rp.coffee_shop_service.stream_coffee_shop_rows(query.fields or list(CoffeeShopField), filters)
+        chunks = iter_buffered(EXPORT_ENCODERS[query.stream](rows))
+
+        return StreamingResponse(chunks, media_type=STREAM_MEDIA_TYPES[query.stream], headers=headers)
+
+    if query.fields:
+        # The id is the pagination cursor, so it is selected even when it is not requested
+        items = await rp.coffee_shop_service.get_coffee_shop_rows(
+            list(dict.fromkeys((CoffeeShopField.ID, *query.fields))), filters, query.limit
+        )
+        next_after_id = items[-1][CoffeeShopField.ID] if len(items) == query.limit else None
+        content: list[dict[str, t.Any]] = [{field: item[field] for field in query.fields} for item in items]
+    else:
+        coffee_shops = await rp.coffee_shop_service.get_coffee_shops_page(filters, query.limit)
+        next_after_id = coffee_shops[-1].id if len(coffee_shops) == query.limit else None
+        content = [CoffeeShopsOut.model_validate(cs).model_dump(mode="json") for cs in coffee_shops]
+
+    if next_after_id is not None:
+        headers[NEXT_AFTER_ID_HEADER] = str(next_after_id)
+
+    return ORJSONResponse(content, headers=headers)
+
+
+@router.get("/shops/export", response_model=None)
+async def export_shops(
+    request: Request,
+    export_format: ExportFormat = Query(default=ExportFormat.GEOJSON, alias="format"),
+    gzip: bool = Query(default=False),
+    rp: ResourceProvider = Depends(resource_provider_factory),
+) -> Response:
+    version = await rp.catalogue_service.get_version()
+    encoding = GZIP_ENCODING if gzip else None
+    headers = make_validator_headers(version, encoding) | {"Vary": "Accept-Encoding"}
+
+    if is_not_modified(request.headers, version, encoding):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    content = iter_buffered(EXPORT_ENCODERS[export_format](rp.coffee_shop_service.stream_catalogue()))
+    headers["Content-Disposition"] = f'attachment; filename="shops.{export_format}"'
+
+    if encoding is not None:
+        content = iter_gzip(content)
+        headers["Content-Encoding"] = encoding
+
+    return StreamingResponse(content, media_type=STREAM_MEDIA_TYPES[export_format], headers=headers)
@@ -22,7 +22,7 @@ class AdminAuthenticationBackend(AuthenticationBackend):
     async def authenticate(self, request: Request) -> bool | RedirectResponse:
         if not request.session.get("user"):
             redirect_uri = request.url_for("login_google")
-            self.logger.info(f"Redirect uri: {redirect_uri}", extra={"uri_type": str(type(redirect_uri))})
+            self.logger.info("Redirect uri: %s", redirect_uri, extra={"uri_type": str(type(redirect_uri))})
 
             return await self.client.authorize_redirect(request, redirect_uri)
 
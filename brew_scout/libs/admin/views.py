@@ -1,9 +1,21 @@
+import typing as t
+
 from sqladmin import ModelView
+from starlette.requests import Request
 
 from ..dal.models.shops import CoffeeShopModel, CityModel, CountryModel
 
 
-class CountryModelAdminView(ModelView, model=CountryModel):
+class CatalogueModelView(ModelView):
+    # Public listings answer 304 while the catalogue version is unchanged, so every admin edit drops it
+    async def after_model_change(self, data: dict[str, t.Any], model: t.Any, is_created: bool, request: Request) -> None:
+        await request.app.state.manager_provider.catalogue_service.invalidate()
+
+    async def after_model_delete(self, model: t.Any, request: Request) -> None:
+        await request.app.state.manager_provider.catalogue_service.invalidate()
+
+
+class CountryModelAdminView(CatalogueModelView, model=CountryModel):
     column_list = [
         CountryModel.id,
         CountryModel.name,
@@ -26,7 +38,7 @@ class CountryModelAdminView(ModelView, model=CountryModel):
     }
 
 
-class CityModelAdminView(ModelView, model=CityModel):
+class CityModelAdminView(CatalogueModelView, model=CityModel):
     column_list = [CityModel.id, CityModel.name, CityModel.created_at, CityModel.updated_at, CityModel.country]
 
     @staticmethod
@@ -34,7 +46,7 @@ class CityModelAdminView(ModelView, model=CityModel):
         return country.name
 
 
-class CoffeeShopModelAdminView(ModelView, model=CoffeeShopModel):
+class CoffeeShopModelAdminView(CatalogueModelView, model=CoffeeShopModel):
     column_list = [CoffeeShopModel.id, CoffeeShopModel.name, CoffeeShopModel.city, CoffeeShopModel.created_at]
     form_ajax_refs = {
         "city": {
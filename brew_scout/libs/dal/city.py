@@ -17,7 +17,7 @@ class CityRepository(BaseRepository[CityModel]):
     async def get_all(self) -> abc.Sequence[CityModel]:
         q = select(CityModel).options(joinedload(CityModel.country))
 
-        async with self._get_session() as session:
+        async with self._get_read_session() as session:
             result = await session.scalars(q)
 
             return result.all()
@@ -35,7 +35,7 @@ class CityRepository(BaseRepository[CityModel]):
             )
         )
 
-        async with self._get_session() as session:
+        async with self._get_read_session() as session:
             result = await session.scalars(q)
 
             return result.one_or_none()
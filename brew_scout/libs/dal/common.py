@@ -13,6 +13,9 @@ class DatabaseSessionManagerProto(t.Protocol):
     def session(self) -> t.AsyncContextManager[AsyncSession]:
         ...
 
+    def read_session(self) -> t.AsyncContextManager[AsyncSession]:
+        ...
+
 
 class BaseRepository(t.Generic[Model]):
     def __init__(self, model: t.Type[Model], session_manager: DatabaseSessionManagerProto):
@@ -20,4 +23,8 @@ class BaseRepository(t.Generic[Model]):
         self.session_manager = session_manager
 
     def _get_session(self) -> t.AsyncContextManager[AsyncSession]:
-        return self.session_manager.session()
\ No newline at end of file
+        return self.session_manager.session()
+
+    def _get_read_session(self) -> t.AsyncContextManager[AsyncSession]:
+        # Reads which can tolerate replication lag, the manager falls back to the primary by itself
+        return self.session_manager.read_session()
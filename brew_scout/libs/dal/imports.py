@@ -0,0 +1,156 @@
+import typing as t
+from collections import abc
+
+from sqlalchemy import text
+
+from .common import BaseRepository
+from .models.shops import CoffeeShopModel
+from ..domains.shops import CatalogueImportStats
+
+
+STAGING_TABLE = "shops_staging"
+STAGING_COLUMNS = (
+    "country",
+    "city",
+    "name",
+    "web_url",
+    "latitude",
+    "longitude",
+    "city_min_latitude",
+    "city_max_latitude",
+    "city_min_longitude",
+    "city_max_longitude",
+)
+
+# Imports running at the same time would both insert the same missing rows
+LOCK_IMPORT = text("SELECT pg_advisory_xact_lock(hashtext('brew_scout.catalogue_import'))")
+CREATE_STAGING_TABLE = text(
+    f"""
+    CREATE TEMPORARY TABLE {STAGING_TABLE} (
+        position bigserial,
+        country text NOT NULL,
+        city text NOT NULL,
+        name text NOT NULL,
+        web_url text NOT NULL,
+        latitude double precision NOT NULL,
+        longitude double precision NOT NULL,
+        city_min_latitude double precision,
+        city_max_latitude double precision,
+        city_min_longitude double precision,
+        city_max_longitude double precision
+    ) ON COMMIT DROP
+    """
+)
+MERGE_COUNTRIES = text(
+    f"""
+    WITH inserted AS (
+        INSERT INTO countries (name, created_at, updated_at)
+        SELECT DISTINCT ON (lower(s.country)) s.country, now(), now()
+        FROM {STAGING_TABLE} s
+        WHERE NOT EXISTS (SELECT 1 FROM countries c WHERE lower(c.name) = lower(s.country))
+        ORDER BY lower(s.country), s.position
+        RETURNING id
+    )
+    SELECT count(*) FROM inserted
+    """
+)
+# Cities are told apart by the country as well, London in GB and London in CA are different cities.
+# New cities get the bounding box from the file or, if it is missing, the extent of their shops
+MERGE_CITIES = text(
+    f"""
+    WITH inserted AS (
+        INSERT INTO cities (
+            country_id,
+            name,
+            bounding_box_min_latitude,
+            bounding_box_max_latitude,
+            bounding_box_min_longitude,
+            bounding_box_max_longitude,
+            created_at,
+            updated_at
+        )
+        SELECT
+            c.id,
+            min(s.city),
+            coalesce(min(s.city_min_latitude), min(s.latitude)),
+            coalesce(max(s.city_max_latitude), max(s.latitude)),
+            coalesce(min(s.city_min_longitude), min(s.longitude)),
+            coalesce(max(s.city_max_longitude), max(s.longitude)),
+            now(),
+            now()
+        FROM {STAGING_TABLE} s
+        JOIN countries c ON lower(c.name) = lower(s.country)
+        WHERE NOT EXISTS (SELECT 1 FROM cities ci WHERE ci.country_id = c.id AND lower(ci.name) = lower(s.city))
+        GROUP BY c.id, lower(s.city)
+        RETURNING id
+    )
+    SELECT count(*) FROM inserted
+    """
+)
+# The last row wins when a file has the same shop twice, unchanged shops are left untouched
+MERGE_SHOPS = text(
+    f"""
+    WITH source AS (
+        SELECT DISTINCT ON (ci.id, s.name) ci.id AS city_id, s.name, s.web_url, s.latitude, s.longitude
+        FROM {STAGING_TABLE} s
+        JOIN countries c ON lower(c.name) = lower(s.country)
+        JOIN cities ci ON ci.country_id = c.id AND lower(ci.name) = lower(s.city)
+        ORDER BY ci.id, s.name, s.position DESC
+    ),
+    updated AS (
+        UPDATE shops
+        SET web_url = source.web_url, latitude = source.latitude, longitude = source.longitude, updated_at = now()
+        FROM source
+        WHERE shops.city_id = source.city_id
+            AND shops.name = source.name
+            AND (shops.web_url, shops.latitude, shops.longitude)
+                IS DISTINCT FROM (source.web_url, source.latitude, source.longitude)
+        RETURNING shops.id
+    ),
+    inserted AS (
+        INSERT INTO shops (city_id, name, web_url, latitude, longitude, created_at, updated_at)
+        SELECT source.city_id, source.name, source.web_url, source.latitude, source.longitude, now(), now()
+        FROM source
+        WHERE NOT EXISTS (SELECT 1 FROM shops WHERE shops.city_id = source.city_id AND shops.name = source.name)
+        RETURNING shops.id
+    )
+    SELECT (SELECT count(*) FROM updated), (SELECT count(*) FROM inserted)
+    """
+)
+GET_STAGED_CITIES = text(f"SELECT DISTINCT lower(city) FROM {STAGING_TABLE}")
+
+
+class CatalogueImportRepository(BaseRepository[CoffeeShopModel]):
+    async def import_coffee_shops(
+        self, batches: abc.AsyncIterable[abc.Sequence[tuple[t.Any, ...]]]
+    ) -> CatalogueImportStats:
+        async with self._get_session() as session:
+            # Goes through the session first, so the transaction is open before the driver is used directly
+            await session.execute(LOCK_IMPORT)
+            await session.execute(CREATE_STAGING_TABLE)
+
+            connection = await session.connection()
+            raw_connection = await connection.get_raw_connection()
+
+            if (driver_connection := raw_connection.driver_connection) is None:
+                raise IOError("CatalogueImportRepository: driver connection is not available")
+
+            staged = 0
+
+            async for batch in batches:
+                await driver_connection.copy_records_to_table(STAGING_TABLE, records=batch, columns=STAGING_COLUMNS)
+                staged += len(batch)
+
+            countries_created = await session.scalar(MERGE_COUNTRIES)
+            cities_created = await session.scalar(MERGE_CITIES)
+            shops_updated, shops_created = (await session.execute(MERGE_SHOPS)).one()
+            cities = await session.scalars(GET_STAGED_CITIES)
+
+            return CatalogueImportStats(
+                staged=staged,
+                countries_created=countries_created or 0,
+                cities_created=cities_created or 0,
+                shops_created=shops_created,
+                shops_updated=shops_updated,
+                cities=frozenset(cities.all()),
+            )
@@ -1,6 +1,6 @@
 import datetime as dt
 
-from sqlalchemy import DateTime, ForeignKey
+from sqlalchemy import DateTime, ForeignKey, Index, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .common import Base
@@ -44,11 +44,14 @@ class CityModel(Base):
         return f"{self.name}: {self.id}"
 
 
+Index("idx_cities_lower_name", func.lower(CityModel.name))
+
+
 class CoffeeShopModel(Base):
     __tablename__ = "shops"
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    city_id: Mapped[int] = mapped_column(ForeignKey("cities.id"))
+    city_id: Mapped[int] = mapped_column(ForeignKey("cities.id"), index=True)
     name: Mapped[str]
     web_url: Mapped[str]
     latitude: Mapped[float]
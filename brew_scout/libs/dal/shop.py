@@ -1,11 +1,29 @@
+import typing as t
 from collections import abc
 
-from sqlalchemy import select, LABEL_STYLE_TABLENAME_PLUS_COL
+from sqlalchemy import Row, Select, func, select, LABEL_STYLE_TABLENAME_PLUS_COL
 from sqlalchemy.orm import joinedload
 
 from .common import BaseRepository
 from .models.shops import CoffeeShopModel
-from .models.shops import CityModel
+from .models.shops import CityModel, CountryModel
+from ..domains.shops import CatalogueVersion, CoffeeShopField, CoffeeShopsFilter
+
+
+Ts = t.TypeVarTuple("Ts")
+# Quoted, so the column types stay visible to mypy without subscripting Row at runtime
+AnyRow: t.TypeAlias = "Row[t.Unpack[tuple[t.Any, ...]]]"
+CityShopRow: t.TypeAlias = "Row[int, str, str, float, float]"
+CatalogueRow: t.TypeAlias = "Row[int, str, str, float, float, int, str, str]"
+
+COFFEE_SHOP_COLUMNS = {
+    CoffeeShopField.ID: CoffeeShopModel.id,
+    CoffeeShopField.CITY_ID: CoffeeShopModel.city_id,
+    CoffeeShopField.NAME: CoffeeShopModel.name,
+    CoffeeShopField.WEB_URL: CoffeeShopModel.web_url,
+    CoffeeShopField.LATITUDE: CoffeeShopModel.latitude,
+    CoffeeShopField.LONGITUDE: CoffeeShopModel.longitude,
+}
 
 
 class CoffeeShopRepository(BaseRepository[CoffeeShopModel]):
@@ -16,20 +34,135 @@ class CoffeeShopRepository(BaseRepository[CoffeeShopModel]):
             .set_label_style(LABEL_STYLE_TABLENAME_PLUS_COL)
         )
 
-        async with self._get_session() as session:
+        async with self._get_read_session() as session:
+            result = await session.scalars(q)
+
+            return result.all()
+
+    async def get_page(self, filters: CoffeeShopsFilter, limit: int) -> abc.Sequence[CoffeeShopModel]:
+        q = self._apply_filters(
+            select(CoffeeShopModel).options(joinedload(CoffeeShopModel.city).joinedload(CityModel.country)), filters
+        ).limit(limit)
+
+        async with self._get_read_session() as session:
             result = await session.scalars(q)
 
             return result.all()
 
+    async def get_rows(
+        self, fields: abc.Sequence[CoffeeShopField], filters: CoffeeShopsFilter, limit: int
+    ) -> abc.Sequence[AnyRow]:
+        q = self._apply_filters(select(*(COFFEE_SHOP_COLUMNS[field] for field in fields)), filters).limit(limit)
+
+        async with self._get_read_session() as session:
+            result = await session.execute(q)
+
+            return result.all()
+
+    async def stream_rows(
+        self, fields: abc.Sequence[CoffeeShopField], filters: CoffeeShopsFilter, batch_size: int = 1000
+    ) -> abc.AsyncIterator[AnyRow]:
+        q = self._apply_filters(select(*(COFFEE_SHOP_COLUMNS[field] for field in fields)), filters)
+
+        # A server side cursor keeps only one batch of rows in memory however big the table is
+        async with self._get_read_session() as session:
+            result = await session.stream(q.execution_options(yield_per=batch_size))
+
+            async for row in result:
+                yield row
+
+    async def stream_catalogue(self, batch_size: int = 1000) -> abc.AsyncIterator[CatalogueRow]:
+        q = (
+            select(
+                CoffeeShopModel.id,
+                CoffeeShopModel.name,
+                CoffeeShopModel.web_url,
+                CoffeeShopModel.latitude,
+                CoffeeShopModel.longitude,
+                CoffeeShopModel.city_id,
+                CityModel.name.label("city"),
+                CountryModel.name.label("country"),
+            )
+            .join(CoffeeShopModel.city)
+            .join(CityModel.country)
+            .order_by(CoffeeShopModel.id)
+        )
+
+        async with self._get_read_session() as session:
+            result = await session.stream(q.execution_options(yield_per=batch_size))
+
+            async for row in result:
+                yield row
+
+    async def get_catalogue_version(self, from_primary: bool = False) -> CatalogueVersion:
+        # Shop listings embed cities and countries, so a change in any of them is a new version
+        shops_count, cities_count, countries_count = (
+            select(func.count()).select_from(model).scalar_subquery()
+            for model in (CoffeeShopModel, CityModel, CountryModel)
+        )
+        q = select(
+            shops_count + cities_count + countries_count,
+            func.greatest(
+                select(func.max(CoffeeShopModel.updated_at)).scalar_subquery(),
+                select(func.max(CityModel.updated_at)).scalar_subquery(),
+                select(func.max(CountryModel.updated_at)).scalar_subquery(),
+            ),
+        )
+
+        async with self._get_session() if from_primary else self._get_read_session() as session:
+            result = await session.execute(q)
+            rows, updated_at = result.one()
+
+            return CatalogueVersion(rows=rows, updated_at=updated_at)
+
     async def get_by_city_name(self, city_name: str) -> abc.Sequence[CoffeeShopModel]:
         q = (
             select(CoffeeShopModel)
             .join(CoffeeShopModel.city)
-            .options(joinedload(CoffeeShopModel.city))
-            .where(CityModel.name.ilike(city_name))
+            .where(func.lower(CityModel.name) == city_name.lower())
         )
 
-        async with self._get_session() as session:
+        async with self._get_read_session() as session:
             result = await session.scalars(q)
 
             return result.all()
+
+    async def get_by_city_id(self, city_id: int) -> abc.Sequence[CityShopRow]:
+        # Plain rows with the columns the bot needs, no ORM identity map and no join on cities
+        q = (
+            select(
+                CoffeeShopModel.id,
+                CoffeeShopModel.name,
+                CoffeeShopModel.web_url,
+                CoffeeShopModel.latitude,
+                CoffeeShopModel.longitude,
+            )
+            .where(CoffeeShopModel.city_id == city_id)
+            .order_by(CoffeeShopModel.id)
+        )
+
+        async with self._get_read_session() as session:
+            result = await session.execute(q)
+
+            return result.all()
+
+    @staticmethod
+    def _apply_filters(q: "Select[t.Unpack[Ts]]", filters: CoffeeShopsFilter) -> "Select[t.Unpack[Ts]]":
+        # Keyset pagination, the primary key index serves both the filter and the order
+        q = q.where(CoffeeShopModel.id > filters.after_id).order_by(CoffeeShopModel.id)
+
+        if filters.city_id is not None:
+            q = q.where(CoffeeShopModel.city_id == filters.city_id)
+
+        if filters.country_id is not None:
+            q = q.where(
+                CoffeeShopModel.city_id.in_(select(CityModel.id).where(CityModel.country_id == filters.country_id))
+            )
+
+        if (bbox := filters.bounding_box) is not None:
+            q = q.where(
+                CoffeeShopModel.latitude.between(bbox.min_latitude, bbox.max_latitude),
+                CoffeeShopModel.longitude.between(bbox.min_longitude, bbox.max_longitude),
+            )
+
+        return q
@@ -19,7 +19,7 @@ class UserRepository(BaseRepository[UserModel]):
     async def upsert_user(self, user: From) -> UserModel:
         ins_stmt = insert(UserModel).values(
             tuid=user.tuid,
-            username=user.username,
+            username=user.username or "",
             is_bot=user.is_bot,
             first_name=user.first_name,
             last_name=user.last_name,
@@ -40,3 +40,30 @@ class UserRepository(BaseRepository[UserModel]):
             result = await session.scalars(ups_stmt)
 
             return result.one()
+
+    async def upsert_users(self, users: abc.Sequence[From]) -> None:
+        ins_stmt = insert(UserModel).values(
+            [
+                {
+                    "tuid": user.tuid,
+                    "username": user.username or "",
+                    "is_bot": user.is_bot,
+                    "first_name": user.first_name,
+                    "last_name": user.last_name,
+                }
+                for user in users
+            ]
+        )
+
+        ups_stmt = ins_stmt.on_conflict_do_update(
+            index_elements=[UserModel.username, UserModel.tuid],
+            set_=dict(
+                is_bot=ins_stmt.excluded.is_bot,
+                first_name=ins_stmt.excluded.first_name,
+                last_name=ins_stmt.excluded.last_name,
+                updated_at=dt.datetime.now(tz=dt.timezone.utc),
+            ),
+        )
+
+        async with self._get_session() as session:
+            await session.execute(ups_stmt)
@@ -5,7 +5,6 @@ from fastapi import Depends
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from redis.asyncio.client import Redis
-from starlette.background import BackgroundTasks
 from starlette.requests import Request
 
 from ..settings import AppSettings, SETTINGS_KEY
@@ -14,7 +13,7 @@ from ..managers import ResourceProvider
 
 T = t.TypeVar("T")
 P = t.ParamSpec("P")
-BackgroundRunner = abc.Callable[..., abc.Awaitable[None]]
+BackgroundRunner = abc.Callable[..., abc.Awaitable[bool]]
 
 
 async def settings_factory(request: Request) -> AppSettings:
@@ -40,15 +39,19 @@ async def get_oauth_client(rp: ResourceProvider = Depends(resource_provider_fact
     return rp.oauth_client_manager.get_client()
 
 
-async def background_runner_factory(request: Request, background_tasks: BackgroundTasks) -> BackgroundRunner:
+async def background_runner_factory(
+    request: Request, rp: ResourceProvider = Depends(resource_provider_factory)
+) -> BackgroundRunner:
     run_now = bool(request.query_params.get("run_now", False))
 
-    async def background_runner(func: abc.Callable[P, abc.Awaitable[T]], *args: P.args, **kwargs: P.kwargs) -> None:
+    async def background_runner(
+        key: abc.Hashable, func: abc.Callable[P, abc.Awaitable[T]], *args: P.args, **kwargs: P.kwargs
+    ) -> bool:
         if run_now:
             await func(*args, **kwargs)
-            return None
+            return True
 
-        # Run the function in the background
-        return background_tasks.add_task(func, *args, **kwargs)
+        # Run the function in the background, calls with the same key are run one by one
+        return await rp.background_executor.try_submit(key, func, *args, **kwargs)
 
     return background_runner
@@ -1,9 +1,56 @@
-from fastapi import Depends
+import hmac
+import logging
 
-from .common import resource_provider_factory
+import orjson
+from fastapi import Depends, HTTPException, Request, status
+
+from .common import resource_provider_factory, settings_factory
 from ..managers import ResourceProvider
 from ..handlers.handle_telegram_hook import TelegramHookHandler
+from ..serializers.telegram import TelegramHookIn, get_update_type, parse_update
+from ..settings import AppSettings
+from ..utils.http import read_limited_body
+
+
+TELEGRAM_SECRET_TOKEN_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+logger = logging.getLogger(__name__)
 
 
 async def telegram_hook_handler_factory(rp: ResourceProvider = Depends(resource_provider_factory)) -> TelegramHookHandler:
     return rp.telegram_hook_handler
+
+
+async def verify_telegram_secret(request: Request, settings: AppSettings = Depends(settings_factory)) -> None:
+    if settings.telegram_webhook_secret is None:
+        return
+
+    # Runs before the body is read, so a request without the token costs a header lookup and a compare
+    secret_token = request.headers.get(TELEGRAM_SECRET_TOKEN_HEADER, "")
+
+    if not hmac.compare_digest(secret_token.encode(), settings.telegram_webhook_secret.encode()):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid secret token")
+
+
+async def telegram_hook_payload(
+    request: Request, settings: AppSettings = Depends(settings_factory)
+) -> TelegramHookIn | None:
+    if (body := await read_limited_body(request, settings.telegram_webhook_max_body_size)) is None:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="Update is too large")
+
+    try:
+        raw_update = orjson.loads(body)
+    except orjson.JSONDecodeError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Update is not valid JSON")
+
+    if not isinstance(raw_update, dict):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Update is not a JSON object")
+
+    # Unsupported updates are acknowledged, otherwise Telegram redelivers them over and over
+    if (payload := parse_update(raw_update)) is None:
+        logger.info(
+            "Skip unsupported telegram update",
+            extra={"update_id": raw_update.get("update_id"), "update_type": get_update_type(raw_update)},
+        )
+
+    return payload
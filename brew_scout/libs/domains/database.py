@@ -0,0 +1,8 @@
+from enum import StrEnum
+
+
+class DisconnectStrategy(StrEnum):
+    # Test every connection with a round trip on checkout
+    PESSIMISTIC = "pessimistic"
+    # Rely on pool_recycle and invalidate the pool when a disconnect error is raised
+    OPTIMISTIC = "optimistic"
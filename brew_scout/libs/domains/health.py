@@ -0,0 +1,25 @@
+import dataclasses as dc
+from collections import abc
+from enum import StrEnum
+
+
+class HealthCheck(StrEnum):
+    POSTGRES = "postgres"
+    REDIS = "redis"
+    # The database pool holds its warm-up connections, so the first requests do not pay for connecting
+    WARM_UP = "warm_up"
+
+
+class HealthStatus(StrEnum):
+    READY = "ready"
+    NOT_READY = "not_ready"
+
+
+@dc.dataclass(frozen=True, slots=True)
+class HealthReport:
+    checks: abc.Mapping[HealthCheck, bool]
+    checked_at: float
+
+    @property
+    def status(self) -> HealthStatus:
+        return HealthStatus.READY if all(self.checks.values()) else HealthStatus.NOT_READY
@@ -0,0 +1,21 @@
+import dataclasses as dc
+from enum import StrEnum
+
+
+class RateLimitScope(StrEnum):
+    USER = "user"
+    CHAT = "chat"
+
+
+@dc.dataclass(frozen=True, slots=True)
+class RateLimit:
+    # A burst of `capacity` requests is allowed, then one more every 1 / `refill_rate` seconds
+    capacity: int
+    refill_rate: float
+
+
+@dc.dataclass(frozen=True, slots=True)
+class RateLimitDecision:
+    is_allowed: bool
+    retry_after: float = 0.0
+    should_notify: bool = False
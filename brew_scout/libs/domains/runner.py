@@ -0,0 +1,6 @@
+from enum import StrEnum
+
+
+class OverflowPolicy(StrEnum):
+    REJECT = "reject"
+    BUSY = "busy"
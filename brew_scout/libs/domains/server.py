@@ -0,0 +1,23 @@
+from enum import StrEnum
+
+
+class EventLoop(StrEnum):
+    # uvloop when it is installed, asyncio otherwise
+    AUTO = "auto"
+    ASYNCIO = "asyncio"
+    UVLOOP = "uvloop"
+
+
+class ServerSupervisor(StrEnum):
+    # uvicorn's own process manager, stops gracefully on SIGTERM
+    UVICORN = "uvicorn"
+    # gunicorn master with uvicorn workers, restarts dead workers and reloads gracefully on SIGHUP
+    GUNICORN = "gunicorn"
+
+
+class AppRole(StrEnum):
+    # Public API and telegram updates, without the admin and its OAuth and session middleware
+    API = "api"
+    # Admin with the OAuth login, small enough to run as a separate process
+    ADMIN = "admin"
+    ALL = "all"
@@ -1,10 +1,72 @@
-from pydantic import BaseModel, AnyHttpUrl, ConfigDict, Field
+import dataclasses as dc
+import datetime as dt
+import typing as t
+from enum import StrEnum
 
-class CoffeeShop(BaseModel):
-    model_config = ConfigDict(from_attributes=True)
 
+@dc.dataclass(frozen=True, slots=True)
+class CoffeeShop:
+    # Built for every shop of a city on each request, so it is not validated again,
+    # the data is validated once when it enters the catalogue
     name: str
     latitude: float
     longitude: float
-    web_url: AnyHttpUrl
-    distance: float | None = Field(default=None)
+    web_url: str
+    distance: float | None = None
+
+    @classmethod
+    def from_row(cls, row: t.Any) -> t.Self:
+        return cls(name=row.name, latitude=row.latitude, longitude=row.longitude, web_url=row.web_url)
+
+
+class CoffeeShopField(StrEnum):
+    ID = "id"
+    CITY_ID = "city_id"
+    NAME = "name"
+    WEB_URL = "web_url"
+    LATITUDE = "latitude"
+    LONGITUDE = "longitude"
+
+
+class ExportFormat(StrEnum):
+    NDJSON = "ndjson"
+    JSON = "json"
+    GEOJSON = "geojson"
+
+
+@dc.dataclass(frozen=True, slots=True)
+class BoundingBox:
+    min_latitude: float
+    min_longitude: float
+    max_latitude: float
+    max_longitude: float
+
+
+@dc.dataclass(frozen=True, slots=True)
+class CatalogueVersion:
+    rows: int
+    updated_at: dt.datetime | None = None
+
+    @property
+    def etag(self) -> str:
+        updated_at = int(self.updated_at.timestamp() * 1_000_000) if self.updated_at else 0
+        return f'"{self.rows:x}-{updated_at:x}"'
+
+
+@dc.dataclass(frozen=True, slots=True)
+class CoffeeShopsFilter:
+    after_id: int = 0
+    city_id: int | None = None
+    country_id: int | None = None
+    bounding_box: BoundingBox | None = None
+
+
+@dc.dataclass(frozen=True, slots=True)
+class CatalogueImportStats:
+    staged: int = 0
+    rejected: int = 0
+    countries_created: int = 0
+    cities_created: int = 0
+    shops_created: int = 0
+    shops_updated: int = 0
+    cities: frozenset[str] = frozenset()
@@ -4,8 +4,20 @@ from enum import StrEnum
 class TelegramMethods(StrEnum):
     SEND_MESSAGE = "sendMessage"
     SEND_VENUE = "sendVenue"
+    GET_UPDATES = "getUpdates"
+    DELETE_WEBHOOK = "deleteWebhook"
 
 
 class TelegramMessage(StrEnum):
     COMMAND_PREFIX = "/"
     START = "/start"
+
+
+class IngestionMode(StrEnum):
+    WEBHOOK = "webhook"
+    POLLING = "polling"
+
+
+class TelegramUpdateType(StrEnum):
+    # Only messages are handled, updates of other types are acknowledged and skipped
+    MESSAGE = "message"
@@ -1,19 +1,33 @@
 import asyncio
 import dataclasses as dc
 import logging
+import typing as t
 from collections import abc
+from contextlib import contextmanager
 
-from ..dal.models.users import UserModel
 from ..domains.telegram import TelegramMessage
+from ..dal.models.shops import CityModel
 from ..domains.shops import CoffeeShop
 from ..serializers.telegram import TelegramHookIn, Location, From
 from ..serializers.telegram import Message
 from ..services.bus.service import BusService
+from ..services.catalogue import CatalogueService
 from ..services.geo.service import GeoService
 from ..services.city import CityService
 from ..services.shop import CoffeeShopService
 from ..services.kv import KVService
+from ..services.limits import RateLimitService
 from ..services.user import UserService
+from ..services.updates import UpdateDeduplicationService
+from ..utils.metrics import HookStage, observe_stage
+from ..utils.tracing import trace_span, traced
+
+
+# Per command query spans are opt-in, so the storage stages of every hook are recorded as spans of their own
+STAGE_SPAN_OPS: t.Final[abc.Mapping[HookStage, str]] = {
+    HookStage.CACHE_GET: "db.redis",
+    HookStage.DB_LOAD: "db",
+}
 
 
 @dc.dataclass(frozen=True, slots=True, repr=False)
@@ -24,12 +38,37 @@ class TelegramHookHandler:
     shop_service: CoffeeShopService
     kv_service: KVService
     user_service: UserService
+    deduplication_service: UpdateDeduplicationService
+    rate_limit_service: RateLimitService
+    catalogue_service: CatalogueService
 
     default_quantity_for_response: int = 2
     logger: logging.Logger = dc.field(default_factory=lambda: logging.getLogger(__name__))
+    _background_tasks: set[asyncio.Task[t.Any]] = dc.field(default_factory=set)
+
+    async def register_update(self, payload: TelegramHookIn) -> bool:
+        if not await self.deduplication_service.register_update(payload.update_id):
+            self.logger.info("Skip redelivered update", extra={"update_id": payload.update_id})
+            return False
+
+        return True
+
+    async def release_update(self, payload: TelegramHookIn) -> None:
+        await self.deduplication_service.release_update(payload.update_id)
 
+    def make_busy_reply(self, payload: TelegramHookIn) -> abc.Mapping[str, t.Any]:
+        self.logger.warning("Reply busy to update", extra={"update_id": payload.update_id})
+        return self.bus_service.make_busy_reply(payload.message.chat.id)
+
+    @traced("telegram.process_hook", op="queue.process")
     async def process_hook(self, payload: TelegramHookIn) -> None:
-        user = await self._process_user(payload.message.message_from)
+        if not await self._acquire_rate_limit(payload.message):
+            return
+
+        # Nothing below depends on the stored user, so the write never delays the answer
+        self._process_user(payload.message.message_from)
+        # Telegram users do not need a username, the cached shops are keyed by the user id then
+        user_name = payload.message.message_from.username or str(payload.message.message_from.tuid)
 
         if await self._process_message_or_command(payload.message):
             await self.bus_service.send_welcome_message(payload.message.chat.id)
@@ -39,84 +78,140 @@ class TelegramHookHandler:
             await self.bus_service.send_empty_location_message(payload.message.chat.id)
             return
 
-        if not (
-            city := await self.city_service.try_to_find_city_from_coordinates(location.latitude, location.longitude)
-        ):
-            self.logger.info(f"City not found with given coordinates: {location.latitude} {location.longitude}")
+        with self._observe(HookStage.CITY_LOOKUP):
+            city = await self.city_service.try_to_find_city_from_coordinates(location.latitude, location.longitude)
+
+        if not city:
+            self.logger.info(
+                "City not found with given coordinates: %s %s",
+                location.latitude,
+                location.longitude,
+                extra={"latitude": location.latitude, "longitude": location.longitude},
+            )
             return await self.bus_service.send_city_not_found_message(payload.message.chat.id)
 
-        if not (coffee_shops := await self._get_coffee_shops_for_city(city.name, user.username)):
-            self.logger.info(f"There are no coffee shops in city: {city.name}")
+        if not (nearest_coffee_shops := await self._find_nearby_coffee_shops(city, user_name, location)):
+            self.logger.info("There are no coffee shops in city: %s", city.name, extra={"city": city.name})
             return await self.bus_service.send_shops_not_found_message(payload.message.chat.id, city.name)
 
-        nearest_coffee_shops = await self._find_nearby_coffee_shops(city.name, user.username, location, coffee_shops)
-        await self._send_message(payload.message.chat.id, nearest_coffee_shops)
+        with self._observe(HookStage.TELEGRAM_SEND):
+            await self._send_message(payload.message.chat.id, nearest_coffee_shops)
+
         self.logger.info("Nearest coffee shops sent")
 
-    async def _process_user(self, user: From) -> UserModel:
-        return await self.user_service.store_user(user)
+    async def close(self, timeout: float | None = None) -> None:
+        if not self._background_tasks:
+            return
+
+        await asyncio.wait(set(self._background_tasks), timeout=timeout)
+
+        return
+
+    async def _acquire_rate_limit(self, message: Message) -> bool:
+        with trace_span("db.redis", "rate_limit"):
+            decision = await self.rate_limit_service.acquire(message.message_from.tuid, message.chat.id)
+
+        if not decision.is_allowed and decision.should_notify:
+            await self.bus_service.send_throttled_message(message.chat.id)
+
+        return decision.is_allowed
+
+    def _process_user(self, user: From) -> None:
+        self.user_service.buffer_user(user)
 
     async def _process_message_or_command(self, message: Message) -> bool:
         if not message.text:
             return False
 
         if not message.text.startswith(TelegramMessage.COMMAND_PREFIX):
-            self.logger.info(f"Received message without command: {message.text}")
+            self.logger.info("Received message without command: %s", message.text)
             return False
 
         match message.text:
             case TelegramMessage.START:
-                self.logger.info(f"Start message from @{message.chat.username}")
+                self.logger.info("Start message from @%s", message.chat.username)
                 return True
             case _ as unreachable:
-                self.logger.info(f"Received unknown command: {unreachable}")
+                self.logger.info("Received unknown command: %s", unreachable)
                 return False
 
     async def _process_message_location(self, message: Message) -> Location | None:
         if not message.location:
-            self.logger.info(f"Message is not <COMMAND>: {message.text} and without locations: {message.location}")
+            self.logger.info(
+                "Message is not <COMMAND>: %s and without locations: %s", message.text, message.location
+            )
             return None
 
         return message.location
 
-    async def _get_coffee_shops_for_city(self, city_name: str, user_name: str) -> abc.Sequence[CoffeeShop]:
-        if coffee_shops_from_rds := await self.kv_service.get_coffee_shops(city_name, user_name):
+    async def _find_nearby_coffee_shops(
+        self, city: CityModel, user_name: str, location: Location
+    ) -> abc.Sequence[CoffeeShop]:
+        city_name = city.name
+
+        # Both reads hit the same cache key, so they are sent together instead of one after another
+        with self._observe(HookStage.CACHE_GET):
+            async with asyncio.TaskGroup() as tg:
+                nearest_coffee_shops_task = tg.create_task(
+                    self.kv_service.get_nearest_coffee_shops(
+                        city_name=city_name,
+                        user_name=user_name,
+                        source_latitude=location.latitude,
+                        source_longitude=location.longitude,
+                    )
+                )
+                coffee_shops_task = tg.create_task(self.kv_service.get_coffee_shops(city_name, user_name))
+
+        if nearest_coffee_shops_from_rds := nearest_coffee_shops_task.result():
             self.logger.info(
-                f"Return coffee shops from cache for {user_name} in {city_name}",
-                extra={"city": city_name},
+                "Returning nearby coffee shops from cache for %s in %s", user_name, city_name, extra={"city": city_name}
             )
-            return coffee_shops_from_rds
+            return nearest_coffee_shops_from_rds[: self.default_quantity_for_response]
 
-        if coffee_shops_from_db := await self.shop_service.get_coffee_shops_for_city(city_name):
-            self.logger.info(f"Return coffee shops from db for {city_name}", extra={"city": city_name})
-            await self.kv_service.set_coffee_shops(city_name, user_name, coffee_shops_from_db)
+        coffee_shops = await self._get_coffee_shops_for_city(city, user_name, coffee_shops_task.result())
 
-            return coffee_shops_from_db
+        if not coffee_shops:
+            return []
 
-        return []
+        with self._observe(HookStage.DISTANCE_RANKING):
+            nearest_coffee_shops = await self.geo_service.find_nearest_coffee_shops(
+                source_latitude=location.latitude,
+                source_longitude=location.longitude,
+                coffee_shops=coffee_shops,
+                catalogue_key=await self._get_catalogue_key(city, len(coffee_shops)),
+            )
+        self.logger.info("Returning nearby coffee shops for %s", city_name, extra={"city": city_name})
 
-    async def _find_nearby_coffee_shops(
-        self, city_name: str, user_name: str, location: Location, coffee_shops: abc.Sequence[CoffeeShop]
+        return nearest_coffee_shops[: self.default_quantity_for_response]
+
+    async def _get_catalogue_key(self, city: CityModel, count: int) -> tuple[int, str] | None:
+        # Coordinates shared with the ranking pool are reused until the catalogue changes
+        if not self.geo_service.should_offload(count):
+            return None
+
+        version = await self.catalogue_service.get_version()
+
+        return city.id, version.etag
+
+    async def _get_coffee_shops_for_city(
+        self, city: CityModel, user_name: str, coffee_shops_from_rds: abc.Sequence[CoffeeShop]
     ) -> abc.Sequence[CoffeeShop]:
-        if nearest_coffee_shops_from_rds := await self.kv_service.get_nearest_coffee_shops(
-            city_name=city_name,
-            user_name=user_name,
-            source_latitude=location.latitude,
-            source_longitude=location.longitude,
-        ):
+        city_name = city.name
+
+        if coffee_shops_from_rds:
             self.logger.info(
-                f"Returning nearby coffee shops from cache for {user_name} in {city_name}",
-                extra={"city": city_name},
+                "Return coffee shops from cache for %s in %s", user_name, city_name, extra={"city": city_name}
             )
-            return nearest_coffee_shops_from_rds[: self.default_quantity_for_response]
+            return coffee_shops_from_rds
+
+        with self._observe(HookStage.DB_LOAD):
+            coffee_shops_from_db = await self.shop_service.get_coffee_shops_for_city_id(city.id)
 
-        if nearest_coffee_shops_from_db := await self.geo_service.find_nearest_coffee_shops(
-            source_latitude=location.latitude,
-            source_longitude=location.longitude,
-            coffee_shops=coffee_shops,
-        ):
-            self.logger.info(f"Returning nearby coffee shops from db for {city_name}", extra={"city": city_name})
-            return nearest_coffee_shops_from_db[: self.default_quantity_for_response]
+        if coffee_shops_from_db:
+            self.logger.info("Return coffee shops from db for %s", city_name, extra={"city": city_name})
+            self._run_in_background(self.kv_service.set_coffee_shops(city_name, user_name, coffee_shops_from_db))
+
+            return coffee_shops_from_db
 
         return []
 
@@ -133,3 +228,19 @@ class TelegramHookHandler:
             repr(result_or_error) for result_or_error in gathered_result if isinstance(result_or_error, Exception)
         }:
             self.logger.error("Errors occurred while sending nearest coffee shops messages", errors)
+
+    @contextmanager
+    def _observe(self, stage: HookStage) -> abc.Iterator[None]:
+        with observe_stage(stage), trace_span(STAGE_SPAN_OPS.get(stage, "hook.stage"), stage):
+            yield
+
+    def _run_in_background(self, coro: abc.Coroutine[t.Any, t.Any, t.Any]) -> None:
+        task = asyncio.create_task(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._on_background_task_done)
+
+    def _on_background_task_done(self, task: asyncio.Task[t.Any]) -> None:
+        self._background_tasks.discard(task)
+
+        if not task.cancelled() and (error := task.exception()) is not None:
+            self.logger.error("Background task failed", exc_info=error)
@@ -0,0 +1,88 @@
+import asyncio
+import dataclasses as dc
+import logging
+import typing as t
+from collections import abc
+from contextlib import suppress
+
+from .handle_telegram_hook import TelegramHookHandler
+from ..serializers.telegram import TelegramHookIn, get_update_type, parse_update
+from ..services.bus.service import BusService
+from ..services.runner.pool import KeyedTaskPool
+
+
+@dc.dataclass(slots=True, repr=False)
+class TelegramUpdatesPoller:
+    bus_service: BusService
+    hook_handler: TelegramHookHandler
+    task_pool: KeyedTaskPool
+
+    limit: int = 100
+    timeout: int = 25
+    error_pause: float = 5.0
+    logger: logging.Logger = dc.field(default_factory=lambda: logging.getLogger(__name__))
+
+    _offset: int | None = dc.field(default=None)
+    _task: asyncio.Task[None] | None = dc.field(default=None)
+
+    def start(self) -> None:
+        if self._task is not None:
+            return
+
+        self._task = asyncio.create_task(self.run_forever(), name="telegram-updates-poller")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+
+        self._task.cancel()
+
+        with suppress(asyncio.CancelledError):
+            await self._task
+
+        self._task = None
+
+        return
+
+    async def run_forever(self) -> None:
+        is_webhook_deleted = False
+
+        while True:
+            try:
+                # getUpdates is rejected by Telegram while a webhook is set, a failed call is retried with the polling
+                if not is_webhook_deleted:
+                    await self.bus_service.delete_webhook()
+                    is_webhook_deleted = True
+
+                await self.poll_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self.logger.exception("Failed to fetch telegram updates", extra={"offset": self._offset})
+                await asyncio.sleep(self.error_pause)
+
+    async def poll_once(self) -> int:
+        updates = await self.bus_service.get_updates(offset=self._offset, limit=self.limit, timeout=self.timeout)
+
+        for raw_update in updates:
+            # Telegram confirms every update below the offset on the next call, even the ones we skip
+            self._offset = int(raw_update["update_id"]) + 1
+
+            if (payload := self._parse_update(raw_update)) is None:
+                continue
+
+            if not await self.hook_handler.register_update(payload):
+                continue
+
+            await self.task_pool.submit(payload.message.chat.id, self.hook_handler.process_hook, payload=payload)
+
+        return len(updates)
+
+    def _parse_update(self, raw_update: abc.Mapping[str, t.Any]) -> TelegramHookIn | None:
+        if (payload := parse_update(raw_update)) is None:
+            self.logger.info(
+                "Skip unsupported telegram update",
+                extra={"update_id": raw_update.get("update_id"), "update_type": get_update_type(raw_update)},
+            )
+
+        return payload
@@ -1,28 +1,42 @@
+import asyncio
 import dataclasses as dc
+import logging
 import typing as t
 from asyncio import AbstractEventLoop
 from collections import abc
-from contextlib import asynccontextmanager
+from contextlib import AsyncExitStack, asynccontextmanager, suppress
 from functools import partial
 
 import aiohttp
-from authlib.integrations.starlette_client import OAuth
 from redis.asyncio.client import Redis
+from sqlalchemy import event, text
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, AsyncConnection, async_sessionmaker, create_async_engine
 
-from brew_scout.libs.admin.backends import AdminAuthenticationBackend
+from brew_scout.libs.domains.database import DisconnectStrategy
+from brew_scout.libs.domains.limits import RateLimit
+from brew_scout.libs.domains.telegram import IngestionMode
 from brew_scout.libs.handlers.handle_telegram_hook import TelegramHookHandler
+from brew_scout.libs.handlers.poll_telegram_updates import TelegramUpdatesPoller
 from brew_scout.libs.services.bus.client import TelegramClient
 from brew_scout.libs.services.bus.service import BusService
+from brew_scout.libs.services.catalogue import CatalogueService
 from brew_scout.libs.services.city import CityService
 from brew_scout.libs.services.geo.client import GeoClient
+from brew_scout.libs.services.geo.ranking import DistanceRanker
 from brew_scout.libs.services.geo.service import GeoService
+from brew_scout.libs.services.health import HealthService
 from brew_scout.libs.services.kv import KVService
+from brew_scout.libs.services.limits import RateLimitService
+from brew_scout.libs.services.runner.breaker import CircuitBreaker
+from brew_scout.libs.services.runner.pool import KeyedTaskPool
 from brew_scout.libs.services.runner.retry import RetryService
 from brew_scout.libs.services.runner.service import CommonRunnerService
 from brew_scout.libs.services.shop import CoffeeShopService
+from brew_scout.libs.services.updates import UpdateDeduplicationService
 from brew_scout.libs.services.user import UserService
 from brew_scout.libs.settings import AppSettings
+from brew_scout.libs.utils.metrics import DB_POOL_CHECKED_OUT_CONNECTIONS, DB_POOL_CHECKOUT_SECONDS
 
 
 from brew_scout.libs.dal.city import CityRepository
@@ -31,6 +45,9 @@ from brew_scout.libs.dal.models.shops import CityModel, CoffeeShopModel
 from brew_scout.libs.dal.models.users import UserModel
 from brew_scout.libs.dal.shop import CoffeeShopRepository
 
+if t.TYPE_CHECKING:
+    from brew_scout.libs.admin.backends import AdminAuthenticationBackend
+
 
 
 P = t.ParamSpec("P")
@@ -60,19 +77,114 @@ class RedisSessionManager:
         return self._client
 
 
+@dc.dataclass(slots=True)
+class DatabaseReplica:
+    engine: AsyncEngine
+    session_factory: async_sessionmaker[AsyncSession]
+    lag: float | None = dc.field(default=None)
+    is_available: bool = dc.field(default=True)
+
+
 @dc.dataclass(slots=True)
 class DatabaseSessionManager:
     _engine: AsyncEngine | None = dc.field(default=None)
     _session_factory: async_sessionmaker[AsyncSession] | None = dc.field(default=None)
+    _replicas: list[DatabaseReplica] = dc.field(default_factory=list)
+    _replica_cursor: int = dc.field(default=0)
+    _replica_monitor: asyncio.Task[None] | None = dc.field(default=None)
+    _is_warm: bool = dc.field(default=False)
+    max_replica_lag: float = dc.field(default=5.0)
+    logger: logging.Logger = dc.field(default_factory=lambda: logging.getLogger(__name__))
+
+    replica_lag_query: t.ClassVar[str] = (
+        "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+        "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+    )
 
     @classmethod
-    def init(cls, database_dsn: str, debug: bool = False) -> t.Self:
-        engine = create_async_engine(database_dsn, pool_pre_ping=True, echo=debug)
-        session_factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+    def init(
+        cls,
+        database_dsn: str,
+        debug: bool = False,
+        pool_size: int = 5,
+        max_overflow: int = 10,
+        pool_recycle: int = -1,
+        pool_timeout: float = 30.0,
+        disconnect_strategy: DisconnectStrategy = DisconnectStrategy.PESSIMISTIC,
+        statement_cache_size: int = 100,
+        replica_dsns: abc.Sequence[str] = (),
+        max_replica_lag: float = 5.0,
+    ) -> t.Self:
+        make_engine = partial(
+            cls._create_engine,
+            debug=debug,
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            pool_recycle=pool_recycle,
+            pool_timeout=pool_timeout,
+            disconnect_strategy=disconnect_strategy,
+            statement_cache_size=statement_cache_size,
+        )
+        engine = make_engine(database_dsn)
+        replicas = [
+            DatabaseReplica(engine=replica_engine, session_factory=cls._create_session_factory(replica_engine))
+            for replica_engine in map(make_engine, replica_dsns)
+        ]
+
+        return cls(
+            _engine=engine,
+            _session_factory=cls._create_session_factory(engine),
+            _replicas=replicas,
+            max_replica_lag=max_replica_lag,
+        )
+
+    @property
+    def is_warm(self) -> bool:
+        return self._is_warm
+
+    async def warm_up(self, size: int, timeout: float | None = None) -> None:
+        if self._engine is None:
+            raise IOError("DatabaseSessionManager: engine is not initialized")
+
+        # Connections are held together, so the pool has to open `size` of them at once
+        try:
+            async with asyncio.timeout(timeout), AsyncExitStack() as stack:
+                await asyncio.gather(*(stack.enter_async_context(self._engine.connect()) for _ in range(size)))
+        except (OSError, SQLAlchemyError):
+            self.logger.exception("Failed to warm up database connection pool", extra={"size": size})
+            return
+
+        self._is_warm = True
+
+        return
+
+    async def ping(self) -> None:
+        if self._engine is None:
+            raise IOError("DatabaseSessionManager: engine is not initialized")
 
-        return cls(_engine=engine, _session_factory=session_factory)
+        async with self._engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+
+    def start_replica_monitor(self, interval: float) -> None:
+        if not self._replicas or self._replica_monitor is not None:
+            return
+
+        self._replica_monitor = asyncio.create_task(self._monitor_replicas(interval), name="db-replica-monitor")
 
     async def close(self) -> None:
+        if self._replica_monitor is not None:
+            self._replica_monitor.cancel()
+
+            with suppress(asyncio.CancelledError):
+                await self._replica_monitor
+
+            self._replica_monitor = None
+
+        for replica in self._replicas:
+            await replica.engine.dispose()
+
+        self._replicas = []
+
         if self._engine is None:
             return
 
@@ -87,15 +199,19 @@ class DatabaseSessionManager:
         if self._session_factory is None:
             raise IOError("DatabaseSessionManager: session factory is not initialized")
 
-        session = self._session_factory()
-        try:
+        async with self._session(self._session_factory) as session:
+            yield session
+
+    @asynccontextmanager
+    async def read_session(self) -> abc.AsyncIterator[AsyncSession]:
+        if (replica := self._choose_replica()) is None:
+            async with self.session() as session:
+                yield session
+
+            return
+
+        async with self._session(replica.session_factory) as session:
             yield session
-            await session.commit()
-        except Exception:
-            await session.rollback()
-            raise
-        finally:
-            await session.close()
 
     @asynccontextmanager
     async def connection(self) -> abc.AsyncIterator[AsyncConnection]:
@@ -118,6 +234,82 @@ class DatabaseSessionManager:
 
         return self._engine
 
+    async def check_replicas(self) -> None:
+        for replica in self._replicas:
+            try:
+                async with replica.engine.connect() as connection:
+                    lag = await connection.scalar(text(self.replica_lag_query))
+            except (OSError, SQLAlchemyError):
+                self.logger.exception("Failed to check database replica")
+                replica.lag, replica.is_available = None, False
+                continue
+
+            replica.lag = float(lag) if lag is not None else None
+            replica.is_available = replica.lag is not None and replica.lag <= self.max_replica_lag
+
+    def _choose_replica(self) -> DatabaseReplica | None:
+        # Round robin over replicas which are not lagging behind, the primary is the fallback
+        for _ in range(len(self._replicas)):
+            replica = self._replicas[self._replica_cursor % len(self._replicas)]
+            self._replica_cursor += 1
+
+            if replica.is_available:
+                return replica
+
+        return None
+
+    async def _monitor_replicas(self, interval: float) -> None:
+        while True:
+            await self.check_replicas()
+            await asyncio.sleep(interval)
+
+    @staticmethod
+    @asynccontextmanager
+    async def _session(session_factory: async_sessionmaker[AsyncSession]) -> abc.AsyncIterator[AsyncSession]:
+        session = session_factory()
+        try:
+            with DB_POOL_CHECKOUT_SECONDS.time():
+                await session.connection()
+
+            yield session
+            await session.commit()
+        except Exception:
+            await session.rollback()
+            raise
+        finally:
+            await session.close()
+
+    @staticmethod
+    def _create_session_factory(engine: AsyncEngine) -> async_sessionmaker[AsyncSession]:
+        # Sessions are closed before repositories return the loaded objects, so they must not expire on commit
+        return async_sessionmaker(bind=engine, expire_on_commit=False)
+
+    @staticmethod
+    def _create_engine(
+        database_dsn: str,
+        debug: bool,
+        pool_size: int,
+        max_overflow: int,
+        pool_recycle: int,
+        pool_timeout: float,
+        disconnect_strategy: DisconnectStrategy,
+        statement_cache_size: int,
+    ) -> AsyncEngine:
+        engine = create_async_engine(
+            database_dsn,
+            echo=debug,
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            pool_recycle=pool_recycle,
+            pool_timeout=pool_timeout,
+            pool_pre_ping=disconnect_strategy == DisconnectStrategy.PESSIMISTIC,
+            connect_args={"statement_cache_size": statement_cache_size},
+        )
+        event.listen(engine.sync_engine, "checkout", lambda *_: DB_POOL_CHECKED_OUT_CONNECTIONS.inc())
+        event.listen(engine.sync_engine, "checkin", lambda *_: DB_POOL_CHECKED_OUT_CONNECTIONS.dec())
+
+        return engine
+
 
 @dc.dataclass(slots=True)
 class ClientSessionManager:
@@ -154,13 +346,17 @@ class ClientSessionManager:
 
 @dc.dataclass(slots=True)
 class OAuthClientManager:
-    _backend: AdminAuthenticationBackend | None = dc.field(default=None)
+    _backend: "AdminAuthenticationBackend | None" = dc.field(default=None)
     _client: t.Any | None = dc.field(default=None)
 
     @classmethod
     def init(
         cls, remote_app_name: str, client_id: str, client_secret: str, server_metadata_url: str, secret_key: str
     ) -> t.Self:
+        # authlib and sqladmin are only needed when the admin is served
+        from authlib.integrations.starlette_client import OAuth
+        from brew_scout.libs.admin.backends import AdminAuthenticationBackend
+
         oauth = OAuth()
         oauth.register(
             name=remote_app_name,
@@ -176,7 +372,7 @@ class OAuthClientManager:
 
         return cls(_client=client, _backend=AdminAuthenticationBackend(secret_key, client))
 
-    def get_backend(self) -> AdminAuthenticationBackend:
+    def get_backend(self) -> "AdminAuthenticationBackend":
         if self._backend is None:
             raise IOError("OAuthClientManager: backend is not initialized")
 
@@ -205,27 +401,57 @@ class ResourceProvider:
     database_session_manager: DatabaseSessionManager
     redis_session_manager: RedisSessionManager
     oauth_client_manager: OAuthClientManager
+    city_service: CityService
     coffee_shop_service: CoffeeShopService
+    catalogue_service: CatalogueService
+    health_service: HealthService
+    user_service: UserService
     telegram_hook_handler: TelegramHookHandler
+    telegram_updates_poller: TelegramUpdatesPoller | None
+    background_executor: KeyedTaskPool
+    distance_ranker: DistanceRanker
+    circuit_breakers: abc.Sequence[CircuitBreaker]
 
     @classmethod
     def init(cls, settings: AppSettings, running_loop: AbstractEventLoop) -> t.Self:
-        database_session_manager = DatabaseSessionManager.init(str(settings.database_dsn), settings.debug)
+        database_session_manager = DatabaseSessionManager.init(
+            str(settings.database_dsn),
+            settings.debug,
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_recycle=settings.db_pool_recycle,
+            pool_timeout=settings.db_pool_timeout,
+            disconnect_strategy=settings.db_disconnect_strategy,
+            statement_cache_size=settings.db_statement_cache_size,
+            replica_dsns=[str(replica_dsn) for replica_dsn in settings.database_replica_dsns],
+            max_replica_lag=settings.database_replica_max_lag,
+        )
         client_session_manager = ClientSessionManager.init(running_loop)
         redis_session_manager = RedisSessionManager.init(str(settings.redis_dsn))
-        oauth_client_manager = OAuthClientManager.init(
-            remote_app_name=settings.oauth_app_name,
-            client_id=settings.oauth_client_id,
-            client_secret=settings.oauth_client_secret,
-            server_metadata_url=str(settings.oauth_server_metadata_url),
-            secret_key=settings.secret_key,
-        )
+        # Processes which do not serve the admin keep the manager uninitialized and never import authlib
+        oauth_client_manager = OAuthClientManager()
+
+        if settings.serves_admin:
+            oauth_client_manager = OAuthClientManager.init(
+                remote_app_name=t.cast(str, settings.oauth_app_name),
+                client_id=t.cast(str, settings.oauth_client_id),
+                client_secret=t.cast(str, settings.oauth_client_secret),
+                server_metadata_url=str(settings.oauth_server_metadata_url),
+                secret_key=settings.secret_key,
+            )
+
+        telegram_circuit_breaker = cls._make_circuit_breaker("telegram", settings, TelegramClient.is_failure)
+        geo_circuit_breaker = cls._make_circuit_breaker("geocoder", settings, GeoService.is_failure)
 
         telegram_client = TelegramClient(
             api_url=f"{settings.telegram_api_url}/{settings.telegram_api_token}",
             client_session_getter=partial(client_session_manager.get_session),
+            circuit_breaker=telegram_circuit_breaker,
         )
         geo_client = GeoClient()
+        distance_ranker = DistanceRanker(
+            max_workers=settings.distance_ranking_workers, threshold=settings.distance_ranking_threshold
+        )
 
         common_runner_service = CommonRunnerService(retry_service=RetryService())
 
@@ -236,35 +462,111 @@ class ResourceProvider:
         city_service = CityService(
             city_repository=CityRepository(model=CityModel, session_manager=database_session_manager),
         )
-        shop_service = CoffeeShopService(
-            repository=CoffeeShopRepository(model=CoffeeShopModel, session_manager=database_session_manager)
-        )
+        shop_repository = CoffeeShopRepository(model=CoffeeShopModel, session_manager=database_session_manager)
+        shop_service = CoffeeShopService(repository=shop_repository)
         kv_service = KVService(client=redis_session_manager.get_client())
-        user_service = UserService(repository=UserRepository(model=UserModel, session_manager=database_session_manager))
+        catalogue_service = CatalogueService(
+            repository=shop_repository, kv_service=kv_service, expiration_time=settings.catalogue_version_ttl
+        )
+        user_service = UserService(
+            repository=UserRepository(model=UserModel, session_manager=database_session_manager),
+            flush_interval=settings.user_flush_interval_ms / 1000,
+            flush_batch_size=settings.user_flush_batch_size,
+            max_buffered_users=settings.user_buffer_size,
+            max_flush_attempts=settings.user_flush_max_attempts,
+        )
 
         telegram_hook_handler = TelegramHookHandler(
             bus_service=bus_service,
-            geo_service=GeoService(client=geo_client),
+            geo_service=GeoService(
+                client=geo_client, circuit_breaker=geo_circuit_breaker, distance_ranker=distance_ranker
+            ),
             city_service=city_service,
             shop_service=shop_service,
             kv_service=kv_service,
             user_service=user_service,
+            deduplication_service=UpdateDeduplicationService(
+                kv_service=kv_service, expiration_time=settings.update_deduplication_ttl
+            ),
+            rate_limit_service=RateLimitService(
+                kv_service=kv_service,
+                user_limit=RateLimit(settings.user_rate_limit_capacity, settings.user_rate_limit_refill_rate),
+                chat_limit=RateLimit(settings.chat_rate_limit_capacity, settings.chat_rate_limit_refill_rate),
+                notice_window=settings.rate_limit_notice_window,
+            ),
+            catalogue_service=catalogue_service,
         )
 
+        background_executor = KeyedTaskPool(
+            concurrency=settings.background_concurrency, max_pending=settings.background_queue_size
+        )
+        telegram_updates_poller = None
+
+        if settings.ingestion_mode == IngestionMode.POLLING and settings.serves_api:
+            telegram_updates_poller = TelegramUpdatesPoller(
+                bus_service=bus_service,
+                hook_handler=telegram_hook_handler,
+                task_pool=background_executor,
+                limit=settings.polling_limit,
+                timeout=settings.polling_timeout,
+            )
+
         return cls(
             settings=settings,
             client_session_manager=client_session_manager,
             database_session_manager=database_session_manager,
             redis_session_manager=redis_session_manager,
             oauth_client_manager=oauth_client_manager,
+            city_service=city_service,
             coffee_shop_service=shop_service,
+            catalogue_service=catalogue_service,
+            health_service=HealthService(
+                database_session_manager=database_session_manager,
+                redis_session_manager=redis_session_manager,
+                warm_up_size=min(settings.db_pool_warm_up_size, settings.db_pool_size),
+                timeout=settings.health_check_timeout,
+                cache_ttl=settings.health_cache_ttl,
+            ),
+            user_service=user_service,
             telegram_hook_handler=telegram_hook_handler,
+            telegram_updates_poller=telegram_updates_poller,
+            background_executor=background_executor,
+            distance_ranker=distance_ranker,
+            circuit_breakers=(telegram_circuit_breaker, geo_circuit_breaker),
         )
 
-    def start(self) -> None:
-        pass
+    @staticmethod
+    def _make_circuit_breaker(
+        name: str, settings: AppSettings, is_failure: abc.Callable[[Exception], bool]
+    ) -> CircuitBreaker:
+        return CircuitBreaker(
+            name=name,
+            failure_rate_threshold=settings.circuit_breaker_failure_rate,
+            window_size=settings.circuit_breaker_window_size,
+            minimum_calls=settings.circuit_breaker_minimum_calls,
+            open_timeout=settings.circuit_breaker_open_timeout,
+            is_failure=is_failure,
+        )
+
+    async def start(self) -> None:
+        await self.database_session_manager.warm_up(
+            size=min(self.settings.db_pool_warm_up_size, self.settings.db_pool_size),
+            timeout=self.settings.db_pool_timeout,
+        )
+        self.database_session_manager.start_replica_monitor(self.settings.database_replica_check_interval)
+        self.user_service.start()
+
+        if self.telegram_updates_poller is not None:
+            self.telegram_updates_poller.start()
 
     async def stop(self) -> None:
+        if self.telegram_updates_poller is not None:
+            await self.telegram_updates_poller.stop()
+
+        await self.background_executor.close(timeout=self.settings.background_drain_timeout)
+        await self.telegram_hook_handler.close()
+        self.distance_ranker.close()
+        await self.user_service.close()
         await self.database_session_manager.close()
         await self.redis_session_manager.close()
         await self.client_session_manager.close()
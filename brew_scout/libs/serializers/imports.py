@@ -0,0 +1,40 @@
+import typing as t
+
+from pydantic import AnyHttpUrl, BaseModel, ConfigDict, Field, field_validator
+
+
+class CoffeeShopImportIn(BaseModel):
+    model_config = ConfigDict(str_strip_whitespace=True)
+
+    country: str = Field(min_length=1)
+    city: str = Field(min_length=1)
+    name: str = Field(min_length=1)
+    web_url: AnyHttpUrl
+    latitude: float = Field(ge=-90, le=90)
+    longitude: float = Field(ge=-180, le=180)
+    city_min_latitude: float | None = Field(default=None, ge=-90, le=90)
+    city_max_latitude: float | None = Field(default=None, ge=-90, le=90)
+    city_min_longitude: float | None = Field(default=None, ge=-180, le=180)
+    city_max_longitude: float | None = Field(default=None, ge=-180, le=180)
+
+    @field_validator(
+        "city_min_latitude", "city_max_latitude", "city_min_longitude", "city_max_longitude", mode="before"
+    )
+    @classmethod
+    def empty_to_none(cls, value: t.Any) -> t.Any:
+        # Empty CSV cells mean the value is not set
+        return None if value == "" else value
+
+    def to_record(self) -> tuple[t.Any, ...]:
+        return (
+            self.country,
+            self.city,
+            self.name,
+            str(self.web_url),
+            self.latitude,
+            self.longitude,
+            self.city_min_latitude,
+            self.city_max_latitude,
+            self.city_min_longitude,
+            self.city_max_longitude,
+        )
@@ -1,7 +1,10 @@
-from pydantic import AnyHttpUrl
+import typing as t
+
+from pydantic import AnyHttpUrl, BaseModel, Field, field_validator
 
 from .cities import CityOut
 from .common import CommonOut
+from ..domains.shops import BoundingBox, CoffeeShopField, CoffeeShopsFilter, ExportFormat
 
 
 class CoffeeShopsOut(CommonOut):
@@ -11,3 +14,40 @@ class CoffeeShopsOut(CommonOut):
     longitude: float
     web_url: AnyHttpUrl
     city: CityOut
+
+
+class CoffeeShopsQueryIn(BaseModel):
+    after_id: int = Field(default=0, ge=0)
+    limit: int = Field(default=100, ge=1, le=1000)
+    city_id: int | None = Field(default=None)
+    country_id: int | None = Field(default=None)
+    bbox: BoundingBox | None = Field(default=None, description="min_latitude,min_longitude,max_latitude,max_longitude")
+    fields: list[CoffeeShopField] | None = Field(default=None)
+    stream: ExportFormat | None = Field(default=None)
+
+    @field_validator("bbox", mode="before")
+    @classmethod
+    def parse_bbox(cls, value: t.Any) -> t.Any:
+        if not isinstance(value, str):
+            return value
+
+        min_latitude, min_longitude, max_latitude, max_longitude = map(float, value.split(","))
+
+        return BoundingBox(min_latitude, min_longitude, max_latitude, max_longitude)
+
+    @field_validator("fields", mode="before")
+    @classmethod
+    def split_fields(cls, value: t.Any) -> t.Any:
+        # Both `fields=id,name` and `fields=id&fields=name` are accepted
+        if isinstance(value, str):
+            value = [value]
+
+        if isinstance(value, list):
+            return [field for item in value for field in str(item).split(",") if field]
+
+        return value
+
+    def to_filter(self) -> CoffeeShopsFilter:
+        return CoffeeShopsFilter(
+            after_id=self.after_id, city_id=self.city_id, country_id=self.country_id, bounding_box=self.bbox
+        )
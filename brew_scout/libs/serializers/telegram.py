@@ -1,5 +1,9 @@
-from pydantic import BaseModel, Field
+import typing as t
+from collections import abc
 
+from pydantic import BaseModel, Field, ValidationError
+
+from ..domains.telegram import TelegramUpdateType
 from ..utils.orj import orjson_dumps
 
 
@@ -14,19 +18,19 @@ class Location(CommonModel):
 
 class Chat(CommonModel):
     id: int
-    first_name: str | None
-    last_name: str | None
-    username: str
+    first_name: str | None = Field(default=None)
+    last_name: str | None = Field(default=None)
+    username: str | None = Field(default=None)
     type: str
 
 
 class From(CommonModel):
     tuid: int = Field(alias="id")
     is_bot: bool
-    first_name: str | None
-    last_name: str | None
-    username: str
-    language_code: str
+    first_name: str | None = Field(default=None)
+    last_name: str | None = Field(default=None)
+    username: str | None = Field(default=None)
+    language_code: str | None = Field(default=None)
 
 
 class Message(CommonModel):
@@ -34,7 +38,7 @@ class Message(CommonModel):
     message_from: From = Field(alias="from")
     chat: Chat
     date: int
-    text: str | None
+    text: str | None = Field(default=None)
     location: Location | None = Field(default=None)
 
 
@@ -43,6 +47,22 @@ class TelegramHookIn(CommonModel):
     message: Message
 
 
+def get_update_type(raw_update: abc.Mapping[str, t.Any]) -> str | None:
+    # Besides its id an update carries exactly one field, named after the update type
+    return next((key for key in raw_update if key != "update_id"), None)
+
+
+def parse_update(raw_update: abc.Mapping[str, t.Any]) -> TelegramHookIn | None:
+    # Updates of other types are never validated, so they cost a key lookup instead of a model
+    if get_update_type(raw_update) != TelegramUpdateType.MESSAGE:
+        return None
+
+    try:
+        return TelegramHookIn.model_validate(raw_update)
+    except ValidationError:
+        return None
+
+
 class Button(CommonModel):
     text: str
 
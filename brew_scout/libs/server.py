@@ -0,0 +1,106 @@
+import os
+import shutil
+import tempfile
+import typing as t
+
+from .domains.server import ServerSupervisor
+from .settings import AppSettings, SETTINGS_ENV
+
+
+# Same as utils.metrics, which is not imported here: prometheus_client picks its value class on import
+MULTIPROCESS_DIR_ENV = "PROMETHEUS_MULTIPROC_DIR"
+APP_FACTORY = "brew_scout.libs.setup_app:create_app"
+GUNICORN_WORKER = "brew_scout.libs.workers.ServerWorker"
+HTTP_PROTOCOL: t.Final[t.Literal["httptools"]] = "httptools"
+
+
+def run_server(settings: AppSettings) -> None:
+    # Workers build the app and their resources after the fork, this process only supervises them
+    os.environ[SETTINGS_ENV] = settings.model_dump_json()
+
+    metrics_dir = prepare_metrics_dir() if settings.workers > 1 else None
+
+    try:
+        if settings.supervisor == ServerSupervisor.GUNICORN:
+            run_gunicorn(settings)
+        else:
+            run_uvicorn(settings)
+    finally:
+        if metrics_dir is not None:
+            # Files of the previous run would be merged into the metrics of the next one
+            shutil.rmtree(metrics_dir, ignore_errors=True)
+            del os.environ[MULTIPROCESS_DIR_ENV]
+
+
+def run_uvicorn(settings: AppSettings) -> None:
+    import uvicorn
+
+    uvicorn.run(
+        APP_FACTORY,
+        factory=True,
+        host=settings.host,
+        port=settings.port,
+        workers=settings.workers,
+        loop=settings.event_loop.value,
+        http=HTTP_PROTOCOL,
+        backlog=settings.backlog,
+        timeout_keep_alive=settings.keep_alive_timeout,
+        limit_concurrency=settings.limit_concurrency,
+        timeout_graceful_shutdown=settings.graceful_timeout,
+    )
+
+
+def run_gunicorn(settings: AppSettings) -> None:
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError as e:
+        raise SystemExit("gunicorn supervisor requires the `gunicorn` package") from e
+
+    options = get_gunicorn_options(settings)
+
+    class ServerApplication(BaseApplication):  # type: ignore[misc]
+        def load_config(self) -> None:
+            for key, value in options.items():
+                self.cfg.set(key, value)
+
+        def load(self) -> t.Any:
+            # Workers load the app from the factory, so the master never holds app resources
+            from .setup_app import create_app
+
+            return create_app()
+
+    ServerApplication().run()
+
+
+def get_gunicorn_options(settings: AppSettings) -> dict[str, t.Any]:
+    return {
+        "bind": f"{settings.host}:{settings.port}",
+        "workers": settings.workers,
+        "worker_class": GUNICORN_WORKER,
+        "backlog": settings.backlog,
+        "keepalive": settings.keep_alive_timeout,
+        "graceful_timeout": settings.graceful_timeout,
+        # SIGHUP starts workers with the fresh code and stops the old ones once they are done
+        "preload_app": False,
+        "child_exit": on_worker_exit,
+    }
+
+
+def on_worker_exit(server: t.Any, worker: t.Any) -> None:
+    if MULTIPROCESS_DIR_ENV not in os.environ:
+        return
+
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)  # type: ignore[no-untyped-call]
+
+
+def prepare_metrics_dir() -> str | None:
+    # A directory given by the environment belongs to the operator, it is neither created nor removed here
+    if MULTIPROCESS_DIR_ENV in os.environ:
+        return None
+
+    # Set before the workers start, so every worker writes its metrics to files merged at scrape time
+    metrics_dir = os.environ[MULTIPROCESS_DIR_ENV] = tempfile.mkdtemp(prefix="brew-scout-metrics-")
+
+    return metrics_dir
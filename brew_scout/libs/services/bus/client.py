@@ -1,3 +1,4 @@
+import asyncio
 import dataclasses as dc
 import json
 import typing as t
@@ -11,6 +12,7 @@ from aiohttp import ClientSession
 from aiohttp.typedefs import StrOrURL
 
 from brew_scout import MODULE_NAME, VERSION
+from ..runner.breaker import CircuitBreaker
 
 
 @dc.dataclass(frozen=True, slots=True, repr=False)
@@ -20,6 +22,7 @@ class TelegramClient:
     _session: aiohttp.ClientSession = dc.field(init=False)
 
     default_timeout: float = 35.0
+    circuit_breaker: CircuitBreaker = dc.field(default_factory=lambda: CircuitBreaker(name="telegram"))
 
     def __post_init__(self) -> None:
         object.__setattr__(
@@ -36,7 +39,9 @@ class TelegramClient:
         await self._session.close()
 
     async def post(self, telegram_method: str, data: abc.Mapping[str, t.Any]) -> abc.Mapping[str, t.Any]:
-        return await self._json_request(HTTPMethod.POST, f"{self.api_url}/{telegram_method}", data)
+        return await self.circuit_breaker.call(
+            self._json_request, HTTPMethod.POST, f"{self.api_url}/{telegram_method}", data
+        )
 
     async def _json_request(self, method: str, url: StrOrURL, data: abc.Mapping[str, t.Any]) -> abc.Mapping[str, t.Any]:
         async with self._request(method, url, data) as response:
@@ -62,6 +67,14 @@ class TelegramClient:
 
             yield response
 
+    @staticmethod
+    def is_failure(error: Exception) -> bool:
+        # 4xx answers (blocked bot, unknown chat) mean that telegram itself is healthy
+        if isinstance(error, aiohttp.ClientResponseError):
+            return error.status >= 500 or error.status == 429
+
+        return isinstance(error, (aiohttp.ClientError, asyncio.TimeoutError))
+
     @staticmethod
     def _get_headers() -> abc.Mapping[str, str]:
         return {"User-Agent": f"{MODULE_NAME}/{VERSION}", "Accept": "application/json"}
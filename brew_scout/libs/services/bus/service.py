@@ -23,6 +23,11 @@ class BusService:
         data_to_sent = self._make_text_message_data(chat_id=chat_id, message=welcome_message, is_request_location=True)
         await self._send_text_message(data_to_sent)
 
+    async def send_throttled_message(self, chat_id: int) -> None:
+        throttled_message = "Easy there, you are sending messages too fast. Please try again in a minute."
+        data_to_sent = self._make_text_message_data(chat_id=chat_id, message=throttled_message)
+        await self._send_text_message(data_to_sent)
+
     async def send_empty_location_message(self, chat_id: int) -> None:
         error_message = "Sorry, but you need to share your location, use the button below for that message"
         data_to_sent = self._make_text_message_data(chat_id=chat_id, message=error_message)
@@ -60,6 +65,26 @@ class BusService:
         )
         await self._send_venue_message(data_to_sent)
 
+    def make_busy_reply(self, chat_id: int) -> abc.Mapping[str, t.Any]:
+        busy_message = "Sorry, I am a bit overloaded right now, please try again in a minute."
+        data_to_sent = self._make_text_message_data(chat_id=chat_id, message=busy_message)
+
+        # Telegram executes a method passed in the webhook response, so no extra request is made
+        return {"method": TelegramMethods.SEND_MESSAGE, **data_to_sent}
+
+    async def get_updates(self, offset: int | None, limit: int, timeout: int) -> abc.Sequence[abc.Mapping[str, t.Any]]:
+        data_to_sent: dict[str, t.Any] = {"limit": limit, "timeout": timeout, "allowed_updates": '["message"]'}
+
+        if offset is not None:
+            data_to_sent["offset"] = offset
+
+        response = await self.telegram_client.post(TelegramMethods.GET_UPDATES, data_to_sent)
+
+        return response.get("result", [])
+
+    async def delete_webhook(self) -> None:
+        await self.telegram_client.post(TelegramMethods.DELETE_WEBHOOK, {"drop_pending_updates": "false"})
+
     async def _send_text_message(self, sending_data: abc.Mapping[str, t.Any]) -> None:
         run_me = partial(self._send_message, telegram_method=TelegramMethods.SEND_MESSAGE, data=sending_data)
         await self.runner_service.run_with_retry(run_me)
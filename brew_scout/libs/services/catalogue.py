@@ -0,0 +1,41 @@
+import dataclasses as dc
+import logging
+
+from redis.exceptions import RedisError
+
+from .kv import KVService
+from ..dal.shop import CoffeeShopRepository
+from ..domains.shops import CatalogueVersion
+
+
+@dc.dataclass(frozen=True, slots=True, repr=False)
+class CatalogueService:
+    repository: CoffeeShopRepository
+    kv_service: KVService
+    # Bounds how long a version computed concurrently with an admin change can outlive the invalidation
+    expiration_time: int = 60
+    logger: logging.Logger = dc.field(default_factory=lambda: logging.getLogger(__name__))
+
+    async def get_version(self) -> CatalogueVersion:
+        try:
+            if (version := await self.kv_service.get_catalogue_version()) is not None:
+                return version
+        except RedisError:
+            self.logger.exception("Failed to get catalogue version from cache")
+            return await self.repository.get_catalogue_version()
+
+        # The cached version is gone after an admin change, a lagging replica would cache the old one again
+        version = await self.repository.get_catalogue_version(from_primary=True)
+
+        try:
+            await self.kv_service.set_catalogue_version(version, self.expiration_time)
+        except RedisError:
+            self.logger.exception("Failed to cache catalogue version")
+
+        return version
+
+    async def invalidate(self) -> None:
+        try:
+            await self.kv_service.forget_catalogue_version()
+        except RedisError:
+            self.logger.exception("Failed to invalidate catalogue version")
@@ -1,25 +1,37 @@
 import dataclasses as dc
 import typing as t
 from collections import abc
-
-from geopy.adapters import AioHTTPAdapter
-from geopy.geocoders import Nominatim
-from geopy.distance import distance, Distance
+from functools import cache
 
 from brew_scout import MODULE_NAME, VERSION
 
+if t.TYPE_CHECKING:
+    from geopy.distance import Distance
+    from geopy.geocoders import Nominatim
+
 
 P = t.ParamSpec("P")
 
 
+@cache
+def _get_distance() -> abc.Callable[..., "Distance"]:
+    # geopy pulls every geocoder in on import, so it is loaded on the first use instead of the app start
+    from geopy.distance import distance
+
+    return distance
+
+
 @dc.dataclass(frozen=True, slots=True)
 class GeoClient:
-    def __call__(self, *args: P.args, **kwargs: P.kwargs) -> Nominatim:
+    def __call__(self, *args: P.args, **kwargs: P.kwargs) -> "Nominatim":
+        from geopy.adapters import AioHTTPAdapter
+        from geopy.geocoders import Nominatim
+
         return Nominatim(user_agent=self._get_user_agent(), adapter_factory=AioHTTPAdapter)
 
     @staticmethod
-    def calculate_distance(from_coordinates: abc.Sequence[float], to_coordinates: abc.Sequence[float]) -> Distance:
-        return distance(from_coordinates, to_coordinates)
+    def calculate_distance(from_coordinates: abc.Sequence[float], to_coordinates: abc.Sequence[float]) -> "Distance":
+        return _get_distance()(from_coordinates, to_coordinates)
 
     @staticmethod
     def _get_user_agent() -> str:
@@ -0,0 +1,159 @@
+import asyncio
+import dataclasses as dc
+import logging
+import multiprocessing as mp
+import typing as t
+from array import array
+from collections import abc
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing.shared_memory import SharedMemory
+
+from .client import GeoClient
+from ...domains.shops import CoffeeShop
+
+
+Coordinates = tuple[float, float]
+_TYPE_CODE: t.Final = "d"
+_ITEM_SIZE = array(_TYPE_CODE).itemsize
+
+# Segments attached by a pool worker, they are kept open for the next calls with the same city
+_attached_segments: dict[str, SharedMemory] = {}
+
+
+def measure_distances(source: Coordinates, coordinates: abc.Sequence[float]) -> list[float]:
+    # Coordinates are flat: latitude and longitude of every shop one after another
+    return [
+        float(GeoClient.calculate_distance(source, (coordinates[i], coordinates[i + 1])).kilometers)
+        for i in range(0, len(coordinates), 2)
+    ]
+
+
+def measure_shared_distances(source: Coordinates, segment_name: str, count: int, max_attached: int) -> list[float]:
+    if (segment := _attached_segments.pop(segment_name, None)) is None:
+        segment = SharedMemory(name=segment_name)
+
+    _attached_segments[segment_name] = segment
+
+    while len(_attached_segments) > max_attached:
+        _attached_segments.pop(next(iter(_attached_segments))).close()
+
+    buf = segment.buf
+    assert buf is not None
+
+    # The segment can be rounded up to the page size, so only the written part is read
+    with buf[: count * 2 * _ITEM_SIZE] as raw, raw.cast(_TYPE_CODE) as coordinates:
+        return measure_distances(source, coordinates)
+
+
+def flatten_coordinates(coffee_shops: abc.Sequence[CoffeeShop]) -> "array[float]":
+    # Coordinates are flat: latitude and longitude of every shop one after another
+    return array(_TYPE_CODE, (value for cs in coffee_shops for value in (cs.latitude, cs.longitude)))
+
+
+@dc.dataclass(frozen=True, slots=True)
+class SharedCoordinates:
+    memory: SharedMemory
+    # Distances are matched with the shops the segment was written from, the order of a request can differ
+    coffee_shops: abc.Sequence[CoffeeShop]
+
+    def close(self) -> None:
+        self.memory.close()
+        self.memory.unlink()
+
+
+@dc.dataclass(slots=True, repr=False)
+class DistanceRanker:
+    max_workers: int = 0
+    threshold: int = 500
+    max_segments: int = 32
+    logger: logging.Logger = dc.field(default_factory=lambda: logging.getLogger(__name__))
+
+    _executor: ProcessPoolExecutor | None = dc.field(init=False, default=None)
+    _segments: dict[abc.Hashable, SharedCoordinates] = dc.field(init=False, default_factory=dict)
+
+    def should_offload(self, count: int) -> bool:
+        return self.max_workers > 0 and count >= self.threshold
+
+    async def measure(
+        self, source: Coordinates, coffee_shops: abc.Sequence[CoffeeShop], key: abc.Hashable | None = None
+    ) -> tuple[abc.Sequence[CoffeeShop], list[float]]:
+        loop = asyncio.get_running_loop()
+
+        # Without a catalogue key there is nothing to tell a changed city from the shared one, coordinates are sent
+        if key is None:
+            flat_coordinates = flatten_coordinates(coffee_shops)
+
+            try:
+                return coffee_shops, await loop.run_in_executor(
+                    self._get_executor(), measure_distances, source, flat_coordinates
+                )
+            except BrokenProcessPool:
+                self._drop_broken_executor(len(coffee_shops))
+                return coffee_shops, measure_distances(source, flat_coordinates)
+
+        segment = self._get_segment((key, len(coffee_shops)), coffee_shops)
+        shared_coffee_shops = segment.coffee_shops
+
+        try:
+            try:
+                return shared_coffee_shops, await loop.run_in_executor(
+                    self._get_executor(),
+                    measure_shared_distances,
+                    source,
+                    segment.memory.name,
+                    len(shared_coffee_shops),
+                    self.max_segments,
+                )
+            except FileNotFoundError:
+                # Other cities pushed the segment out before the worker attached it, the coordinates are sent instead
+                return shared_coffee_shops, await loop.run_in_executor(
+                    self._get_executor(), measure_distances, source, flatten_coordinates(shared_coffee_shops)
+                )
+        except BrokenProcessPool:
+            self._drop_broken_executor(len(shared_coffee_shops))
+            return shared_coffee_shops, measure_distances(source, flatten_coordinates(shared_coffee_shops))
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+        # Workers which still read a segment keep their mapping, unlink only removes the name
+        for segment in self._segments.values():
+            segment.close()
+
+        self._segments.clear()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # Forking a process with a running event loop and logging threads is unsafe
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=mp.get_context("spawn"))
+
+        return self._executor
+
+    def _drop_broken_executor(self, count: int) -> None:
+        self.logger.exception("Distance ranking pool is broken, measure inline", extra={"count": count})
+
+        # The broken pool still holds its management thread and queues until it is shut down
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _get_segment(self, key: abc.Hashable, coffee_shops: abc.Sequence[CoffeeShop]) -> SharedCoordinates:
+        # A changed catalogue comes with a new key, so coordinates are only flattened for a new segment
+        if (segment := self._segments.pop(key, None)) is None:
+            values = flatten_coordinates(coffee_shops)
+            memory = SharedMemory(create=True, size=max(len(values) * values.itemsize, 1))
+            buf = memory.buf
+            assert buf is not None
+
+            buf[: len(values) * values.itemsize] = values.tobytes()
+            segment = SharedCoordinates(memory=memory, coffee_shops=tuple(coffee_shops))
+
+        self._segments[key] = segment
+
+        while len(self._segments) > self.max_segments:
+            self._segments.pop(next(iter(self._segments))).close()
+
+        return segment
@@ -1,8 +1,14 @@
+import asyncio
 import dataclasses as dc
 import typing as t
 from collections import abc
+from operator import attrgetter
+
+import aiohttp
 
 from .client import GeoClient
+from .ranking import DistanceRanker
+from ..runner.breaker import CircuitBreaker
 from ...serializers.geo import NominatimResponseIn
 from ...domains.shops import CoffeeShop
 
@@ -11,25 +17,37 @@ from ...domains.shops import CoffeeShop
 class GeoService:
     client: GeoClient
     default_language: str = "en"
+    circuit_breaker: CircuitBreaker = dc.field(default_factory=lambda: CircuitBreaker(name="geocoder"))
+    distance_ranker: DistanceRanker = dc.field(default_factory=DistanceRanker)
+
+    def should_offload(self, count: int) -> bool:
+        return self.distance_ranker.should_offload(count)
 
     async def find_nearest_coffee_shops(
-        self, source_latitude: float, source_longitude: float, coffee_shops: abc.Sequence[CoffeeShop]
+        self,
+        source_latitude: float,
+        source_longitude: float,
+        coffee_shops: abc.Sequence[CoffeeShop],
+        catalogue_key: abc.Hashable | None = None,
     ) -> abc.Sequence[CoffeeShop]:
-        coffee_shops_with_distance = {}
+        source = (source_latitude, source_longitude)
 
-        for cs in coffee_shops:
-            distance = self.client.calculate_distance((source_latitude, source_longitude), (cs.latitude, cs.longitude))
-            coffee_shops_with_distance[float(distance.kilometers)] = cs
+        # Big cities would block the event loop for every other update, they are measured in the process pool
+        if self.distance_ranker.should_offload(len(coffee_shops)):
+            coffee_shops, distances = await self.distance_ranker.measure(source, coffee_shops, catalogue_key)
+        else:
+            distances = [
+                float(self.client.calculate_distance(source, (cs.latitude, cs.longitude)).kilometers)
+                for cs in coffee_shops
+            ]
 
-        sorted_distances = sorted(coffee_shops_with_distance.keys())
-        result = []
+        # Shops can be cached and shared between requests, so a copy carries the distance
+        coffee_shops_with_distance = [
+            CoffeeShop(cs.name, cs.latitude, cs.longitude, cs.web_url, distance)
+            for cs, distance in zip(coffee_shops, distances)
+        ]
 
-        for k in sorted_distances:
-            cs = coffee_shops_with_distance[k]
-            cs.distance = k
-            result.append(cs.dict())
-
-        return [CoffeeShop(**data) for data in result]
+        return sorted(coffee_shops_with_distance, key=attrgetter("distance"))
 
     async def find_city_from_coordinates(self, latitude: float, longitude: float) -> abc.Sequence[float]:
         raw_result = await self._request(latitude, longitude)
@@ -37,7 +55,19 @@ class GeoService:
 
         return result.boundingbox
 
+    @staticmethod
+    def is_failure(error: Exception) -> bool:
+        from geopy.exc import GeocoderQueryError, GeocoderServiceError
+
+        if isinstance(error, GeocoderQueryError):
+            return False
+
+        return isinstance(error, (GeocoderServiceError, aiohttp.ClientError, asyncio.TimeoutError))
+
     async def _request(self, latitude: float, longitude: float) -> abc.Mapping[str, t.Any]:
+        return await self.circuit_breaker.call(self._reverse, latitude, longitude)
+
+    async def _reverse(self, latitude: float, longitude: float) -> abc.Mapping[str, t.Any]:
         async with self.client() as geolocator:
             location = await geolocator.reverse((latitude, longitude), language=self.default_language)
 
@@ -0,0 +1,74 @@
+import asyncio
+import dataclasses as dc
+import logging
+import time
+import typing as t
+from collections import abc
+
+from ..domains.health import HealthCheck, HealthReport
+
+if t.TYPE_CHECKING:
+    from ..managers import DatabaseSessionManager, RedisSessionManager
+
+
+@dc.dataclass(slots=True, repr=False)
+class HealthService:
+    database_session_manager: "DatabaseSessionManager"
+    redis_session_manager: "RedisSessionManager"
+    warm_up_size: int = 2
+    timeout: float = 1.0
+    # Probes from every balancer share one check per period, so they never multiply the load on the datastores
+    cache_ttl: float = 3.0
+    clock: abc.Callable[[], float] = dc.field(default=time.monotonic)
+    logger: logging.Logger = dc.field(default_factory=lambda: logging.getLogger(__name__))
+
+    _report: HealthReport | None = dc.field(init=False, default=None)
+    _lock: asyncio.Lock = dc.field(init=False, default_factory=asyncio.Lock)
+
+    async def get_report(self) -> HealthReport:
+        if self._is_fresh(self._report):
+            return t.cast(HealthReport, self._report)
+
+        async with self._lock:
+            # Another probe could have refreshed the report while this one waited for the lock
+            if self._is_fresh(self._report):
+                return t.cast(HealthReport, self._report)
+
+            self._report = await self.check()
+
+        return self._report
+
+    async def check(self) -> HealthReport:
+        checks = {
+            HealthCheck.POSTGRES: self._check_postgres,
+            HealthCheck.REDIS: self._check_redis,
+            HealthCheck.WARM_UP: self._check_warm_up,
+        }
+        results = await asyncio.gather(*(self._run_check(name, check) for name, check in checks.items()))
+
+        return HealthReport(checks=dict(zip(checks, results)), checked_at=self.clock())
+
+    def _is_fresh(self, report: HealthReport | None) -> bool:
+        return report is not None and self.clock() - report.checked_at < self.cache_ttl
+
+    async def _run_check(self, name: HealthCheck, check: abc.Callable[[], abc.Awaitable[bool]]) -> bool:
+        try:
+            async with asyncio.timeout(self.timeout):
+                return await check()
+        except Exception:
+            self.logger.warning("Health check %s failed", name, exc_info=True, extra={"check": name})
+            return False
+
+    async def _check_postgres(self) -> bool:
+        await self.database_session_manager.ping()
+        return True
+
+    async def _check_redis(self) -> bool:
+        return bool(await self.redis_session_manager.get_client().ping())
+
+    async def _check_warm_up(self) -> bool:
+        # A worker started while the database was down warms its pool up once the database is back
+        if not self.database_session_manager.is_warm:
+            await self.database_session_manager.warm_up(size=self.warm_up_size, timeout=self.timeout)
+
+        return self.database_session_manager.is_warm
@@ -0,0 +1,73 @@
+import dataclasses as dc
+import itertools
+import logging
+import typing as t
+from collections import abc
+from pathlib import Path
+
+from pydantic import TypeAdapter, ValidationError
+from redis.exceptions import RedisError
+
+from .catalogue import CatalogueService
+from .kv import KVService
+from ..dal.imports import CatalogueImportRepository
+from ..domains.shops import CatalogueImportStats
+from ..serializers.imports import CoffeeShopImportIn
+from ..utils.readers import read_records
+
+
+RECORDS_ADAPTER = TypeAdapter(list[CoffeeShopImportIn])
+
+
+@dc.dataclass(frozen=True, slots=True, repr=False)
+class CatalogueImportService:
+    repository: CatalogueImportRepository
+    kv_service: KVService
+    catalogue_service: CatalogueService
+    batch_size: int = 5000
+    logger: logging.Logger = dc.field(default_factory=lambda: logging.getLogger(__name__))
+
+    async def import_file(self, path: Path) -> CatalogueImportStats:
+        rejected = 0
+
+        async def batches() -> abc.AsyncIterator[abc.Sequence[tuple[t.Any, ...]]]:
+            nonlocal rejected
+
+            records = read_records(path)
+
+            while raw_batch := list(itertools.islice(records, self.batch_size)):
+                coffee_shops, rejected_in_batch = self._validate_batch(raw_batch)
+                rejected += rejected_in_batch
+
+                if coffee_shops:
+                    yield [cs.to_record() for cs in coffee_shops]
+
+        stats = dc.replace(await self.repository.import_coffee_shops(batches()), rejected=rejected)
+        self.logger.info(
+            "Imported coffee shops from %s", path.name, extra=dc.asdict(stats) | {"cities": len(stats.cities)}
+        )
+        await self._invalidate_caches(stats)
+
+        return stats
+
+    def _validate_batch(self, raw_batch: abc.Sequence[t.Any]) -> tuple[abc.Sequence[CoffeeShopImportIn], int]:
+        # The whole batch goes through pydantic at once, rows are looked at one by one only when some are broken
+        try:
+            return RECORDS_ADAPTER.validate_python(raw_batch), 0
+        except ValidationError as e:
+            errors = e.errors(include_url=False, include_context=False)
+
+        invalid_rows = {error["loc"][0] for error in errors}
+        self.logger.warning("Skip %d invalid rows", len(invalid_rows), extra={"errors": errors[:10]})
+        valid_rows = [row for position, row in enumerate(raw_batch) if position not in invalid_rows]
+
+        return RECORDS_ADAPTER.validate_python(valid_rows), len(invalid_rows)
+
+    async def _invalidate_caches(self, stats: CatalogueImportStats) -> None:
+        await self.catalogue_service.invalidate()
+
+        for city_name in stats.cities:
+            try:
+                await self.kv_service.forget_coffee_shops(city_name)
+            except RedisError:
+                self.logger.exception("Failed to drop cached coffee shops for %s", city_name)
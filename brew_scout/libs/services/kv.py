@@ -1,28 +1,75 @@
 import dataclasses as dc
+import datetime as dt
 import typing as t
 from collections import abc
 
 from redis.asyncio.client import Redis
+from redis.commands.core import AsyncScript
 
-from ..domains.shops import CoffeeShop
+from ..domains.limits import RateLimit, RateLimitScope
+from ..domains.shops import CatalogueVersion, CoffeeShop
+from ..utils.metrics import observe_cache
+
+
+# KEYS are the buckets, ARGV holds the capacity and the refill rate per second of every bucket.
+# A token is taken from every bucket or from none, the result is how long to wait for the next one.
+TOKEN_BUCKET_SCRIPT = """
+local time = redis.call("TIME")
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local tokens = {}
+local retry_after = 0
+
+for i, key in ipairs(KEYS) do
+    local capacity, refill_rate = tonumber(ARGV[i * 2 - 1]), tonumber(ARGV[i * 2])
+    local bucket = redis.call("HMGET", key, "tokens", "updated_at")
+    local elapsed = math.max(0, now - (tonumber(bucket[2]) or now))
+    tokens[i] = math.min(capacity, (tonumber(bucket[1]) or capacity) + elapsed * refill_rate)
+
+    if tokens[i] < 1 then
+        retry_after = math.max(retry_after, (1 - tokens[i]) / refill_rate)
+    end
+end
+
+for i, key in ipairs(KEYS) do
+    local capacity, refill_rate = tonumber(ARGV[i * 2 - 1]), tonumber(ARGV[i * 2])
+
+    if retry_after == 0 then
+        tokens[i] = tokens[i] - 1
+    end
+
+    redis.call("HSET", key, "tokens", tostring(tokens[i]), "updated_at", tostring(now))
+    redis.call("EXPIRE", key, math.ceil(capacity / refill_rate) + 1)
+end
+
+return tostring(retry_after)
+"""
 
 
 @dc.dataclass(slots=True, repr=True, frozen=True)
 class KVService:
     client: Redis
+    _token_bucket_script: AsyncScript = dc.field(init=False, repr=False)
     locations_key = "shops:{city}:{user}:locations"
+    seen_update_key = "updates:{update_id}:seen"
+    catalogue_version_key = "catalogue:version"
+    rate_limit_key = "limits:{scope}:{id}"
+    throttle_notice_key = "limits:chat:{id}:notified"
+
+    def __post_init__(self) -> None:
+        # The digest of the script is computed once, every call sends only the digest while redis knows it
+        object.__setattr__(self, "_token_bucket_script", self.client.register_script(TOKEN_BUCKET_SCRIPT))
 
     async def get_coffee_shops(self, city_name: str, user_name: str) -> abc.Sequence[CoffeeShop]:
         cursor, result = await self.client.zscan(
             name=self.locations_key.format(city=city_name.lower(), user=user_name.lower())
         )
 
+        observe_cache("coffee_shops", is_hit=bool(result))
+
         if not result:
             return []
 
-        parsed_result = self._parse_zscan_result(result)
-
-        return [CoffeeShop.model_validate(data) for data in parsed_result]
+        return self._parse_zscan_result(result)
 
     async def set_coffee_shops(
         self, city_name: str, user_name: str, coffee_shops: abc.Sequence[CoffeeShop], expiration_time: int = 600
@@ -39,46 +86,93 @@ class KVService:
 
         return
 
+    async def forget_coffee_shops(self, city_name: str) -> None:
+        # Coffee shops are cached per user, so every key of the city goes
+        pattern = self.locations_key.format(city=city_name.lower(), user="*")
+        keys = [key async for key in self.client.scan_iter(match=pattern, count=1000)]
+
+        if keys:
+            await self.client.unlink(*keys)
+
     async def get_nearest_coffee_shops(
         self, city_name: str, user_name: str, source_latitude: float, source_longitude: float, radius: int = 1000
     ) -> abc.Sequence[CoffeeShop]:
-        if not (
-            geosearch_result := await self.client.geosearch(
-                name=self.locations_key.format(city=city_name.lower(), user=user_name.lower()),
-                latitude=source_latitude,
-                longitude=source_longitude,
-                radius=radius,
-                withcoord=True,
-                withdist=True,
-                sort="ASC",
-            )
-        ):
+        geosearch_result = await self.client.geosearch(
+            name=self.locations_key.format(city=city_name.lower(), user=user_name.lower()),
+            latitude=source_latitude,
+            longitude=source_longitude,
+            radius=radius,
+            withcoord=True,
+            withdist=True,
+            sort="ASC",
+        )
+        observe_cache("nearest_coffee_shops", is_hit=bool(geosearch_result))
+
+        if not geosearch_result:
             return []
 
-        parsed_result = self._parse_geosearch_result(geosearch_result)
+        return self._parse_geosearch_result(geosearch_result)
 
-        return [CoffeeShop(**data) for data in parsed_result]
+    async def mark_update_as_seen(self, update_id: int, expiration_time: int = 3600) -> bool:
+        result = await self.client.set(
+            name=self.seen_update_key.format(update_id=update_id), value=1, nx=True, ex=expiration_time
+        )
+
+        return bool(result)
+
+    async def forget_update(self, update_id: int) -> None:
+        await self.client.delete(self.seen_update_key.format(update_id=update_id))
+
+    async def take_tokens(self, buckets: abc.Mapping[tuple[RateLimitScope, int], RateLimit]) -> float:
+        keys = [self.rate_limit_key.format(scope=scope, id=bucket_id) for scope, bucket_id in buckets]
+        args = [value for limit in buckets.values() for value in (limit.capacity, limit.refill_rate)]
+        result = await self._token_bucket_script(keys=keys, args=args)
+
+        return float(result)
+
+    async def mark_throttle_notified(self, chat_id: int, expiration_time: int = 60) -> bool:
+        result = await self.client.set(
+            name=self.throttle_notice_key.format(id=chat_id), value=1, nx=True, ex=expiration_time
+        )
+
+        return bool(result)
+
+    async def get_catalogue_version(self) -> CatalogueVersion | None:
+        result = await self.client.get(self.catalogue_version_key)
+        observe_cache("catalogue_version", is_hit=result is not None)
+
+        if result is None:
+            return None
+
+        rows, _, updated_at = result.partition(":")
+
+        return CatalogueVersion(
+            rows=int(rows), updated_at=dt.datetime.fromisoformat(updated_at) if updated_at else None
+        )
+
+    async def set_catalogue_version(self, version: CatalogueVersion, expiration_time: int = 60) -> None:
+        updated_at = version.updated_at.isoformat() if version.updated_at else ""
+        await self.client.set(self.catalogue_version_key, f"{version.rows}:{updated_at}", ex=expiration_time)
+
+    async def forget_catalogue_version(self) -> None:
+        await self.client.delete(self.catalogue_version_key)
 
     @staticmethod
-    def _parse_zscan_result(result: abc.Sequence[t.Tuple[str, float]]) -> abc.Sequence[abc.Mapping[str, t.Any]]:
+    def _parse_zscan_result(result: abc.Sequence[t.Tuple[str, float]]) -> abc.Sequence[CoffeeShop]:
         return [
-            {"name": name, "latitude": latitude, "longitude": longitude, "web_url": web_url}
+            CoffeeShop(name=name, latitude=float(latitude), longitude=float(longitude), web_url=web_url)
             for member, score in result
-            for name, longitude, latitude, web_url in [member.split(":", 3)]
+            for name, latitude, longitude, web_url in [member.split(":", 3)]
         ]
 
     @staticmethod
     def _parse_geosearch_result(
         result: abc.Sequence[t.Tuple[str, float, t.Tuple[float, float]]]
-    ) -> abc.Sequence[abc.Mapping[str, t.Any]]:
+    ) -> abc.Sequence[CoffeeShop]:
         return [
-            {
-                "name": name,
-                "distance": distance,
-                "latitude": coordinates[1],
-                "longitude": coordinates[0],
-                "web_url": web_url,
-            }
+            CoffeeShop(
+                name=name, latitude=coordinates[1], longitude=coordinates[0], web_url=web_url, distance=distance
+            )
             for key, distance, coordinates in result
             for name, _, _, web_url in [key.split(":", 3)]
         ]
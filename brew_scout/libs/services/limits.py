@@ -0,0 +1,61 @@
+import dataclasses as dc
+import logging
+import time
+from collections import abc
+
+from redis.exceptions import RedisError
+
+from .kv import KVService
+from ..domains.limits import RateLimit, RateLimitDecision, RateLimitScope
+
+
+@dc.dataclass(slots=True, repr=False)
+class RateLimitService:
+    kv_service: KVService
+    user_limit: RateLimit = dc.field(default_factory=lambda: RateLimit(capacity=10, refill_rate=0.5))
+    chat_limit: RateLimit = dc.field(default_factory=lambda: RateLimit(capacity=20, refill_rate=1.0))
+    notice_window: int = 60
+    max_tracked_senders: int = 10_000
+    clock: abc.Callable[[], float] = dc.field(default=time.monotonic)
+    logger: logging.Logger = dc.field(default_factory=lambda: logging.getLogger(__name__))
+
+    _blocked_until: dict[tuple[int, int], float] = dc.field(init=False, default_factory=dict)
+
+    async def acquire(self, user_id: int, chat_id: int) -> RateLimitDecision:
+        now, sender = self.clock(), (user_id, chat_id)
+
+        # A sender over the limit is answered from memory until its buckets could have refilled
+        if (blocked_until := self._blocked_until.get(sender, 0.0)) > now:
+            return RateLimitDecision(is_allowed=False, retry_after=blocked_until - now)
+
+        buckets = {(RateLimitScope.USER, user_id): self.user_limit, (RateLimitScope.CHAT, chat_id): self.chat_limit}
+
+        try:
+            retry_after = await self.kv_service.take_tokens(buckets)
+        except RedisError:
+            self.logger.exception("Failed to take rate limit tokens", extra={"user_id": user_id, "chat_id": chat_id})
+            return RateLimitDecision(is_allowed=True)
+
+        if retry_after <= 0:
+            self._blocked_until.pop(sender, None)
+            return RateLimitDecision(is_allowed=True)
+
+        self._block(sender, now + retry_after)
+        self.logger.info("Throttle sender", extra={"user_id": user_id, "chat_id": chat_id, "retry_after": retry_after})
+
+        return RateLimitDecision(is_allowed=False, retry_after=retry_after, should_notify=await self._notify(chat_id))
+
+    def _block(self, sender: tuple[int, int], blocked_until: float) -> None:
+        self._blocked_until.pop(sender, None)
+        self._blocked_until[sender] = blocked_until
+
+        while len(self._blocked_until) > self.max_tracked_senders:
+            del self._blocked_until[next(iter(self._blocked_until))]
+
+    async def _notify(self, chat_id: int) -> bool:
+        # Every worker can throttle the same chat, the key makes sure the chat gets one reply per window
+        try:
+            return await self.kv_service.mark_throttle_notified(chat_id, self.notice_window)
+        except RedisError:
+            self.logger.exception("Failed to mark throttled chat as notified", extra={"chat_id": chat_id})
+            return False
@@ -0,0 +1,131 @@
+import dataclasses as dc
+import logging
+import time
+import typing as t
+from collections import abc, deque
+from enum import StrEnum
+
+
+T = t.TypeVar("T")
+
+
+class CircuitState(StrEnum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    def __init__(self, name: str, retry_after: float):
+        self.name = name
+        self.retry_after = retry_after
+        super().__init__(f"Circuit {name} is open, retry after {retry_after:.1f}s")
+
+
+@dc.dataclass(slots=True, repr=False)
+class CircuitBreaker:
+    name: str
+    failure_rate_threshold: float = 0.5
+    window_size: int = 20
+    minimum_calls: int = 10
+    open_timeout: float = 30.0
+    half_open_max_calls: int = 1
+    is_failure: abc.Callable[[Exception], bool] = dc.field(default=lambda e: True)
+    clock: abc.Callable[[], float] = dc.field(default=time.monotonic)
+    logger: logging.Logger = dc.field(default_factory=lambda: logging.getLogger(__name__))
+
+    _state: CircuitState = dc.field(init=False, default=CircuitState.CLOSED)
+    _outcomes: deque[bool] = dc.field(init=False)
+    _opened_at: float = dc.field(init=False, default=0.0)
+    _half_open_calls: int = dc.field(init=False, default=0)
+
+    def __post_init__(self) -> None:
+        self._outcomes = deque(maxlen=self.window_size)
+
+    @property
+    def state(self) -> CircuitState:
+        if self._state == CircuitState.OPEN and self._retry_after() <= 0:
+            self._transition(CircuitState.HALF_OPEN)
+
+        return self._state
+
+    @property
+    def failure_rate(self) -> float:
+        if not self._outcomes:
+            return 0.0
+
+        return self._outcomes.count(False) / len(self._outcomes)
+
+    async def call(self, func: abc.Callable[..., abc.Awaitable[T]], *args: t.Any, **kwargs: t.Any) -> T:
+        is_trial_call = self._acquire()
+
+        try:
+            result = await func(*args, **kwargs)
+        except Exception as e:
+            self._record(is_success=not self.is_failure(e), is_trial_call=is_trial_call)
+            raise
+        except BaseException:
+            # Cancellation says nothing about the health of the remote side
+            if is_trial_call:
+                self._half_open_calls -= 1
+            raise
+
+        self._record(is_success=True, is_trial_call=is_trial_call)
+
+        return result
+
+    def snapshot(self) -> abc.Mapping[str, t.Any]:
+        state = self.state
+
+        return {
+            "name": self.name,
+            "state": state,
+            "failure_rate": self.failure_rate,
+            "calls_in_window": len(self._outcomes),
+            "retry_after": max(self._retry_after(), 0.0) if state == CircuitState.OPEN else 0.0,
+        }
+
+    def _acquire(self) -> bool:
+        match self.state:
+            case CircuitState.CLOSED:
+                return False
+            case CircuitState.HALF_OPEN if self._half_open_calls < self.half_open_max_calls:
+                self._half_open_calls += 1
+                return True
+            case _:
+                raise CircuitOpenError(self.name, max(self._retry_after(), 0.0))
+
+    def _record(self, is_success: bool, is_trial_call: bool) -> None:
+        if is_trial_call:
+            self._half_open_calls -= 1
+            self._transition(CircuitState.CLOSED if is_success else CircuitState.OPEN)
+            return
+
+        if self._state != CircuitState.CLOSED:
+            return
+
+        self._outcomes.append(is_success)
+
+        if len(self._outcomes) >= self.minimum_calls and self.failure_rate >= self.failure_rate_threshold:
+            self._transition(CircuitState.OPEN)
+
+    def _transition(self, state: CircuitState) -> None:
+        if state == self._state:
+            return
+
+        self.logger.warning(
+            "Circuit %s changed state: %s -> %s",
+            self.name,
+            self._state,
+            state,
+            extra={"circuit": self.name, "failure_rate": self.failure_rate},
+        )
+        self._state = state
+
+        if state == CircuitState.OPEN:
+            self._opened_at = self.clock()
+        elif state == CircuitState.CLOSED:
+            self._outcomes.clear()
+
+    def _retry_after(self) -> float:
+        return self._opened_at + self.open_timeout - self.clock()
@@ -0,0 +1,108 @@
+import asyncio
+import dataclasses as dc
+import logging
+import typing as t
+from collections import abc
+from functools import partial
+
+
+T = t.TypeVar("T")
+
+
+@dc.dataclass(slots=True, repr=False)
+class KeyedTaskPool:
+    concurrency: int = 16
+    max_pending: int = 256
+    logger: logging.Logger = dc.field(default_factory=lambda: logging.getLogger(__name__))
+
+    _running: asyncio.Semaphore = dc.field(init=False)
+    _pending: asyncio.Semaphore = dc.field(init=False)
+    _tails: dict[abc.Hashable, asyncio.Task[None]] = dc.field(init=False, default_factory=dict)
+    _tasks: set[asyncio.Task[None]] = dc.field(init=False, default_factory=set)
+    _running_count: int = dc.field(init=False, default=0)
+    _rejected_count: int = dc.field(init=False, default=0)
+    _is_closed: bool = dc.field(init=False, default=False)
+
+    def __post_init__(self) -> None:
+        self._running = asyncio.Semaphore(self.concurrency)
+        self._pending = asyncio.Semaphore(self.max_pending)
+
+    @property
+    def pending(self) -> int:
+        return len(self._tasks)
+
+    def stats(self) -> abc.Mapping[str, int]:
+        return {
+            "concurrency": self.concurrency,
+            "max_pending": self.max_pending,
+            "running": self._running_count,
+            "queued": self.pending - self._running_count,
+            "rejected": self._rejected_count,
+        }
+
+    async def submit(
+        self, key: abc.Hashable, func: abc.Callable[..., abc.Awaitable[T]], *args: t.Any, **kwargs: t.Any
+    ) -> None:
+        # Waits while the pool is full, so the producer slows down instead of piling up tasks
+        await self._pending.acquire()
+        self._spawn(key, partial(func, *args, **kwargs))
+
+    async def try_submit(
+        self, key: abc.Hashable, func: abc.Callable[..., abc.Awaitable[T]], *args: t.Any, **kwargs: t.Any
+    ) -> bool:
+        if self._is_closed or self._pending.locked():
+            self._rejected_count += 1
+            return False
+
+        # The semaphore is not locked, so acquiring it does not suspend
+        await self._pending.acquire()
+        self._spawn(key, partial(func, *args, **kwargs))
+
+        return True
+
+    async def close(self, timeout: float | None = None) -> None:
+        self._is_closed = True
+
+        if not self._tasks:
+            return
+
+        _, not_done = await asyncio.wait(set(self._tasks), timeout=timeout)
+
+        if not_done:
+            self.logger.warning("Cancel tasks which were not finished in time", extra={"tasks_count": len(not_done)})
+
+        for task in not_done:
+            task.cancel()
+
+        if not_done:
+            await asyncio.wait(not_done)
+
+        return
+
+    def _spawn(self, key: abc.Hashable, func: abc.Callable[[], abc.Awaitable[t.Any]]) -> None:
+        task = asyncio.create_task(self._run(self._tails.get(key), func))
+        self._tails[key] = task
+        self._tasks.add(task)
+        task.add_done_callback(partial(self._on_done, key))
+
+    async def _run(self, previous: asyncio.Task[None] | None, func: abc.Callable[[], abc.Awaitable[t.Any]]) -> None:
+        # Calls with the same key (e.g. the same chat) are chained, so they run in submission order
+        if previous is not None:
+            await asyncio.wait((previous,))
+
+        async with self._running:
+            self._running_count += 1
+
+            try:
+                await func()
+            except Exception:
+                self.logger.exception("Task failed in keyed task pool")
+            finally:
+                self._running_count -= 1
+
+    def _on_done(self, key: abc.Hashable, task: asyncio.Task[None]) -> None:
+        self._tasks.discard(task)
+        self._pending.release()
+
+        if self._tails.get(key) is task:
+            del self._tails[key]
@@ -10,6 +10,9 @@ from tenacity.wait import wait_base
 from tenacity.stop import stop_base
 from tenacity.retry import retry_base
 
+from .breaker import CircuitOpenError
+from ...utils.metrics import observe_retry
+
 
 T = t.TypeVar("T")
 P = t.ParamSpec("P")
@@ -71,10 +74,16 @@ class RetryService:
             retry_error_callback=retry_error_callback,
             before=tenacity.before_log(self.logger, logging.DEBUG),
             after=tenacity.after_log(self.logger, logging.DEBUG),
+            before_sleep=self._before_sleep,
         )
 
         return await retrying(func, *args, **kwargs)
 
+    @staticmethod
+    def _before_sleep(retry_state: RetryCallState) -> None:
+        # Called only when another attempt follows, the last failed attempt is not counted
+        observe_retry(retry_state.fn)
+
     @staticmethod
     def _get_retry_predicate(exception_type: t.Any) -> retry_base:
         if isinstance(exception_type, retry_base):
@@ -84,5 +93,6 @@ class RetryService:
             return tenacity.retry_if_exception(predicate=exception_type)
         else:
             return tenacity.retry_if_exception(
-                predicate=lambda e: isinstance(e, exception_type) and not isinstance(e, asyncio.CancelledError)
+                predicate=lambda e: isinstance(e, exception_type)
+                and not isinstance(e, (asyncio.CancelledError, CircuitOpenError))
             )
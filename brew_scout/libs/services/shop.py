@@ -1,9 +1,10 @@
 import dataclasses as dc
+import typing as t
 from collections import abc
 
 from ..dal.shop import CoffeeShopRepository
 from ..dal.models.shops import CoffeeShopModel
-from ..domains.shops import CoffeeShop
+from ..domains.shops import CoffeeShop, CoffeeShopField, CoffeeShopsFilter
 
 
 @dc.dataclass(slots=True, repr=True, frozen=True)
@@ -13,11 +14,29 @@ class CoffeeShopService:
     async def get_coffee_shops(self) -> abc.Sequence[CoffeeShopModel]:
         return await self.repository.get_all()
 
+    async def get_coffee_shops_page(self, filters: CoffeeShopsFilter, limit: int) -> abc.Sequence[CoffeeShopModel]:
+        return await self.repository.get_page(filters, limit)
+
+    async def get_coffee_shop_rows(
+        self, fields: abc.Sequence[CoffeeShopField], filters: CoffeeShopsFilter, limit: int
+    ) -> abc.Sequence[dict[str, t.Any]]:
+        return [row._asdict() for row in await self.repository.get_rows(fields, filters, limit)]
+
+    async def stream_coffee_shop_rows(
+        self, fields: abc.Sequence[CoffeeShopField], filters: CoffeeShopsFilter
+    ) -> abc.AsyncIterator[dict[str, t.Any]]:
+        async for row in self.repository.stream_rows(fields, filters):
+            yield row._asdict()
+
+    async def stream_catalogue(self) -> abc.AsyncIterator[dict[str, t.Any]]:
+        async for row in self.repository.stream_catalogue():
+            yield row._asdict()
+
     async def get_coffee_shops_for_city(self, city_name: str) -> abc.Sequence[CoffeeShop]:
         if not (coffee_shops := await self.repository.get_by_city_name(city_name)):
             return []
 
-        return [
-            CoffeeShop.model_validate(cs)
-            for cs in coffee_shops
-        ]
+        return [CoffeeShop.from_row(cs) for cs in coffee_shops]
+
+    async def get_coffee_shops_for_city_id(self, city_id: int) -> abc.Sequence[CoffeeShop]:
+        return [CoffeeShop.from_row(row) for row in await self.repository.get_by_city_id(city_id)]
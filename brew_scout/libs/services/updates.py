@@ -0,0 +1,66 @@
+import dataclasses as dc
+import logging
+from collections import deque
+
+from redis.exceptions import RedisError
+
+from .kv import KVService
+
+
+@dc.dataclass(slots=True, repr=False)
+class RecentIdsRing:
+    size: int = 1024
+    _order: deque[int] = dc.field(init=False)
+    _ids: set[int] = dc.field(init=False, default_factory=set)
+
+    def __post_init__(self) -> None:
+        self._order = deque(maxlen=self.size)
+
+    def __contains__(self, item: int) -> bool:
+        return item in self._ids
+
+    def add(self, item: int) -> None:
+        if item in self._ids:
+            return
+
+        if len(self._order) == self.size:
+            self._ids.discard(self._order[0])
+
+        self._order.append(item)
+        self._ids.add(item)
+
+    def discard(self, item: int) -> None:
+        if item not in self._ids:
+            return
+
+        self._ids.discard(item)
+        self._order.remove(item)
+
+
+@dc.dataclass(frozen=True, slots=True, repr=False)
+class UpdateDeduplicationService:
+    kv_service: KVService
+    recent_ids: RecentIdsRing = dc.field(default_factory=RecentIdsRing)
+    expiration_time: int = 3600
+    logger: logging.Logger = dc.field(default_factory=lambda: logging.getLogger(__name__))
+
+    async def register_update(self, update_id: int) -> bool:
+        if update_id in self.recent_ids:
+            return False
+
+        # Remember the id before going to redis, so concurrent redeliveries to this worker stop here
+        self.recent_ids.add(update_id)
+
+        try:
+            return await self.kv_service.mark_update_as_seen(update_id, self.expiration_time)
+        except RedisError:
+            self.logger.exception("Failed to register telegram update", extra={"update_id": update_id})
+            return True
+
+    async def release_update(self, update_id: int) -> None:
+        self.recent_ids.discard(update_id)
+
+        try:
+            await self.kv_service.forget_update(update_id)
+        except RedisError:
+            self.logger.exception("Failed to release telegram update", extra={"update_id": update_id})
@@ -1,17 +1,173 @@
+import asyncio
 import dataclasses as dc
+import logging
+import time
+import typing as t
 from collections import abc
+from contextlib import suppress
+
+from sqlalchemy.exc import DataError, IntegrityError
 
 from ..dal.user import UserRepository
 from ..dal.models.users import UserModel
 from ..serializers.telegram import From
+from ..utils.metrics import HookStage, observe_stage
+
+
+UserKey: t.TypeAlias = tuple[str, int]
+UserFingerprint: t.TypeAlias = tuple[bool, str | None, str | None]
 
 
-@dc.dataclass(frozen=True, slots=True, repr=False)
+@dc.dataclass(slots=True, repr=False)
 class UserService:
     repository: UserRepository
 
+    flush_interval: float = 0.5
+    flush_batch_size: int = 100
+    max_tracked_users: int = 100_000
+    max_buffered_users: int = 10_000
+    max_flush_attempts: int = 5
+    max_flush_backoff: float = 30.0
+    clock: abc.Callable[[], float] = dc.field(default=time.monotonic)
+    logger: logging.Logger = dc.field(default_factory=lambda: logging.getLogger(__name__))
+
+    _buffer: dict[UserKey, From] = dc.field(init=False, default_factory=dict)
+    _flushed: dict[UserKey, UserFingerprint] = dc.field(init=False, default_factory=dict)
+    _flush_requested: asyncio.Event = dc.field(init=False, default_factory=asyncio.Event)
+    _flusher: asyncio.Task[None] | None = dc.field(init=False, default=None)
+    _attempts: dict[UserKey, int] = dc.field(init=False, default_factory=dict)
+    _failed_flushes: int = dc.field(init=False, default=0)
+    _retry_at: float = dc.field(init=False, default=0.0)
+    _dropped_count: int = dc.field(init=False, default=0)
+
+    @property
+    def dropped_count(self) -> int:
+        return self._dropped_count
+
     async def get_users(self) -> abc.Sequence[UserModel]:
         return await self.repository.get_all()
 
     async def store_user(self, user: From) -> UserModel:
         return await self.repository.upsert_user(user)
+
+    def buffer_user(self, user: From) -> None:
+        key = self._get_key(user)
+
+        if key not in self._buffer and self._flushed.get(key) == self._get_fingerprint(user):
+            return
+
+        self._buffer[key] = user
+        self._trim_buffer()
+
+        # A failing database is not retried on every message, the flusher waits for the backoff to pass
+        if len(self._buffer) >= self.flush_batch_size and not self._is_backing_off():
+            self._flush_requested.set()
+
+    def start(self) -> None:
+        if self._flusher is not None:
+            return
+
+        self._flusher = asyncio.create_task(self._flush_periodically(), name="users-flusher")
+
+    async def close(self) -> None:
+        if self._flusher is not None:
+            self._flusher.cancel()
+
+            with suppress(asyncio.CancelledError):
+                await self._flusher
+
+            self._flusher = None
+
+        await self.flush()
+
+    async def flush(self) -> None:
+        if not self._buffer:
+            return
+
+        users, self._buffer = self._buffer, {}
+
+        try:
+            with observe_stage(HookStage.USER_UPSERT):
+                rejected = await self._upsert(list(users.values()))
+        except Exception:
+            self.logger.exception("Failed to flush users", extra={"users_count": len(users)})
+            self._requeue(users)
+            return
+
+        self._failed_flushes = 0
+
+        for user in rejected:
+            self.logger.warning("Drop user rejected by the database", extra={"tuid": user.tuid})
+            self._dropped_count += 1
+            del users[self._get_key(user)]
+
+        for key, user in users.items():
+            self._attempts.pop(key, None)
+            self._flushed.pop(key, None)
+            self._flushed[key] = self._get_fingerprint(user)
+
+        while len(self._flushed) > self.max_tracked_users:
+            del self._flushed[next(iter(self._flushed))]
+
+    async def _flush_periodically(self) -> None:
+        while True:
+            with suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._flush_requested.wait(), timeout=self.flush_interval)
+
+            self._flush_requested.clear()
+
+            if not self._is_backing_off():
+                await self.flush()
+
+    async def _upsert(self, users: list[From]) -> list[From]:
+        try:
+            await self.repository.upsert_users(users)
+        except (DataError, IntegrityError):
+            if len(users) == 1:
+                return users
+
+            # A single bad row fails the whole batch, halving the batch finds it without losing the others
+            middle = len(users) // 2
+
+            return [*await self._upsert(users[:middle]), *await self._upsert(users[middle:])]
+
+        return []
+
+    def _requeue(self, users: dict[UserKey, From]) -> None:
+        self._failed_flushes += 1
+        self._retry_at = self.clock() + min(self.flush_interval * 2**self._failed_flushes, self.max_flush_backoff)
+        retried = {}
+
+        for key, user in users.items():
+            if (attempts := self._attempts.get(key, 0) + 1) < self.max_flush_attempts:
+                self._attempts[key] = attempts
+                retried[key] = user
+            else:
+                self._attempts.pop(key, None)
+
+        if dropped_count := len(users) - len(retried):
+            self._dropped_count += dropped_count
+            self.logger.warning("Drop users after failed flushes", extra={"users_count": dropped_count})
+
+        # Keep the records which were not replaced by newer ones while flushing
+        self._buffer = retried | self._buffer
+        self._trim_buffer()
+
+    def _trim_buffer(self) -> None:
+        while len(self._buffer) > self.max_buffered_users:
+            key = next(iter(self._buffer))
+            del self._buffer[key]
+            self._attempts.pop(key, None)
+            self._dropped_count += 1
+
+    def _is_backing_off(self) -> bool:
+        return self.clock() < self._retry_at
+
+    @staticmethod
+    def _get_key(user: From) -> UserKey:
+        # Same as the stored unique key, the repository keeps users without a username under an empty one
+        return user.username or "", user.tuid
+
+    @staticmethod
+    def _get_fingerprint(user: From) -> UserFingerprint:
+        return user.is_bot, user.first_name, user.last_name
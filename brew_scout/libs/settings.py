@@ -1,8 +1,17 @@
-from pydantic import Field, PostgresDsn, RedisDsn, HttpUrl, field_validator
+import os
+import typing as t
+
+from pydantic import Field, PostgresDsn, RedisDsn, HttpUrl, field_validator, model_validator
 from pydantic_settings import BaseSettings
 
+from .domains.database import DisconnectStrategy
+from .domains.runner import OverflowPolicy
+from .domains.server import AppRole, EventLoop, ServerSupervisor
+from .domains.telegram import IngestionMode
+
 
 SETTINGS_KEY = "settings"
+SETTINGS_ENV = "BREW_SCOUT_SETTINGS"
 
 
 class BaseAppSettings(BaseSettings):
@@ -12,22 +21,113 @@ class AppSettings(BaseAppSettings):
     host: str = Field(default="0.0.0.0")
     port: int = Field(default=9090)
     debug: bool = Field(default=True)
+    role: AppRole = Field(default=AppRole.ALL)
+    workers: int = Field(default=1, ge=1)
+    supervisor: ServerSupervisor = Field(default=ServerSupervisor.UVICORN)
+    event_loop: EventLoop = Field(default=EventLoop.AUTO)
+    backlog: int = Field(default=2048, ge=1)
+    keep_alive_timeout: int = Field(default=5, ge=1)
+    limit_concurrency: int | None = Field(default=None, ge=1)
+    graceful_timeout: int = Field(default=30, ge=1)
     redis_dsn: RedisDsn = Field(...)
     database_dsn: PostgresDsn = Field(...)
+    database_replica_dsns: list[PostgresDsn] = Field(default_factory=list)
+    database_replica_max_lag: float = Field(default=5.0, ge=0)
+    database_replica_check_interval: float = Field(default=5.0, gt=0)
+    db_pool_size: int = Field(default=10, ge=1)
+    db_max_overflow: int = Field(default=10, ge=0)
+    db_pool_recycle: int = Field(default=1800)
+    db_pool_timeout: float = Field(default=10.0, gt=0)
+    db_pool_warm_up_size: int = Field(default=2, ge=0)
+    db_disconnect_strategy: DisconnectStrategy = Field(default=DisconnectStrategy.OPTIMISTIC)
+    db_statement_cache_size: int = Field(default=100, ge=0)
     telegram_api_url: str = Field(...)
     telegram_api_token: str = Field(...)
+    # Sent by Telegram in every webhook call once it is passed to setWebhook as `secret_token`
+    telegram_webhook_secret: str | None = Field(default=None, pattern=r"^[A-Za-z0-9_-]{1,256}$")
+    telegram_webhook_max_body_size: int = Field(default=256 * 1024, ge=1)
     sentry_dsn: str | None = Field(default=None)
-    oauth_app_name: str = Field(...)
-    oauth_client_id: str = Field(...)
-    oauth_client_secret: str = Field(...)
-    oauth_server_metadata_url: HttpUrl = Field(...)
-    allowed_users: frozenset[str] | str = Field(...)
+    traces_slow_threshold_ms: int = Field(default=1000, ge=0)
+    traces_fast_sample_rate: float = Field(default=0.01, ge=0, le=1)
+    traces_sample_rate: float = Field(default=1.0, ge=0, le=1)
+    traces_query_spans: bool = Field(default=False)
+    oauth_app_name: str | None = Field(default=None)
+    oauth_client_id: str | None = Field(default=None)
+    oauth_client_secret: str | None = Field(default=None)
+    oauth_server_metadata_url: HttpUrl | None = Field(default=None)
+    allowed_users: frozenset[str] | str = Field(default=frozenset())
     secret_key: str = Field(default="secret")
+    ingestion_mode: IngestionMode = Field(default=IngestionMode.WEBHOOK)
+    polling_limit: int = Field(default=100, ge=1, le=100)
+    polling_timeout: int = Field(default=25, ge=0)
+    catalogue_version_ttl: int = Field(default=60, ge=1)
+    health_check_timeout: float = Field(default=1.0, gt=0)
+    health_cache_ttl: float = Field(default=3.0, ge=0)
+    update_deduplication_ttl: int = Field(default=3600, ge=1)
+    user_rate_limit_capacity: int = Field(default=10, ge=1)
+    user_rate_limit_refill_rate: float = Field(default=0.5, gt=0)
+    chat_rate_limit_capacity: int = Field(default=20, ge=1)
+    chat_rate_limit_refill_rate: float = Field(default=1.0, gt=0)
+    rate_limit_notice_window: int = Field(default=60, ge=1)
+    background_concurrency: int = Field(default=16, ge=1)
+    background_queue_size: int = Field(default=256, ge=1)
+    background_drain_timeout: float = Field(default=10.0, ge=0)
+    background_overflow_policy: OverflowPolicy = Field(default=OverflowPolicy.BUSY)
+    distance_ranking_workers: int = Field(default=0, ge=0)
+    distance_ranking_threshold: int = Field(default=500, ge=1)
+    user_flush_interval_ms: int = Field(default=500, ge=1)
+    user_flush_batch_size: int = Field(default=100, ge=1)
+    user_buffer_size: int = Field(default=10_000, ge=1)
+    user_flush_max_attempts: int = Field(default=5, ge=1)
+    circuit_breaker_failure_rate: float = Field(default=0.5, gt=0, le=1)
+    circuit_breaker_window_size: int = Field(default=20, ge=1)
+    circuit_breaker_minimum_calls: int = Field(default=10, ge=1)
+    circuit_breaker_open_timeout: float = Field(default=30.0, gt=0)
 
     @field_validator("allowed_users", mode="before")
     @classmethod
-    def parse_allowed_users(cls, data: str) -> frozenset[str] | str:
+    def parse_allowed_users(cls, data: str | None) -> frozenset[str] | str:
+        if data is None:
+            return frozenset()
+
         if isinstance(data, str):
             return frozenset(user.strip() for user in data.split(","))
 
         return data
+
+    @property
+    def serves_api(self) -> bool:
+        return self.role in (AppRole.API, AppRole.ALL)
+
+    @property
+    def serves_admin(self) -> bool:
+        return self.role in (AppRole.ADMIN, AppRole.ALL)
+
+    @model_validator(mode="after")
+    def check_admin_oauth(self) -> t.Self:
+        if not self.serves_admin:
+            return self
+
+        oauth_fields = ("oauth_app_name", "oauth_client_id", "oauth_client_secret", "oauth_server_metadata_url")
+
+        if missing_fields := [field for field in oauth_fields if getattr(self, field) is None]:
+            raise ValueError(f"The admin requires OAuth settings, missing: {', '.join(missing_fields)}")
+
+        return self
+
+    @model_validator(mode="after")
+    def check_polling_workers(self) -> t.Self:
+        # Telegram serves getUpdates to a single consumer, every extra worker would fight for the same updates
+        if self.ingestion_mode == IngestionMode.POLLING and self.workers > 1:
+            raise ValueError("Polling ingestion mode runs in a single worker, use the webhook mode to scale out")
+
+        return self
+
+
+def load_settings() -> AppSettings:
+    # Server workers are separate processes, the launcher passes them its settings through the environment
+    if (raw_settings := os.environ.get(SETTINGS_ENV)) is not None:
+        return AppSettings.model_validate_json(raw_settings)
+
+    # The required fields come from the environment, which mypy does not know about
+    return AppSettings.model_validate({})
@@ -10,16 +10,12 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import ORJSONResponse
 from starlette.middleware import Middleware
 from starlette.middleware.sessions import SessionMiddleware
-import sentry_sdk
-from sentry_sdk.integrations.starlette import StarletteIntegration
-from sentry_sdk.integrations.fastapi import FastApiIntegration
-from sqladmin import Admin
 
 from brew_scout import MODULE_NAME, DESCRIPTION, VERSION
-from .admin.views import CoffeeShopModelAdminView, CityModelAdminView, CountryModelAdminView
-from .settings import AppSettings, SETTINGS_KEY
+from .settings import AppSettings, SETTINGS_KEY, load_settings
 from .managers import ResourceProvider
-from ..apis.v1.base import router as router_v1, internal_router
+from .utils.tracing import init_tracing
+from ..apis.v1.base import router as router_v1, admin_router, common_router, internal_router
 
 
 def setup_app(settings: AppSettings) -> FastAPI:
@@ -27,19 +23,12 @@ def setup_app(settings: AppSettings) -> FastAPI:
     async def app_lifespan(app: FastAPI) -> abc.AsyncIterator[None]:
         current_loop = asyncio.get_running_loop()
         manager_provider = ResourceProvider.init(settings, current_loop)
-        manager_provider.start()
+        await manager_provider.start()
 
         app.state.manager_provider = manager_provider
 
-        admin = Admin(
-            app=app,
-            engine=manager_provider.database_session_manager.get_engine(),
-            authentication_backend=manager_provider.oauth_client_manager.get_backend(),
-            debug=settings.debug,
-        )
-        admin.add_view(CountryModelAdminView)
-        admin.add_view(CityModelAdminView)
-        admin.add_view(CoffeeShopModelAdminView)
+        if settings.serves_admin:
+            setup_admin(app, manager_provider, settings)
 
         setup_logging()
 
@@ -56,20 +45,19 @@ def setup_app(settings: AppSettings) -> FastAPI:
             allow_methods=["*"],
             allow_headers=["*"],
         ),
-        Middleware(
-            SessionMiddleware,
-            secret_key=settings.secret_key,
-        ),
     ]
 
+    if settings.serves_admin:
+        # Only the admin login uses the session, telegram and API clients never send the cookie
+        middlewares.append(Middleware(SessionMiddleware, secret_key=settings.secret_key))
+
     if settings.sentry_dsn:
-        sentry_sdk.init(
-            dsn=settings.sentry_dsn,
-            enable_tracing=True,
-            integrations=[
-                StarletteIntegration(transaction_style="url"),
-                FastApiIntegration(transaction_style="url"),
-            ],
+        init_tracing(
+            settings.sentry_dsn,
+            settings.traces_slow_threshold_ms,
+            settings.traces_fast_sample_rate,
+            sample_rate=settings.traces_sample_rate,
+            with_query_spans=settings.traces_query_spans,
         )
 
     app = FastAPI(
@@ -81,12 +69,22 @@ def setup_app(settings: AppSettings) -> FastAPI:
         default_response_class=ORJSONResponse,
         **{SETTINGS_KEY: settings}  # type: ignore
     )
-    app.include_router(router_v1)
+    app.include_router(common_router)
     app.include_router(internal_router)
 
+    if settings.serves_api:
+        app.include_router(router_v1)
+
+    if settings.serves_admin:
+        app.include_router(admin_router)
+
     return app
 
 
+def create_app() -> FastAPI:
+    return setup_app(load_settings())
+
+
 def add_origins() -> abc.Sequence[str]:
     return "http://localhost:9090", "http://0.0.0.0:9090"
 
@@ -110,3 +108,21 @@ def setup_logging() -> None:
             # so the messages are caught by our root logger and formatted as we want
             logging.getLogger(_log).handlers.clear()
             logging.getLogger(_log).propagate = True
+
+
+def setup_admin(app: FastAPI, manager_provider: ResourceProvider, settings: AppSettings) -> None:
+    # sqladmin is heavy to import and is not needed by processes which do not serve the admin
+    from sqladmin import Admin
+    from .admin.views import CoffeeShopModelAdminView, CityModelAdminView, CountryModelAdminView
+
+    admin = Admin(
+        app=app,
+        engine=manager_provider.database_session_manager.get_engine(),
+        authentication_backend=manager_provider.oauth_client_manager.get_backend(),
+        debug=settings.debug,
+    )
+    # Admin views run inside the admin sub application and reach the services through its state
+    admin.admin.state.manager_provider = manager_provider
+    admin.add_view(CountryModelAdminView)
+    admin.add_view(CityModelAdminView)
+    admin.add_view(CoffeeShopModelAdminView)
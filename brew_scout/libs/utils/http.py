@@ -0,0 +1,60 @@
+import datetime as dt
+from email.utils import format_datetime, parsedate_to_datetime
+
+from starlette.datastructures import Headers
+from starlette.requests import Request
+
+from ..domains.shops import CatalogueVersion
+
+
+def make_etag(version: CatalogueVersion, encoding: str | None = None) -> str:
+    # A strong validator names one exact body, so every content coding gets its own
+    return version.etag if encoding is None else f'{version.etag[:-1]}-{encoding}"'
+
+
+def make_validator_headers(version: CatalogueVersion, encoding: str | None = None) -> dict[str, str]:
+    headers = {"ETag": make_etag(version, encoding), "Cache-Control": "no-cache"}
+
+    if version.updated_at is not None:
+        headers["Last-Modified"] = format_datetime(version.updated_at.astimezone(dt.UTC), usegmt=True)
+
+    return headers
+
+
+def is_not_modified(headers: Headers, version: CatalogueVersion, encoding: str | None = None) -> bool:
+    # If-None-Match takes precedence over If-Modified-Since, see RFC 9110 section 13.2.2
+    if (if_none_match := headers.get("if-none-match")) is not None:
+        etags = {etag.strip().removeprefix("W/") for etag in if_none_match.split(",")}
+        return "*" in etags or make_etag(version, encoding) in etags
+
+    if (if_modified_since := headers.get("if-modified-since")) is None or version.updated_at is None:
+        return False
+
+    try:
+        modified_since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+
+    if modified_since.tzinfo is None:
+        modified_since = modified_since.replace(tzinfo=dt.UTC)
+
+    # Last-Modified has a precision of one second
+    return version.updated_at.replace(microsecond=0) <= modified_since
+
+
+async def read_limited_body(request: Request, max_size: int) -> bytes | None:
+    if (content_length := request.headers.get("content-length", "")).isdigit() and int(content_length) > max_size:
+        return None
+
+    # Chunked requests have no length upfront, so the stream is counted as well and dropped once it is too long
+    chunks, size = [], 0
+
+    async for chunk in request.stream():
+        size += len(chunk)
+
+        if size > max_size:
+            return None
+
+        chunks.append(chunk)
+
+    return b"".join(chunks)
@@ -1,34 +1,18 @@
+import copy
 import datetime as dt
 import json
 import logging
+import queue
 import typing as t
 from collections import abc
+from logging.handlers import QueueHandler, QueueListener
 
-LOG_RECORD_BUILTIN_ATTRS = {
-    "args",
-    "asctime",
-    "created",
-    "exc_info",
-    "exc_text",
-    "filename",
-    "funcName",
-    "levelname",
-    "levelno",
-    "lineno",
-    "module",
-    "msecs",
-    "message",
-    "msg",
-    "name",
-    "pathname",
-    "process",
-    "processName",
-    "relativeCreated",
-    "stack_info",
-    "thread",
-    "threadName",
-    "taskName",
-}
+import orjson
+
+
+# Every attribute a bare record has, so anything else on a record came from `extra`
+LOG_RECORD_BUILTIN_ATTRS = frozenset(vars(logging.makeLogRecord({}))) | {"asctime", "message", "taskName"}
+JSON_OPTIONS = orjson.OPT_NON_STR_KEYS
 
 
 class JSONFormatter(logging.Formatter):
@@ -38,9 +22,14 @@ class JSONFormatter(logging.Formatter):
 
     def format(self, record: logging.LogRecord) -> str:
         message = self._prepare_log_dict(record)
-        return json.dumps(message, default=str)
 
-    def _prepare_log_dict(self, record: logging.LogRecord) -> abc.Mapping[str, t.Any]:
+        try:
+            return orjson.dumps(message, default=str, option=JSON_OPTIONS).decode()
+        except orjson.JSONEncodeError:
+            # orjson rejects a few values the stdlib encoder accepts, e.g. integers wider than 64 bits
+            return json.dumps(message, default=str)
+
+    def _prepare_log_dict(self, record: logging.LogRecord) -> dict[str, t.Any]:
         always_fields = {
             "message": record.getMessage(),
             "timestamp": dt.datetime.fromtimestamp(record.created, tz=dt.timezone.utc).isoformat(),
@@ -67,3 +56,42 @@ class JSONFormatter(logging.Formatter):
 class NonErrorFilter(logging.Filter):
     def filter(self, record: logging.LogRecord) -> bool:
         return record.levelno <= logging.INFO
+
+
+class QueueListenerHandler(QueueHandler):
+    # Records are handed to a listener thread, which formats and writes them off the event loop
+    def __init__(self, handlers: abc.Sequence[logging.Handler], queue_size: int = 10000):
+        # dictConfig resolves `cfg://` references on item access only, iterating would return the raw strings
+        handlers = [handlers[index] for index in range(len(handlers))]
+
+        for handler in handlers:
+            # dictConfig configures handlers in name order, the wrapped ones have to sort before this one
+            if not isinstance(handler, logging.Handler):
+                raise TypeError(f"Wrapped handler is not configured yet: {handler}")
+
+        super().__init__(queue.Queue(maxsize=queue_size))
+        self.dropped_count = 0
+        self.listener = QueueListener(self.queue, *handlers, respect_handler_level=True)
+        self.listener.start()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Arguments are merged now, as they can change before the listener gets to the record,
+        # the exception is left for the listener's formatter to render
+        record = copy.copy(record)
+        record.msg, record.args = record.getMessage(), None
+
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        # A full queue means the output does not keep up, dropping a record is better than blocking the loop
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped_count += 1
+
+    def close(self) -> None:
+        # Drains the queue, so records logged before a reconfiguration or shutdown are written
+        if self.listener._thread is not None:
+            self.listener.stop()
+
+        super().close()
@@ -0,0 +1,118 @@
+import os
+import re
+import typing as t
+from collections import abc
+from contextlib import contextmanager
+from enum import StrEnum
+from functools import cache
+from time import perf_counter
+
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, REGISTRY, generate_latest, multiprocess
+
+
+MULTIPROCESS_DIR_ENV = "PROMETHEUS_MULTIPROC_DIR"
+# Gauges in the live modes keep a file per process, marking the process dead removes it
+LIVE_GAUGE_FILE = re.compile(r"gauge_live\w+_(?P<pid>\d+)\.db")
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class HookStage(StrEnum):
+    USER_UPSERT = "user_upsert"
+    CITY_LOOKUP = "city_lookup"
+    CACHE_GET = "cache_get"
+    DB_LOAD = "db_load"
+    DISTANCE_RANKING = "distance_ranking"
+    TELEGRAM_SEND = "telegram_send"
+
+
+class CacheResult(StrEnum):
+    HIT = "hit"
+    MISS = "miss"
+
+
+HOOK_STAGE_SECONDS = Histogram(
+    "brew_scout_hook_stage_seconds",
+    "Time spent in each stage of telegram hook processing",
+    ["stage"],
+    buckets=LATENCY_BUCKETS,
+)
+CACHE_REQUESTS_TOTAL = Counter(
+    "brew_scout_cache_requests_total",
+    "Cache lookups by cache name and result",
+    ["cache", "result"],
+)
+RETRIES_TOTAL = Counter(
+    "brew_scout_retries_total",
+    "Failed attempts which are followed by another attempt",
+    ["function"],
+)
+DB_POOL_CHECKOUT_SECONDS = Histogram(
+    "brew_scout_db_pool_checkout_seconds",
+    "Time spent waiting for a database connection from the pool",
+    buckets=LATENCY_BUCKETS,
+)
+DB_POOL_CHECKED_OUT_CONNECTIONS = Gauge(
+    "brew_scout_db_pool_checked_out_connections",
+    "Database connections currently checked out from the pool",
+    multiprocess_mode="livesum",
+)
+
+
+@contextmanager
+def observe_stage(stage: HookStage) -> abc.Iterator[None]:
+    started_at = perf_counter()
+
+    try:
+        yield
+    finally:
+        HOOK_STAGE_SECONDS.labels(stage).observe(perf_counter() - started_at)
+
+
+def observe_cache(cache_name: str, is_hit: bool) -> None:
+    CACHE_REQUESTS_TOTAL.labels(cache_name, CacheResult.HIT if is_hit else CacheResult.MISS).inc()
+
+
+def observe_retry(func: t.Any) -> None:
+    # Retried functions are usually partials, the wrapped function gives a stable label
+    func = getattr(func, "func", func)
+    RETRIES_TOTAL.labels(getattr(func, "__qualname__", "unknown")).inc()
+
+
+@cache
+def get_registry() -> CollectorRegistry:
+    if MULTIPROCESS_DIR_ENV not in os.environ:
+        return REGISTRY
+
+    # Every worker writes own files, the collector merges them at scrape time
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)  # type: ignore[no-untyped-call]
+
+    return registry
+
+
+def render_latest() -> bytes:
+    if (metrics_dir := os.environ.get(MULTIPROCESS_DIR_ENV)) is not None:
+        mark_dead_processes(metrics_dir)
+
+    return generate_latest(get_registry())
+
+
+def mark_dead_processes(metrics_dir: str) -> None:
+    # gunicorn reports dead workers through its child_exit hook, uvicorn's supervisor has no such hook,
+    # so the files of workers which are gone are dropped before every scrape
+    pids = {int(match["pid"]) for name in os.listdir(metrics_dir) if (match := LIVE_GAUGE_FILE.fullmatch(name))}
+
+    for pid in pids - {os.getpid()}:
+        if not _is_process_alive(pid):
+            multiprocess.mark_process_dead(pid, metrics_dir)  # type: ignore[no-untyped-call]
+
+
+def _is_process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+
+    return True
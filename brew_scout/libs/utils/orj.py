@@ -1,7 +1,53 @@
 import orjson
 import typing as t
+from collections import abc
+
+from ..domains.shops import ExportFormat
 
 
 def orjson_dumps(v: t.Any, *, default: t.Any) -> str:
     # orjson.dumps returns bytes, to match standard json.dumps we need to decode
     return orjson.dumps(v, default=default).decode()
+
+
+async def iter_ndjson(items: abc.AsyncIterable[t.Any]) -> abc.AsyncIterator[bytes]:
+    async for item in items:
+        yield orjson.dumps(item, option=orjson.OPT_APPEND_NEWLINE)
+
+
+async def iter_json_array(items: abc.AsyncIterable[t.Any]) -> abc.AsyncIterator[bytes]:
+    separator = b"["
+
+    async for item in items:
+        yield separator + orjson.dumps(item)
+        separator = b","
+
+    yield b"[]" if separator == b"[" else b"]"
+
+
+async def iter_geojson(items: abc.AsyncIterable[abc.Mapping[str, t.Any]]) -> abc.AsyncIterator[bytes]:
+    separator = b'{"type":"FeatureCollection","features":['
+
+    async for item in items:
+        yield separator + orjson.dumps(to_feature(item))
+        separator = b","
+
+    yield b"]}" if separator == b"," else b'{"type":"FeatureCollection","features":[]}'
+
+
+def to_feature(item: abc.Mapping[str, t.Any]) -> abc.Mapping[str, t.Any]:
+    properties = dict(item)
+    latitude, longitude = properties.pop("latitude", None), properties.pop("longitude", None)
+    geometry = None
+
+    if latitude is not None and longitude is not None:
+        geometry = {"type": "Point", "coordinates": [longitude, latitude]}
+
+    return {"type": "Feature", "id": properties.get("id"), "geometry": geometry, "properties": properties}
+
+
+EXPORT_ENCODERS: abc.Mapping[ExportFormat, abc.Callable[[abc.AsyncIterable[t.Any]], abc.AsyncIterator[bytes]]] = {
+    ExportFormat.NDJSON: iter_ndjson,
+    ExportFormat.JSON: iter_json_array,
+    ExportFormat.GEOJSON: iter_geojson,
+}
@@ -0,0 +1,56 @@
+import csv
+import typing as t
+from collections import abc
+from pathlib import Path
+
+import orjson
+
+
+CSV_SUFFIXES = frozenset({".csv"})
+GEOJSON_SUFFIXES = frozenset({".geojson", ".json"})
+GEOJSON_SEQ_SUFFIXES = frozenset({".geojsonl", ".geojsons", ".ndjson"})
+
+
+def read_records(path: Path) -> abc.Iterator[abc.Mapping[str, t.Any]]:
+    suffix = path.suffix.lower()
+
+    if suffix in CSV_SUFFIXES:
+        return read_csv(path)
+
+    if suffix in GEOJSON_SUFFIXES:
+        return read_geojson(path)
+
+    if suffix in GEOJSON_SEQ_SUFFIXES:
+        return read_geojson_seq(path)
+
+    raise ValueError(f"Unsupported file format: {path.name}")
+
+
+def read_csv(path: Path) -> abc.Iterator[abc.Mapping[str, t.Any]]:
+    with path.open(newline="", encoding="utf-8") as file:
+        yield from csv.DictReader(file)
+
+
+def read_geojson(path: Path) -> abc.Iterator[abc.Mapping[str, t.Any]]:
+    # A FeatureCollection is a single document, so it is parsed at once, prefer GeoJSON sequences for big files
+    collection = orjson.loads(path.read_bytes())
+
+    for feature in collection.get("features", ()):
+        yield flatten_feature(feature)
+
+
+def read_geojson_seq(path: Path) -> abc.Iterator[abc.Mapping[str, t.Any]]:
+    with path.open("rb") as file:
+        for line in file:
+            # RFC 8142 prefixes every feature with a record separator
+            if line := line.strip().lstrip(b"\x1e"):
+                yield flatten_feature(orjson.loads(line))
+
+
+def flatten_feature(feature: abc.Mapping[str, t.Any]) -> abc.Mapping[str, t.Any]:
+    record = dict(feature.get("properties") or {})
+
+    if (geometry := feature.get("geometry")) and geometry.get("type") == "Point":
+        record["longitude"], record["latitude"] = geometry["coordinates"][:2]
+
+    return record
@@ -0,0 +1,30 @@
+import zlib
+from collections import abc
+
+
+GZIP_WBITS = zlib.MAX_WBITS | 16
+
+
+async def iter_buffered(chunks: abc.AsyncIterable[bytes], size: int = 64 * 1024) -> abc.AsyncIterator[bytes]:
+    # Rows are encoded one by one, sending each of them alone would cost a write per row
+    buffer = bytearray()
+
+    async for chunk in chunks:
+        buffer += chunk
+
+        if len(buffer) >= size:
+            yield bytes(buffer)
+            buffer.clear()
+
+    if buffer:
+        yield bytes(buffer)
+
+
+async def iter_gzip(chunks: abc.AsyncIterable[bytes], compress_level: int = 6) -> abc.AsyncIterator[bytes]:
+    compressor = zlib.compressobj(compress_level, zlib.DEFLATED, GZIP_WBITS)
+
+    async for chunk in chunks:
+        if compressed := compressor.compress(chunk):
+            yield compressed
+
+    yield compressor.flush()
@@ -0,0 +1,124 @@
+import datetime as dt
+import random
+import typing as t
+from collections import abc
+from contextlib import contextmanager
+from functools import wraps
+from types import ModuleType
+
+
+if t.TYPE_CHECKING:
+    from sentry_sdk._types import Event, Hint
+
+
+T = t.TypeVar("T")
+P = t.ParamSpec("P")
+OK_SPAN_STATUSES = frozenset({None, "ok"})
+
+# sentry_sdk is imported only when tracing is enabled, until then spans are no-ops
+_sentry_sdk: ModuleType | None = None
+
+
+def init_tracing(
+    dsn: str, slow_threshold_ms: int, fast_sample_rate: float, sample_rate: float = 1.0, with_query_spans: bool = False
+) -> None:
+    global _sentry_sdk
+
+    import sentry_sdk
+    from sentry_sdk.integrations.aiohttp import AioHttpIntegration
+    from sentry_sdk.integrations.fastapi import FastApiIntegration
+    from sentry_sdk.integrations.redis import RedisIntegration
+    from sentry_sdk.integrations.sqlalchemy import SqlalchemyIntegration
+    from sentry_sdk.integrations.starlette import StarletteIntegration
+
+    # Every redis command and SQL query becomes a span of each recorded request, which is paid even for
+    # the transactions the tail sampler drops later, so they are recorded only on demand
+    query_integrations = [RedisIntegration(), SqlalchemyIntegration()]
+
+    sentry_sdk.init(
+        dsn=dsn,
+        # Requests picked by the head rate are recorded, the decision to keep them is made once they are finished
+        traces_sample_rate=sample_rate,
+        before_send_transaction=TailSampler(slow_threshold_ms / 1000, fast_sample_rate),
+        integrations=[
+            StarletteIntegration(transaction_style="url"),
+            FastApiIntegration(transaction_style="url"),
+            AioHttpIntegration(),
+            *(query_integrations if with_query_spans else ()),
+        ],
+        # Both are enabled automatically when their packages are installed
+        disabled_integrations=[] if with_query_spans else query_integrations,
+    )
+    _sentry_sdk = sentry_sdk
+
+
+@contextmanager
+def start_trace(name: str, op: str) -> abc.Iterator[None]:
+    if _sentry_sdk is None:
+        yield
+        return
+
+    with _sentry_sdk.start_transaction(name=name, op=op):
+        yield
+
+
+def traced(
+    name: str, op: str
+) -> abc.Callable[[abc.Callable[P, abc.Awaitable[T]]], abc.Callable[P, abc.Awaitable[T]]]:
+    def decorator(func: abc.Callable[P, abc.Awaitable[T]]) -> abc.Callable[P, abc.Awaitable[T]]:
+        @wraps(func)
+        async def wrapper(*args: P.args, **kwargs: P.kwargs) -> T:
+            with start_trace(name, op):
+                return await func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+@contextmanager
+def trace_span(op: str, name: str) -> abc.Iterator[None]:
+    if _sentry_sdk is None:
+        yield
+        return
+
+    with _sentry_sdk.start_span(op=op, name=name):
+        yield
+
+
+class TailSampler:
+    def __init__(self, slow_threshold: float, fast_sample_rate: float, rand: abc.Callable[[], float] = random.random):
+        self.slow_threshold = slow_threshold
+        self.fast_sample_rate = fast_sample_rate
+        self.rand = rand
+
+    def __call__(self, event: "Event", hint: "Hint") -> "Event | None":
+        if self._is_failed(event) or self._get_duration(event) >= self.slow_threshold:
+            return event
+
+        if self.rand() < self.fast_sample_rate:
+            return event
+
+        return None
+
+    @staticmethod
+    def _is_failed(event: "Event") -> bool:
+        if event.get("contexts", {}).get("trace", {}).get("status") not in OK_SPAN_STATUSES:
+            return True
+
+        # Spans are a plain list until the event is serialized, only then they can be wrapped with trimming metadata
+        spans = event.get("spans", [])
+
+        return isinstance(spans, list) and any(span.get("status") not in OK_SPAN_STATUSES for span in spans)
+
+    @staticmethod
+    def _get_duration(event: "Event") -> float:
+        started_at, finished_at = event.get("start_timestamp"), event.get("timestamp")
+
+        if started_at is None or finished_at is None:
+            return 0.0
+
+        if isinstance(started_at, str):
+            started_at, finished_at = dt.datetime.fromisoformat(started_at), dt.datetime.fromisoformat(finished_at)
+
+        return (finished_at - started_at).total_seconds()
@@ -0,0 +1,19 @@
+import typing as t
+
+from uvicorn.workers import UvicornWorker
+
+from .server import HTTP_PROTOCOL
+from .settings import load_settings
+
+
+class ServerWorker(UvicornWorker):
+    def __init__(self, *args: t.Any, **kwargs: t.Any) -> None:
+        # gunicorn has no options for these, the worker reads them from the launcher settings
+        settings = load_settings()
+        self.CONFIG_KWARGS = {
+            **self.CONFIG_KWARGS,
+            "loop": settings.event_loop.value,
+            "http": HTTP_PROTOCOL,
+            "limit_concurrency": settings.limit_concurrency,
+        }
+        super().__init__(*args, **kwargs)
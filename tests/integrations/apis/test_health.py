@@ -0,0 +1,11 @@
+async def test_readiness_checks_datastores(client):
+    response = await client.get("/api/v1/health/ready")
+
+    assert response.status_code == 200
+    assert response.json() == {"status": "ready", "checks": {"postgres": True, "redis": True, "warm_up": True}}
+
+
+async def test_liveness(client):
+    response = await client.get("/api/v1/health/live")
+
+    assert response.status_code == 200
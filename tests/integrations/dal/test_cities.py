@@ -3,6 +3,7 @@ import pytest
 from brew_scout.libs.dal.city import CityRepository
 from brew_scout.libs.dal.models.shops import CityModel
 from brew_scout.libs.domains.cities import City
+from brew_scout.libs.managers import DatabaseSessionManager
 
 
 @pytest.fixture()
@@ -32,3 +33,19 @@ async def test_get_city_by_place_coordinates(
     res = await repository.get_city_by_coordinates(latitude=some_city_latitude, longitude=some_city_longitude)
 
     assert res.name == expected_city
+
+
+async def test_get_city_by_coordinates_from_replica(pg_conf, app):
+    credentials, address = f"{pg_conf['user']}:{pg_conf['password']}", f"{pg_conf['host']}:{pg_conf['port']}"
+    dsn = f"postgresql+asyncpg://{credentials}@{address}/{pg_conf['db']}"
+    manager = DatabaseSessionManager.init(dsn, replica_dsns=[dsn])
+    repository = CityRepository(CityModel, manager)
+
+    try:
+        res = await repository.get_city_by_coordinates(latitude=51.51363862348303, longitude=-0.06889059337225804)
+    finally:
+        await manager.close()
+
+    # The session is closed by now, the loaded attributes are still available
+    assert res.id is not None
+    assert res.name == City.LONDON
@@ -0,0 +1,44 @@
+import pytest
+
+from brew_scout.libs.dal.imports import CatalogueImportRepository
+from brew_scout.libs.dal.models.shops import CoffeeShopModel
+from brew_scout.libs.dal.shop import CoffeeShopRepository
+
+
+@pytest.fixture()
+def repository(db_session):
+    return CatalogueImportRepository(CoffeeShopModel, db_session)
+
+
+async def batches(*records):
+    yield list(records)
+
+
+@pytest.mark.usefixtures("db_session")
+async def test_import_coffee_shops_creates_and_updates(repository: CatalogueImportRepository, db_session):
+    record = ("Atlantis", "Poseidonia", "Trident", "https://trident.coffee/", 1.0, 2.0, None, None, None, None)
+
+    created = await repository.import_coffee_shops(batches(record))
+    updated = await repository.import_coffee_shops(batches(record[:4] + (1.5,) + record[5:]))
+    unchanged = await repository.import_coffee_shops(batches(record[:4] + (1.5,) + record[5:]))
+
+    assert (created.countries_created, created.cities_created, created.shops_created) == (1, 1, 1)
+    assert (updated.shops_created, updated.shops_updated) == (0, 1)
+    assert (unchanged.shops_created, unchanged.shops_updated) == (0, 0)
+    assert created.cities == frozenset({"poseidonia"})
+
+    coffee_shops = await CoffeeShopRepository(CoffeeShopModel, db_session).get_by_city_name("Poseidonia")
+    assert [(cs.name, cs.latitude) for cs in coffee_shops] == [("Trident", 1.5)]
+
+
+@pytest.mark.usefixtures("db_session")
+async def test_import_coffee_shops_tells_cities_apart_by_country(repository: CatalogueImportRepository, db_session):
+    in_atlantis = ("Atlantis", "Heracleion", "Trident", "https://trident.coffee/", 1.0, 2.0, None, None, None, None)
+    in_lemuria = ("Lemuria", "heracleion", "Conch", "https://conch.coffee/", 3.0, 4.0, None, None, None, None)
+
+    stats = await repository.import_coffee_shops(batches(in_atlantis, in_lemuria))
+
+    assert (stats.countries_created, stats.cities_created, stats.shops_created) == (2, 2, 2)
+
+    coffee_shops = await CoffeeShopRepository(CoffeeShopModel, db_session).get_by_city_name("Heracleion")
+    assert len({cs.city_id for cs in coffee_shops}) == 2
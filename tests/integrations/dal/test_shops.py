@@ -2,6 +2,7 @@ import pytest
 
 from brew_scout.libs.dal.shop import CoffeeShopRepository
 from brew_scout.libs.dal.models.shops import CoffeeShopModel
+from brew_scout.libs.domains.shops import CoffeeShopField, CoffeeShopsFilter
 
 from ...factory_boys import CountryFactory, CityFactory, CoffeeShopFactory
 
@@ -26,3 +27,25 @@ async def test_get_by_city_name(repository: CoffeeShopRepository):
     result = await repository.get_by_city_name(city.name)
 
     assert len(coffee_shops) == len(result)
+
+
+@pytest.mark.usefixtures("db_session")
+async def test_get_by_city_id(repository: CoffeeShopRepository):
+    city = await CityFactory.create(country=CountryFactory.create())
+    coffee_shops = await CoffeeShopFactory.create_batch(2, city=city)
+    await CoffeeShopFactory.create()
+    result = await repository.get_by_city_id(city.id)
+
+    assert [row.name for row in result] == [cs.name for cs in sorted(coffee_shops, key=lambda cs: cs.id)]
+
+
+@pytest.mark.usefixtures("db_session")
+async def test_get_rows_paginates_by_id(repository: CoffeeShopRepository):
+    city = await CityFactory.create(country=CountryFactory.create())
+    coffee_shops = sorted(await CoffeeShopFactory.create_batch(3, city=city), key=lambda cs: cs.id)
+    fields = [CoffeeShopField.ID, CoffeeShopField.NAME]
+
+    first_page = await repository.get_rows(fields, CoffeeShopsFilter(city_id=city.id), limit=2)
+    second_page = await repository.get_rows(fields, CoffeeShopsFilter(after_id=first_page[-1].id, city_id=city.id), 2)
+
+    assert [row.name for row in [*first_page, *second_page]] == [cs.name for cs in coffee_shops]
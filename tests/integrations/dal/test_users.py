@@ -0,0 +1,23 @@
+import pytest
+
+from brew_scout.libs.dal.models.users import UserModel
+from brew_scout.libs.dal.user import UserRepository
+from brew_scout.libs.serializers.telegram import From
+
+
+@pytest.fixture()
+def repository(db_session):
+    return UserRepository(UserModel, db_session)
+
+
+async def test_upsert_users_keeps_creation_time(repository: UserRepository):
+    user = From(id=1, is_bot=False, first_name="Doge", username="doge")
+
+    await repository.upsert_users([user])
+    created_at = (await repository.get_all())[0].created_at
+
+    # A flushed buffer upserts known users again, only their mutable fields change
+    await repository.upsert_users([user])
+    (updated,) = await repository.get_all()
+
+    assert updated.created_at == created_at
@@ -1,5 +1,6 @@
 import pytest
 
+from brew_scout.libs.domains.limits import RateLimit, RateLimitScope
 from brew_scout.libs.services.kv import KVService
 
 from ...factory_boys import CoffeeShopFactory, CityFactory, UserFactory
@@ -50,3 +51,30 @@ async def test_get_nearest_coffee_shops(service: KVService):
     result = await service.get_nearest_coffee_shops(city.name, user.username, source_latitude, source_longitude)
 
     assert shop2.name == result[0].name
+
+
+async def test_mark_update_as_seen(service: KVService, faker):
+    update_id = faker.pyint()
+
+    assert await service.mark_update_as_seen(update_id) is True
+    assert await service.mark_update_as_seen(update_id) is False
+
+
+async def test_take_tokens_takes_from_every_bucket_or_none(service: KVService, faker):
+    user_id, chat_id = faker.pyint(), faker.pyint()
+    buckets = {
+        (RateLimitScope.USER, user_id): RateLimit(capacity=2, refill_rate=0.01),
+        (RateLimitScope.CHAT, chat_id): RateLimit(capacity=1, refill_rate=0.01),
+    }
+
+    assert await service.take_tokens(buckets) == 0
+    assert await service.take_tokens(buckets) > 0
+    # The user bucket kept its token, because the chat bucket was empty
+    assert await service.take_tokens({(RateLimitScope.USER, user_id): RateLimit(capacity=2, refill_rate=0.01)}) == 0
+
+
+async def test_mark_throttle_notified(service: KVService, faker):
+    chat_id = faker.pyint()
+
+    assert await service.mark_throttle_notified(chat_id) is True
+    assert await service.mark_throttle_notified(chat_id) is False
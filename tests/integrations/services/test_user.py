@@ -79,3 +79,13 @@ async def test_store_user_if_exist_do_update(user_service):
     assert str(users[0].id) == user.id
     assert users[0].first_name == user_payload.first_name
     assert users[0].last_name == user_payload.last_name
+
+
+async def test_flush_buffered_users(user_service, parsed_user_payload):
+    user_service.buffer_user(parsed_user_payload)
+    user_service.buffer_user(parsed_user_payload)
+    await user_service.flush()
+
+    users = await user_service.get_users()
+    assert len(users) == 1
+    assert users[0].tuid == parsed_user_payload.tuid
@@ -0,0 +1,59 @@
+import asyncio
+from unittest import mock
+
+import pytest
+
+from brew_scout.libs.handlers.poll_telegram_updates import TelegramUpdatesPoller
+from brew_scout.libs.services.runner.pool import KeyedTaskPool
+
+
+def make_update(update_id, chat_id, text="/start"):
+    user = {"id": chat_id, "is_bot": False, "first_name": "Doge", "last_name": None, "username": "doge"}
+
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "from": user | {"language_code": "en"},
+            "chat": user | {"type": "private"},
+            "date": 1713100485,
+            "text": text,
+        },
+    }
+
+
+async def test_poll_once_tracks_offset_and_dispatches_updates():
+    bus_service = mock.AsyncMock()
+    bus_service.get_updates.return_value = [
+        make_update(10, 1),
+        {"update_id": 11, "edited_message": {}},
+        make_update(12, 2),
+    ]
+    hook_handler = mock.AsyncMock()
+    poller = TelegramUpdatesPoller(bus_service=bus_service, hook_handler=hook_handler, task_pool=KeyedTaskPool())
+
+    assert await poller.poll_once() == 3
+    await poller.task_pool.close()
+
+    bus_service.get_updates.assert_awaited_once_with(offset=None, limit=100, timeout=25)
+    assert [call.kwargs["payload"].update_id for call in hook_handler.process_hook.await_args_list] == [10, 12]
+
+    bus_service.get_updates.return_value = []
+    await poller.poll_once()
+
+    bus_service.get_updates.assert_awaited_with(offset=13, limit=100, timeout=25)
+
+
+async def test_run_forever_retries_webhook_deletion_before_polling():
+    bus_service = mock.AsyncMock()
+    bus_service.delete_webhook.side_effect = [RuntimeError("Telegram is down"), None]
+    bus_service.get_updates.side_effect = [[], asyncio.CancelledError()]
+    poller = TelegramUpdatesPoller(
+        bus_service=bus_service, hook_handler=mock.AsyncMock(), task_pool=KeyedTaskPool(), error_pause=0
+    )
+
+    with pytest.raises(asyncio.CancelledError):
+        await poller.run_forever()
+
+    assert bus_service.delete_webhook.await_count == 2
+    assert bus_service.get_updates.await_count == 2
@@ -0,0 +1,146 @@
+from unittest import mock
+
+import pytest
+
+from brew_scout.libs.domains.limits import RateLimitDecision
+from brew_scout.libs.domains.shops import CatalogueVersion, CoffeeShop
+from brew_scout.libs.handlers.handle_telegram_hook import TelegramHookHandler
+from brew_scout.libs.serializers.telegram import TelegramHookIn
+from brew_scout.libs.utils import tracing
+
+
+@pytest.fixture()
+def location_payload():
+    user = {"id": 1, "is_bot": False, "first_name": "Doge", "last_name": None, "username": "doge"}
+
+    return TelegramHookIn.model_validate(
+        {
+            "update_id": 1,
+            "message": {
+                "message_id": 1,
+                "from": user | {"language_code": "en"},
+                "chat": user | {"type": "private"},
+                "date": 1713014702,
+                "text": None,
+                "location": {"latitude": 51.50735721897955, "longitude": -0.09935182043450592},
+            },
+        }
+    )
+
+
+@pytest.fixture()
+def handler():
+    services = {
+        name: mock.AsyncMock()
+        for name in (
+            "bus_service",
+            "geo_service",
+            "city_service",
+            "shop_service",
+            "kv_service",
+            "user_service",
+            "deduplication_service",
+            "rate_limit_service",
+            "catalogue_service",
+        )
+    }
+    services["geo_service"].should_offload = mock.Mock(return_value=False)
+    services["rate_limit_service"].acquire.return_value = RateLimitDecision(is_allowed=True)
+    services["city_service"].try_to_find_city_from_coordinates.return_value = mock.Mock()
+    services["city_service"].try_to_find_city_from_coordinates.return_value.name = "London"
+    services["city_service"].try_to_find_city_from_coordinates.return_value.id = 1
+
+    return TelegramHookHandler(**services)
+
+
+async def test_process_hook_buffers_user(handler, location_payload):
+    handler.user_service.buffer_user = mock.Mock()
+    handler.kv_service.get_nearest_coffee_shops.return_value = [
+        CoffeeShop(name="Birch", latitude=51.5, longitude=-0.1, web_url="https://birch.coffee", distance=0.1)
+    ]
+
+    await handler.process_hook(location_payload)
+
+    handler.user_service.buffer_user.assert_called_once_with(location_payload.message.message_from)
+    handler.user_service.store_user.assert_not_awaited()
+    handler.bus_service.send_nearest_coffee_shops_message.assert_awaited_once()
+
+
+async def test_process_hook_loads_coffee_shops_from_db_on_cache_miss(handler, location_payload):
+    handler.user_service.buffer_user = mock.Mock()
+    coffee_shop = CoffeeShop(name="Birch", latitude=51.5, longitude=-0.1, web_url="https://birch.coffee")
+    handler.kv_service.get_nearest_coffee_shops.return_value = []
+    handler.kv_service.get_coffee_shops.return_value = []
+    handler.shop_service.get_coffee_shops_for_city_id.return_value = [coffee_shop]
+    handler.geo_service.find_nearest_coffee_shops.return_value = [coffee_shop]
+
+    await handler.process_hook(location_payload)
+    await handler.close()
+
+    handler.shop_service.get_coffee_shops_for_city_id.assert_awaited_once_with(1)
+    handler.kv_service.set_coffee_shops.assert_awaited_once_with("London", "doge", [coffee_shop])
+    handler.bus_service.send_nearest_coffee_shops_message.assert_awaited_once_with(chat_id=1, coffee_shop=coffee_shop)
+
+
+async def test_process_hook_keys_big_city_ranking_by_catalogue_version(handler, location_payload):
+    handler.user_service.buffer_user = mock.Mock()
+    coffee_shop = CoffeeShop(name="Birch", latitude=51.5, longitude=-0.1, web_url="https://birch.coffee")
+    handler.kv_service.get_nearest_coffee_shops.return_value = []
+    handler.kv_service.get_coffee_shops.return_value = [coffee_shop]
+    handler.geo_service.should_offload.return_value = True
+    handler.geo_service.find_nearest_coffee_shops.return_value = [coffee_shop]
+    handler.catalogue_service.get_version.return_value = CatalogueVersion(rows=1)
+
+    await handler.process_hook(location_payload)
+
+    handler.geo_service.find_nearest_coffee_shops.assert_awaited_once_with(
+        source_latitude=location_payload.message.location.latitude,
+        source_longitude=location_payload.message.location.longitude,
+        coffee_shops=[coffee_shop],
+        catalogue_key=(1, CatalogueVersion(rows=1).etag),
+    )
+
+
+async def test_process_hook_records_storage_spans(handler, location_payload, monkeypatch):
+    sentry_sdk = mock.MagicMock()
+    monkeypatch.setattr(tracing, "_sentry_sdk", sentry_sdk)
+    handler.user_service.buffer_user = mock.Mock()
+    handler.kv_service.get_nearest_coffee_shops.return_value = []
+    handler.kv_service.get_coffee_shops.return_value = []
+    handler.shop_service.get_coffee_shops_for_city_id.return_value = []
+
+    await handler.process_hook(location_payload)
+
+    sentry_sdk.start_transaction.assert_called_once_with(name="telegram.process_hook", op="queue.process")
+    assert {(c.kwargs["op"], c.kwargs["name"]) for c in sentry_sdk.start_span.call_args_list} >= {
+        ("db.redis", "rate_limit"),
+        ("db.redis", "cache_get"),
+        ("db", "db_load"),
+    }
+
+
+async def test_process_hook_keys_cache_by_user_id_without_username(handler, location_payload):
+    handler.user_service.buffer_user = mock.Mock()
+    location_payload.message.message_from.username = None
+    handler.kv_service.get_nearest_coffee_shops.return_value = []
+    handler.kv_service.get_coffee_shops.return_value = []
+    handler.shop_service.get_coffee_shops_for_city_id.return_value = []
+
+    await handler.process_hook(location_payload)
+
+    handler.kv_service.get_coffee_shops.assert_awaited_once_with("London", "1")
+
+
+@pytest.mark.parametrize("should_notify", [True, False])
+async def test_process_hook_stops_throttled_sender(handler, location_payload, should_notify):
+    handler.user_service.buffer_user = mock.Mock()
+    handler.rate_limit_service.acquire.return_value = RateLimitDecision(
+        is_allowed=False, retry_after=2.0, should_notify=should_notify
+    )
+
+    await handler.process_hook(location_payload)
+
+    handler.rate_limit_service.acquire.assert_awaited_once_with(1, 1)
+    assert handler.bus_service.send_throttled_message.await_count == int(should_notify)
+    handler.user_service.buffer_user.assert_not_called()
+    handler.city_service.try_to_find_city_from_coordinates.assert_not_awaited()
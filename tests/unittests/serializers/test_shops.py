@@ -0,0 +1,30 @@
+import pytest
+from pydantic import ValidationError
+
+from brew_scout.libs.domains.shops import BoundingBox, CoffeeShopField, CoffeeShopsFilter
+from brew_scout.libs.serializers.shops import CoffeeShopsQueryIn
+
+
+def test_coffee_shops_query_defaults():
+    query = CoffeeShopsQueryIn()
+
+    assert query.limit == 100
+    assert query.fields is None
+    assert query.to_filter() == CoffeeShopsFilter()
+
+
+def test_coffee_shops_query_parses_bbox_and_fields():
+    query = CoffeeShopsQueryIn.model_validate(
+        {"after_id": 10, "country_id": 2, "bbox": "51.3,-0.5,51.7,0.3", "fields": ["id,name", "latitude"]}
+    )
+
+    assert query.fields == [CoffeeShopField.ID, CoffeeShopField.NAME, CoffeeShopField.LATITUDE]
+    assert query.to_filter() == CoffeeShopsFilter(
+        after_id=10, country_id=2, bounding_box=BoundingBox(51.3, -0.5, 51.7, 0.3)
+    )
+
+
+@pytest.mark.parametrize("params", ({"bbox": "1,2,3"}, {"fields": "id,unknown"}, {"limit": 0}))
+def test_coffee_shops_query_rejects_invalid_params(params):
+    with pytest.raises(ValidationError):
+        CoffeeShopsQueryIn.model_validate(params)
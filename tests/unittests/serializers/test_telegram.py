@@ -0,0 +1,39 @@
+import pytest
+
+from brew_scout.libs.serializers.telegram import get_update_type, parse_update
+
+
+USER = {"id": 7, "is_bot": False, "first_name": "Doge"}
+
+
+def make_message(**kwargs):
+    return {"message_id": 1, "from": USER, "chat": USER | {"type": "private"}, "date": 1713100485, **kwargs}
+
+
+def test_parse_message_without_username_and_language():
+    payload = parse_update({"update_id": 1, "message": make_message(text="/start")})
+
+    assert payload is not None
+    assert payload.message.message_from.tuid == 7
+    assert payload.message.message_from.username is None
+    assert payload.message.message_from.language_code is None
+    assert payload.message.chat.username is None
+
+
+@pytest.mark.parametrize(
+    "raw_update",
+    [
+        {"update_id": 1, "edited_message": make_message(text="/start")},
+        {"update_id": 1, "callback_query": {"id": "1", "from": USER}},
+        {"update_id": 1, "channel_post": {"message_id": 1, "date": 1713100485}},
+        {"update_id": 1, "message": {"message_id": 1}},
+        {"update_id": 1},
+    ],
+)
+def test_skip_unsupported_updates(raw_update):
+    assert parse_update(raw_update) is None
+
+
+def test_get_update_type():
+    assert get_update_type({"update_id": 1, "callback_query": {}}) == "callback_query"
+    assert get_update_type({"update_id": 1}) is None
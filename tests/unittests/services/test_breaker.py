@@ -0,0 +1,105 @@
+import asyncio
+
+import pytest
+
+from brew_scout.libs.services.runner.breaker import CircuitBreaker, CircuitOpenError, CircuitState
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+async def succeed():
+    return "ok"
+
+
+async def fail():
+    raise ConnectionError("doge")
+
+
+@pytest.fixture()
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture()
+def breaker(clock):
+    return CircuitBreaker(name="test", window_size=4, minimum_calls=4, open_timeout=10.0, clock=clock)
+
+
+async def open_breaker(breaker):
+    for _ in range(4):
+        with pytest.raises(ConnectionError):
+            await breaker.call(fail)
+
+
+async def test_breaker_opens_when_failure_rate_is_reached(breaker):
+    await breaker.call(succeed)
+    await breaker.call(succeed)
+
+    with pytest.raises(ConnectionError):
+        await breaker.call(fail)
+
+    assert breaker.state == CircuitState.CLOSED
+
+    with pytest.raises(ConnectionError):
+        await breaker.call(fail)
+
+    assert breaker.state == CircuitState.OPEN
+
+
+async def test_breaker_fails_fast_while_open(breaker, clock):
+    await open_breaker(breaker)
+    clock.now = 4.0
+
+    with pytest.raises(CircuitOpenError) as e:
+        await breaker.call(succeed)
+
+    assert e.value.retry_after == 6.0
+    assert breaker.snapshot()["state"] == CircuitState.OPEN
+
+
+async def test_breaker_closes_after_successful_trial_call(breaker, clock):
+    await open_breaker(breaker)
+    clock.now = 10.0
+
+    assert breaker.state == CircuitState.HALF_OPEN
+    assert await breaker.call(succeed) == "ok"
+    assert breaker.state == CircuitState.CLOSED
+    assert breaker.failure_rate == 0.0
+
+
+async def test_breaker_reopens_after_failed_trial_call(breaker, clock):
+    await open_breaker(breaker)
+    clock.now = 10.0
+
+    with pytest.raises(ConnectionError):
+        await breaker.call(fail)
+
+    assert breaker.state == CircuitState.OPEN
+
+
+async def test_breaker_allows_single_trial_call(breaker, clock):
+    await open_breaker(breaker)
+    clock.now = 10.0
+    trial_call = asyncio.create_task(breaker.call(asyncio.sleep, 0.01))
+    await asyncio.sleep(0)
+
+    with pytest.raises(CircuitOpenError):
+        await breaker.call(succeed)
+
+    await trial_call
+    assert breaker.state == CircuitState.CLOSED
+
+
+async def test_breaker_ignores_errors_which_are_not_failures(clock):
+    breaker = CircuitBreaker(name="test", window_size=1, minimum_calls=1, is_failure=lambda e: False, clock=clock)
+
+    with pytest.raises(ConnectionError):
+        await breaker.call(fail)
+
+    assert breaker.state == CircuitState.CLOSED
@@ -0,0 +1,46 @@
+import datetime as dt
+from unittest import mock
+
+import pytest
+from redis.exceptions import RedisError
+
+from brew_scout.libs.domains.shops import CatalogueVersion
+from brew_scout.libs.services.catalogue import CatalogueService
+
+
+VERSION = CatalogueVersion(rows=3, updated_at=dt.datetime(2024, 5, 19, 16, 16, 43, tzinfo=dt.UTC))
+
+
+@pytest.fixture()
+def service():
+    return CatalogueService(repository=mock.AsyncMock(), kv_service=mock.AsyncMock(), expiration_time=30)
+
+
+async def test_get_version_from_cache(service):
+    service.kv_service.get_catalogue_version.return_value = VERSION
+
+    assert await service.get_version() == VERSION
+    service.repository.get_catalogue_version.assert_not_awaited()
+
+
+async def test_get_version_from_db_on_cache_miss(service):
+    service.kv_service.get_catalogue_version.return_value = None
+    service.repository.get_catalogue_version.return_value = VERSION
+
+    assert await service.get_version() == VERSION
+    service.repository.get_catalogue_version.assert_awaited_once_with(from_primary=True)
+    service.kv_service.set_catalogue_version.assert_awaited_once_with(VERSION, 30)
+
+
+async def test_get_version_from_db_if_redis_is_down(service):
+    service.kv_service.get_catalogue_version.side_effect = RedisError
+    service.repository.get_catalogue_version.return_value = VERSION
+
+    assert await service.get_version() == VERSION
+    service.repository.get_catalogue_version.assert_awaited_once_with()
+    service.kv_service.set_catalogue_version.assert_not_awaited()
+
+
+def test_etag_changes_with_version():
+    assert VERSION.etag != CatalogueVersion(rows=2, updated_at=VERSION.updated_at).etag
+    assert VERSION.etag != CatalogueVersion(rows=3, updated_at=VERSION.updated_at + dt.timedelta(microseconds=1)).etag
@@ -0,0 +1,34 @@
+from unittest import mock
+
+from brew_scout.libs.domains.shops import CoffeeShop
+from brew_scout.libs.services.geo.service import GeoService
+
+
+async def test_find_nearest_coffee_shops_sorts_copies_by_distance():
+    client = mock.Mock()
+    client.calculate_distance.side_effect = lambda source, target: mock.Mock(kilometers=abs(target[0] - source[0]))
+    far = CoffeeShop(name="Far", latitude=51.9, longitude=-0.1, web_url="https://far.coffee")
+    near = CoffeeShop(name="Near", latitude=51.6, longitude=-0.1, web_url="https://near.coffee")
+    twin = CoffeeShop(name="Twin", latitude=51.4, longitude=-0.1, web_url="https://twin.coffee")
+
+    result = await GeoService(client=client).find_nearest_coffee_shops(51.5, -0.1, [far, near, twin])
+
+    assert [cs.name for cs in result] == ["Near", "Twin", "Far"]
+    assert result[0].distance == abs(51.6 - 51.5)
+    assert far.distance is None
+
+
+async def test_find_nearest_coffee_shops_offloads_big_cities():
+    ranker = mock.Mock()
+    ranker.should_offload.return_value = True
+    far = CoffeeShop(name="Far", latitude=51.9, longitude=-0.1, web_url="https://far.coffee")
+    near = CoffeeShop(name="Near", latitude=51.6, longitude=-0.1, web_url="https://near.coffee")
+    # The ranker answers in the order of its shared segment, not in the order of the request
+    ranker.measure = mock.AsyncMock(return_value=((near, far), [1.0, 3.0]))
+
+    result = await GeoService(client=mock.Mock(), distance_ranker=ranker).find_nearest_coffee_shops(
+        51.5, -0.1, [far, near], catalogue_key=(1, "etag")
+    )
+
+    ranker.measure.assert_awaited_once_with((51.5, -0.1), [far, near], (1, "etag"))
+    assert [(cs.name, cs.distance) for cs in result] == [("Near", 1.0), ("Far", 3.0)]
@@ -0,0 +1,85 @@
+import asyncio
+from unittest import mock
+
+import pytest
+from redis.exceptions import ConnectionError
+
+from brew_scout.libs.domains.health import HealthCheck, HealthStatus
+from brew_scout.libs.services.health import HealthService
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture()
+def clock():
+    return Clock()
+
+
+@pytest.fixture()
+def service(clock):
+    redis_session_manager = mock.Mock()
+    redis_session_manager.get_client.return_value = mock.AsyncMock()
+
+    return HealthService(
+        database_session_manager=mock.AsyncMock(is_warm=True),
+        redis_session_manager=redis_session_manager,
+        timeout=0.1,
+        cache_ttl=3.0,
+        clock=clock,
+    )
+
+
+async def test_ready_when_all_checks_pass(service):
+    report = await service.get_report()
+
+    assert report.status == HealthStatus.READY
+    assert report.checks == {HealthCheck.POSTGRES: True, HealthCheck.REDIS: True, HealthCheck.WARM_UP: True}
+
+
+async def test_not_ready_when_redis_is_down(service):
+    service.redis_session_manager.get_client.return_value.ping.side_effect = ConnectionError
+
+    report = await service.get_report()
+
+    assert report.status == HealthStatus.NOT_READY
+    assert report.checks[HealthCheck.REDIS] is False
+    assert report.checks[HealthCheck.POSTGRES] is True
+
+
+async def test_check_times_out(service):
+    async def hang() -> None:
+        await asyncio.sleep(1)
+
+    service.database_session_manager.ping.side_effect = hang
+
+    report = await service.get_report()
+
+    assert report.checks[HealthCheck.POSTGRES] is False
+
+
+async def test_warm_up_is_retried_while_pool_is_cold(service):
+    service.database_session_manager.is_warm = False
+
+    report = await service.get_report()
+
+    assert report.checks[HealthCheck.WARM_UP] is False
+    service.database_session_manager.warm_up.assert_awaited_once_with(size=2, timeout=0.1)
+
+
+async def test_report_is_cached(service, clock):
+    first_report = await service.get_report()
+    clock.now += 1.0
+
+    assert await service.get_report() is first_report
+    service.database_session_manager.ping.assert_awaited_once()
+
+    clock.now += 3.0
+
+    assert await service.get_report() is not first_report
+    assert service.database_session_manager.ping.await_count == 2
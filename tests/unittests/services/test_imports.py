@@ -0,0 +1,80 @@
+from unittest import mock
+
+import orjson
+import pytest
+
+from brew_scout.libs.domains.shops import CatalogueImportStats
+from brew_scout.libs.services.imports import CatalogueImportService
+
+
+CSV_CONTENT = """country,city,name,web_url,latitude,longitude,city_min_latitude
+England,London,Birch,https://birch.coffee,51.5,-0.1,
+England,London,Broken,not a url,51.5,-0.1,
+England,London,Monmouth,https://monmouthcoffee.co.uk,51.51,-0.12,51.2
+"""
+
+
+@pytest.fixture()
+def service():
+    staged_batches = []
+
+    async def import_coffee_shops(batches):
+        async for batch in batches:
+            staged_batches.append(batch)
+
+        return CatalogueImportStats(staged=sum(map(len, staged_batches)), cities=frozenset({"london"}))
+
+    repository = mock.AsyncMock()
+    repository.import_coffee_shops.side_effect = import_coffee_shops
+    service = CatalogueImportService(
+        repository=repository, kv_service=mock.AsyncMock(), catalogue_service=mock.AsyncMock(), batch_size=2
+    )
+    service.repository.staged_batches = staged_batches
+
+    return service
+
+
+async def test_import_csv_skips_invalid_rows(service, tmp_path):
+    path = tmp_path / "shops.csv"
+    path.write_text(CSV_CONTENT)
+
+    stats = await service.import_file(path)
+
+    assert stats.staged == 2
+    assert stats.rejected == 1
+    assert service.repository.staged_batches == [
+        [("England", "London", "Birch", "https://birch.coffee/", 51.5, -0.1, None, None, None, None)],
+        [("England", "London", "Monmouth", "https://monmouthcoffee.co.uk/", 51.51, -0.12, 51.2, None, None, None)],
+    ]
+    service.catalogue_service.invalidate.assert_awaited_once()
+    service.kv_service.forget_coffee_shops.assert_awaited_once_with("london")
+
+
+async def test_import_geojson(service, tmp_path):
+    path = tmp_path / "shops.geojson"
+    path.write_bytes(
+        orjson.dumps(
+            {
+                "type": "FeatureCollection",
+                "features": [
+                    {
+                        "type": "Feature",
+                        "geometry": {"type": "Point", "coordinates": [-0.1, 51.5]},
+                        "properties": {
+                            "country": "England", "city": "London", "name": "Birch", "web_url": "https://b.c"
+                        },
+                    }
+                ],
+            }
+        )
+    )
+
+    stats = await service.import_file(path)
+
+    assert stats.staged == 1
+    assert service.repository.staged_batches[0][0][:6] == ("England", "London", "Birch", "https://b.c/", 51.5, -0.1)
+
+
+async def test_import_unsupported_format(service, tmp_path):
+    with pytest.raises(ValueError):
+        await service.import_file(tmp_path / "shops.xlsx")
@@ -0,0 +1,32 @@
+from unittest import mock
+
+from brew_scout.libs.domains.limits import RateLimit, RateLimitScope
+from brew_scout.libs.domains.shops import CoffeeShop
+from brew_scout.libs.services.kv import KVService
+
+
+def test_parse_zscan_result_keeps_coordinates_order():
+    result = KVService._parse_zscan_result([("Birch:51.5:-0.1:https://birch.coffee", 1.0)])
+
+    assert result == [CoffeeShop(name="Birch", latitude=51.5, longitude=-0.1, web_url="https://birch.coffee")]
+
+
+def test_parse_geosearch_result():
+    result = KVService._parse_geosearch_result([("Birch:51.5:-0.1:https://birch.coffee", 0.25, (-0.1, 51.5))])
+
+    assert result == [
+        CoffeeShop(name="Birch", latitude=51.5, longitude=-0.1, web_url="https://birch.coffee", distance=0.25)
+    ]
+
+
+async def test_take_tokens_reuses_registered_script():
+    client = mock.Mock()
+    script = client.register_script.return_value = mock.AsyncMock(return_value=b"0")
+    service = KVService(client=client)
+    buckets = {(RateLimitScope.USER, 1): RateLimit(capacity=2, refill_rate=0.5)}
+
+    assert await service.take_tokens(buckets) == 0
+    assert await service.take_tokens(buckets) == 0
+
+    client.register_script.assert_called_once()
+    assert script.await_count == 2
@@ -0,0 +1,97 @@
+from unittest import mock
+
+import pytest
+from redis.exceptions import ConnectionError
+
+from brew_scout.libs.domains.limits import RateLimit, RateLimitDecision, RateLimitScope
+from brew_scout.libs.services.limits import RateLimitService
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture()
+def clock():
+    return Clock()
+
+
+@pytest.fixture()
+def service(clock):
+    kv_service = mock.AsyncMock()
+    kv_service.take_tokens.return_value = 0.0
+    kv_service.mark_throttle_notified.return_value = True
+
+    return RateLimitService(
+        kv_service=kv_service,
+        user_limit=RateLimit(capacity=2, refill_rate=1.0),
+        chat_limit=RateLimit(capacity=5, refill_rate=2.0),
+        max_tracked_senders=2,
+        clock=clock,
+    )
+
+
+async def test_acquire_takes_user_and_chat_tokens(service):
+    assert await service.acquire(user_id=1, chat_id=2) == RateLimitDecision(is_allowed=True)
+
+    service.kv_service.take_tokens.assert_awaited_once_with(
+        {
+            (RateLimitScope.USER, 1): RateLimit(capacity=2, refill_rate=1.0),
+            (RateLimitScope.CHAT, 2): RateLimit(capacity=5, refill_rate=2.0),
+        }
+    )
+
+
+async def test_acquire_denies_and_notifies_once(service):
+    service.kv_service.take_tokens.return_value = 1.5
+
+    decision = await service.acquire(user_id=1, chat_id=2)
+
+    assert decision == RateLimitDecision(is_allowed=False, retry_after=1.5, should_notify=True)
+    service.kv_service.mark_throttle_notified.assert_awaited_once_with(2, 60)
+
+
+async def test_acquire_answers_blocked_sender_from_memory(service, clock):
+    service.kv_service.take_tokens.return_value = 1.5
+    await service.acquire(user_id=1, chat_id=2)
+
+    clock.now += 1.0
+    decision = await service.acquire(user_id=1, chat_id=2)
+
+    assert decision == RateLimitDecision(is_allowed=False, retry_after=0.5)
+    assert service.kv_service.take_tokens.await_count == 1
+
+    clock.now += 1.0
+    service.kv_service.take_tokens.return_value = 0.0
+
+    assert (await service.acquire(user_id=1, chat_id=2)).is_allowed
+    assert service.kv_service.take_tokens.await_count == 2
+
+
+async def test_acquire_forgets_oldest_blocked_senders(service):
+    service.kv_service.take_tokens.return_value = 10.0
+
+    for user_id in range(3):
+        await service.acquire(user_id=user_id, chat_id=user_id)
+
+    assert list(service._blocked_until) == [(1, 1), (2, 2)]
+
+
+async def test_acquire_fails_open_when_redis_is_down(service):
+    service.kv_service.take_tokens.side_effect = ConnectionError
+
+    assert (await service.acquire(user_id=1, chat_id=2)).is_allowed
+
+
+async def test_acquire_skips_notice_when_redis_fails_to_mark_it(service):
+    service.kv_service.take_tokens.return_value = 1.0
+    service.kv_service.mark_throttle_notified.side_effect = ConnectionError
+
+    decision = await service.acquire(user_id=1, chat_id=2)
+
+    assert not decision.is_allowed
+    assert not decision.should_notify
@@ -0,0 +1,92 @@
+import asyncio
+
+from brew_scout.libs.services.runner.pool import KeyedTaskPool
+
+
+async def test_keyed_task_pool_keeps_order_for_same_key():
+    pool = KeyedTaskPool(concurrency=4)
+    processed = []
+
+    async def job(key, value, delay):
+        await asyncio.sleep(delay)
+        processed.append((key, value))
+
+    await pool.submit("doge", job, "doge", 1, 0.03)
+    await pool.submit("doge", job, "doge", 2, 0.0)
+    await pool.submit("cat", job, "cat", 1, 0.01)
+    await pool.close()
+
+    assert [value for key, value in processed if key == "doge"] == [1, 2]
+    assert processed[0] == ("cat", 1)
+    assert pool.pending == 0
+
+
+async def test_keyed_task_pool_limits_concurrency():
+    pool = KeyedTaskPool(concurrency=2)
+    running, max_running = 0, 0
+
+    async def job():
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+
+    for key in range(6):
+        await pool.submit(key, job)
+
+    await pool.close()
+
+    assert max_running == 2
+
+
+async def test_keyed_task_pool_survives_failed_task():
+    pool = KeyedTaskPool()
+    processed = []
+
+    async def failing_job():
+        raise ValueError("doge")
+
+    async def job():
+        processed.append(True)
+
+    await pool.submit(1, failing_job)
+    await pool.submit(1, job)
+    await pool.close()
+
+    assert processed == [True]
+
+
+async def test_keyed_task_pool_rejects_when_full():
+    pool = KeyedTaskPool(concurrency=1, max_pending=2)
+    release = asyncio.Event()
+
+    assert await pool.try_submit(1, release.wait) is True
+    assert await pool.try_submit(2, release.wait) is True
+    assert await pool.try_submit(3, release.wait) is False
+    await asyncio.sleep(0)
+    assert pool.stats() == {"concurrency": 1, "max_pending": 2, "running": 1, "queued": 1, "rejected": 1}
+
+    release.set()
+    await pool.close()
+
+    assert await pool.try_submit(4, release.wait) is False
+
+
+async def test_keyed_task_pool_cancels_tasks_after_drain_timeout():
+    pool = KeyedTaskPool()
+    cancelled = asyncio.Event()
+
+    async def job():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    await pool.submit(1, job)
+    await asyncio.sleep(0)
+    await pool.close(timeout=0.01)
+
+    assert cancelled.is_set()
+    assert pool.pending == 0
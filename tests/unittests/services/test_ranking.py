@@ -0,0 +1,73 @@
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from unittest import mock
+
+import pytest
+
+from brew_scout.libs.domains.shops import CoffeeShop
+from brew_scout.libs.services.geo.ranking import DistanceRanker, flatten_coordinates, measure_distances
+
+
+SOURCE = (51.5, -0.1)
+COFFEE_SHOPS = [
+    CoffeeShop(name="North", latitude=51.6, longitude=-0.1, web_url="https://north.coffee"),
+    CoffeeShop(name="West", latitude=51.4, longitude=-0.2, web_url="https://west.coffee"),
+    CoffeeShop(name="East", latitude=51.5, longitude=0.0, web_url="https://east.coffee"),
+]
+
+
+@pytest.fixture()
+def ranker():
+    ranker = DistanceRanker(max_workers=1, threshold=2, max_segments=1)
+    yield ranker
+    ranker.close()
+
+
+@pytest.mark.parametrize(("max_workers", "count", "expected"), [(0, 10, False), (1, 1, False), (1, 2, True)])
+def test_should_offload(max_workers, count, expected):
+    assert DistanceRanker(max_workers=max_workers, threshold=2).should_offload(count) is expected
+
+
+async def test_measure_in_pool_matches_inline_distances(ranker):
+    expected = measure_distances(SOURCE, flatten_coordinates(COFFEE_SHOPS))
+
+    coffee_shops, distances = await ranker.measure(SOURCE, COFFEE_SHOPS, key="london")
+    assert list(coffee_shops) == COFFEE_SHOPS
+    assert distances == pytest.approx(expected)
+
+    # The second call reads the segment the first one shared, even when the request comes in another order
+    coffee_shops, distances = await ranker.measure(SOURCE, COFFEE_SHOPS[::-1], key="london")
+    assert list(coffee_shops) == COFFEE_SHOPS
+    assert distances == pytest.approx(expected)
+    assert len(ranker._segments) == 1
+
+
+async def test_measure_without_key_does_not_share_coordinates(ranker):
+    coffee_shops, distances = await ranker.measure(SOURCE, COFFEE_SHOPS)
+
+    assert coffee_shops is COFFEE_SHOPS
+    assert distances == pytest.approx(measure_distances(SOURCE, flatten_coordinates(COFFEE_SHOPS)))
+    assert not ranker._segments
+
+
+async def test_measure_replaces_segment_of_changed_city(ranker):
+    await ranker.measure(SOURCE, COFFEE_SHOPS, key="london")
+    first_segment = next(iter(ranker._segments.values()))
+
+    coffee_shops, distances = await ranker.measure(SOURCE, COFFEE_SHOPS[:2], key="london")
+
+    assert list(coffee_shops) == COFFEE_SHOPS[:2]
+    assert distances == pytest.approx(measure_distances(SOURCE, flatten_coordinates(COFFEE_SHOPS[:2])))
+    assert list(ranker._segments.values()) != [first_segment]
+    assert len(ranker._segments) == 1
+
+
+async def test_measure_shuts_broken_pool_down(ranker):
+    executor = ranker._executor = mock.Mock(spec=ProcessPoolExecutor)
+    executor.submit.side_effect = BrokenProcessPool()
+
+    coffee_shops, distances = await ranker.measure(SOURCE, COFFEE_SHOPS, key="london")
+
+    assert distances == pytest.approx(measure_distances(SOURCE, flatten_coordinates(coffee_shops)))
+    executor.shutdown.assert_called_once_with(wait=False, cancel_futures=True)
+    assert ranker._executor is None
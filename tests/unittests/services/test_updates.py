@@ -0,0 +1,54 @@
+from unittest import mock
+
+from redis.exceptions import ConnectionError
+
+from brew_scout.libs.services.updates import RecentIdsRing, UpdateDeduplicationService
+
+
+def test_recent_ids_ring_forgets_oldest_ids():
+    ring = RecentIdsRing(size=2)
+
+    for update_id in (1, 2, 3):
+        ring.add(update_id)
+
+    assert 1 not in ring
+    assert 2 in ring
+    assert 3 in ring
+
+
+async def test_release_update_allows_redelivery():
+    kv_service = mock.AsyncMock()
+    kv_service.mark_update_as_seen.return_value = True
+    service = UpdateDeduplicationService(kv_service=kv_service)
+
+    assert await service.register_update(42) is True
+    await service.release_update(42)
+
+    kv_service.forget_update.assert_awaited_once_with(42)
+    assert await service.register_update(42) is True
+
+
+async def test_register_update_skips_redis_for_recent_ids():
+    kv_service = mock.AsyncMock()
+    kv_service.mark_update_as_seen.return_value = True
+    service = UpdateDeduplicationService(kv_service=kv_service)
+
+    assert await service.register_update(42) is True
+    assert await service.register_update(42) is False
+    kv_service.mark_update_as_seen.assert_awaited_once_with(42, 3600)
+
+
+async def test_register_update_if_seen_by_another_worker():
+    kv_service = mock.AsyncMock()
+    kv_service.mark_update_as_seen.return_value = False
+    service = UpdateDeduplicationService(kv_service=kv_service)
+
+    assert await service.register_update(42) is False
+
+
+async def test_register_update_if_redis_is_down():
+    kv_service = mock.AsyncMock()
+    kv_service.mark_update_as_seen.side_effect = ConnectionError()
+    service = UpdateDeduplicationService(kv_service=kv_service)
+
+    assert await service.register_update(42) is True
@@ -0,0 +1,147 @@
+import asyncio
+from unittest import mock
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from brew_scout.libs.serializers.telegram import From
+from brew_scout.libs.services.user import UserService
+
+
+def make_user(tuid=1, username="doge", first_name="Doge"):
+    return From(
+        id=tuid, is_bot=False, first_name=first_name, last_name=None, username=username, language_code="en"
+    )
+
+
+@pytest.fixture()
+def repository():
+    return mock.AsyncMock()
+
+
+@pytest.fixture()
+def service(repository):
+    return UserService(repository=repository, flush_interval=0.01, flush_batch_size=3)
+
+
+async def test_flush_deduplicates_users(service, repository):
+    service.buffer_user(make_user(first_name="Doge"))
+    service.buffer_user(make_user(first_name="Shiba"))
+    service.buffer_user(make_user(tuid=2, username="cat"))
+    await service.flush()
+
+    (users,), _ = repository.upsert_users.await_args
+    assert [(user.username, user.first_name) for user in users] == [("doge", "Shiba"), ("cat", "Doge")]
+
+
+async def test_buffer_user_skips_unchanged_users(service, repository):
+    service.buffer_user(make_user())
+    await service.flush()
+    service.buffer_user(make_user())
+    await service.flush()
+
+    assert repository.upsert_users.await_count == 1
+
+    service.buffer_user(make_user(first_name="Shiba"))
+    await service.flush()
+
+    assert repository.upsert_users.await_count == 2
+
+
+async def test_flush_keeps_users_if_failed(service, repository):
+    repository.upsert_users.side_effect = [ConnectionError(), None]
+    service.buffer_user(make_user())
+
+    await service.flush()
+    await service.flush()
+
+    assert repository.upsert_users.await_count == 2
+
+
+async def test_users_are_flushed_periodically_and_on_close(service, repository):
+    service.start()
+    service.buffer_user(make_user())
+    await asyncio.sleep(0.05)
+
+    assert repository.upsert_users.await_count == 1
+
+    service.buffer_user(make_user(tuid=2, username="cat"))
+    await service.close()
+
+    assert repository.upsert_users.await_count == 2
+
+
+async def test_buffer_drops_oldest_users_when_full(repository):
+    service = UserService(repository=repository, max_buffered_users=2)
+
+    for tuid in range(3):
+        service.buffer_user(make_user(tuid=tuid, username=f"doge-{tuid}"))
+
+    await service.flush()
+
+    (users,), _ = repository.upsert_users.await_args
+    assert [user.tuid for user in users] == [1, 2]
+    assert service.dropped_count == 1
+
+
+async def test_failed_flush_backs_off(repository):
+    now = 100.0
+    repository.upsert_users.side_effect = ConnectionError()
+    service = UserService(repository=repository, flush_interval=0.01, flush_batch_size=1, clock=lambda: now)
+
+    service.buffer_user(make_user())
+    await service.flush()
+    service._flush_requested.clear()
+    service.buffer_user(make_user(tuid=2, username="cat"))
+
+    assert not service._flush_requested.is_set()
+
+    now += 1.0
+    service.buffer_user(make_user(tuid=3, username="fox"))
+
+    assert service._flush_requested.is_set()
+
+
+async def test_flush_gives_up_after_max_attempts(repository):
+    repository.upsert_users.side_effect = ConnectionError()
+    service = UserService(repository=repository, max_flush_attempts=2)
+    service.buffer_user(make_user())
+
+    await service.flush()
+    await service.flush()
+    await service.flush()
+
+    assert repository.upsert_users.await_count == 2
+    assert service.dropped_count == 1
+
+
+async def test_flush_isolates_rejected_user(service, repository):
+    bad_user = make_user(tuid=2, username="cat")
+
+    async def upsert_users(users):
+        if bad_user in users:
+            raise IntegrityError("INSERT", {}, Exception())
+
+    repository.upsert_users.side_effect = upsert_users
+    service.buffer_user(make_user())
+    service.buffer_user(bad_user)
+    service.buffer_user(make_user(tuid=3, username="fox"))
+
+    await service.flush()
+
+    stored = [call.args[0] for call in repository.upsert_users.await_args_list if bad_user not in call.args[0]]
+    assert sorted(user.tuid for users in stored for user in users) == [1, 3]
+    assert service.dropped_count == 1
+
+    # The stored users are not written again, the rejected one is not retried
+    await service.flush()
+    assert repository.upsert_users.await_count == 5
+
+
+async def test_users_without_username_are_keyed_like_stored_ones(service, repository):
+    service.buffer_user(make_user(username=None))
+    service.buffer_user(make_user(username="", first_name="Shiba"))
+    await service.flush()
+
+    (users,), _ = repository.upsert_users.await_args
+    assert [user.first_name for user in users] == ["Shiba"]
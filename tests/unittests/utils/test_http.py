@@ -0,0 +1,44 @@
+import datetime as dt
+
+import pytest
+from starlette.datastructures import Headers
+
+from brew_scout.libs.domains.shops import CatalogueVersion
+from brew_scout.libs.utils.http import is_not_modified, make_validator_headers
+
+
+VERSION = CatalogueVersion(rows=3, updated_at=dt.datetime(2024, 5, 19, 16, 16, 43, 200487, tzinfo=dt.UTC))
+
+
+def test_make_validator_headers():
+    assert make_validator_headers(VERSION) == {
+        "ETag": VERSION.etag,
+        "Cache-Control": "no-cache",
+        "Last-Modified": "Sun, 19 May 2024 16:16:43 GMT",
+    }
+
+
+@pytest.mark.parametrize(
+    "headers, expected",
+    (
+        ({}, False),
+        ({"if-none-match": VERSION.etag}, True),
+        ({"if-none-match": f'"stale", W/{VERSION.etag}'}, True),
+        ({"if-none-match": "*"}, True),
+        ({"if-none-match": '"stale"', "if-modified-since": "Sun, 19 May 2024 16:16:43 GMT"}, False),
+        ({"if-modified-since": "Sun, 19 May 2024 16:16:43 GMT"}, True),
+        ({"if-modified-since": "Sun, 19 May 2024 16:16:42 GMT"}, False),
+        ({"if-modified-since": "yesterday"}, False),
+    ),
+)
+def test_is_not_modified(headers, expected):
+    assert is_not_modified(Headers(headers), VERSION) is expected
+
+
+def test_every_encoding_has_own_etag():
+    gzip_etag = make_validator_headers(VERSION, "gzip")["ETag"]
+
+    assert gzip_etag == f'"3-{int(VERSION.updated_at.timestamp() * 1_000_000):x}-gzip"'
+    assert not is_not_modified(Headers({"if-none-match": VERSION.etag}), VERSION, "gzip")
+    assert not is_not_modified(Headers({"if-none-match": gzip_etag}), VERSION)
+    assert is_not_modified(Headers({"if-none-match": gzip_etag}), VERSION, "gzip")
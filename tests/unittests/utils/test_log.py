@@ -0,0 +1,63 @@
+import json
+import logging
+
+import pytest
+
+from brew_scout.libs.utils.log import JSONFormatter, QueueListenerHandler
+
+
+class ListHandler(logging.Handler):
+    def __init__(self) -> None:
+        super().__init__()
+        self.records: list[logging.LogRecord] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.records.append(record)
+
+
+def make_record(msg: str, *args: object, **extra: object) -> logging.LogRecord:
+    return logging.makeLogRecord({"name": "brew_scout", "levelno": logging.INFO, "msg": msg, "args": args, **extra})
+
+
+def test_json_formatter_adds_extra_fields():
+    formatter = JSONFormatter(fmt_keys={"logger": "name", "message": "message"})
+
+    message = json.loads(formatter.format(make_record("Shops for %s", "Porto", city="Porto", checks={1: True})))
+
+    assert message["logger"] == "brew_scout"
+    assert message["message"] == "Shops for Porto"
+    assert message["city"] == "Porto"
+    assert message["checks"] == {"1": True}
+    assert "args" not in message
+
+
+def test_json_formatter_falls_back_for_values_orjson_rejects():
+    message = json.loads(JSONFormatter().format(make_record("Big number", number=2**70)))
+
+    assert message["number"] == 2**70
+
+
+@pytest.fixture()
+def wrapped_handler():
+    return ListHandler()
+
+
+def test_queue_handler_writes_through_listener(wrapped_handler):
+    handler = QueueListenerHandler([wrapped_handler])
+    handler.handle(make_record("Shops for %s", "Porto"))
+    handler.close()
+
+    [record] = wrapped_handler.records
+    assert record.getMessage() == "Shops for Porto"
+    assert record.args is None
+
+
+def test_queue_handler_drops_records_when_queue_is_full(wrapped_handler):
+    handler = QueueListenerHandler([wrapped_handler], queue_size=1)
+    handler.listener.stop()
+
+    handler.handle(make_record("first"))
+    handler.handle(make_record("second"))
+
+    assert handler.dropped_count == 1
+    handler.close()
@@ -0,0 +1,80 @@
+import os
+import subprocess
+from functools import partial
+
+import pytest
+from prometheus_client import REGISTRY
+
+from brew_scout.libs.services.runner.retry import RetryService
+from brew_scout.libs.utils.metrics import (
+    HookStage,
+    mark_dead_processes,
+    observe_cache,
+    observe_retry,
+    observe_stage,
+    render_latest,
+)
+
+
+def get_sample(name, labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_observe_stage():
+    before = get_sample("brew_scout_hook_stage_seconds_count", {"stage": HookStage.CITY_LOOKUP})
+
+    with observe_stage(HookStage.CITY_LOOKUP):
+        pass
+
+    assert get_sample("brew_scout_hook_stage_seconds_count", {"stage": HookStage.CITY_LOOKUP}) == before + 1
+
+
+def test_observe_cache():
+    labels = {"cache": "doge", "result": "miss"}
+    before = get_sample("brew_scout_cache_requests_total", labels)
+
+    observe_cache("doge", is_hit=False)
+
+    assert get_sample("brew_scout_cache_requests_total", labels) == before + 1
+
+
+def test_observe_retry_uses_wrapped_function_name():
+    def send_message(chat_id):
+        ...
+
+    labels = {"function": send_message.__qualname__}
+    before = get_sample("brew_scout_retries_total", labels)
+
+    observe_retry(partial(send_message, chat_id=1))
+
+    assert get_sample("brew_scout_retries_total", labels) == before + 1
+    assert b"brew_scout_retries_total" in render_latest()
+
+
+async def test_retry_service_counts_only_attempts_followed_by_another():
+    async def fail_to_fetch():
+        raise ValueError
+
+    labels = {"function": fail_to_fetch.__qualname__}
+    before = get_sample("brew_scout_retries_total", labels)
+
+    with pytest.raises(ValueError):
+        await RetryService().run_with_retry(fail_to_fetch, tries=3, pause=0)
+
+    assert get_sample("brew_scout_retries_total", labels) == before + 2
+
+
+def test_mark_dead_processes_drops_live_gauges_of_dead_workers(tmp_path):
+    process = subprocess.Popen(["true"])
+    process.wait()
+    dead_file, live_file = tmp_path / f"gauge_livesum_{process.pid}.db", tmp_path / f"gauge_livesum_{os.getpid()}.db"
+    counter_file = tmp_path / f"counter_{process.pid}.db"
+
+    for path in (dead_file, live_file, counter_file):
+        path.touch()
+
+    mark_dead_processes(str(tmp_path))
+
+    assert not dead_file.exists()
+    assert live_file.exists()
+    assert counter_file.exists()
@@ -0,0 +1,35 @@
+import orjson
+import pytest
+
+from brew_scout.libs.utils.orj import iter_geojson, iter_json_array, iter_ndjson
+
+
+async def aiter_items(*items):
+    for item in items:
+        yield item
+
+
+async def collect(chunks):
+    return b"".join([chunk async for chunk in chunks])
+
+
+async def test_iter_ndjson():
+    assert await collect(iter_ndjson(aiter_items({"id": 1}, {"id": 2}))) == b'{"id":1}\n{"id":2}\n'
+
+
+@pytest.mark.parametrize("items", ((), ({"id": 1},), ({"id": 1}, {"id": 2, "name": "Birch"})))
+async def test_iter_json_array(items):
+    assert orjson.loads(await collect(iter_json_array(aiter_items(*items)))) == list(items)
+
+
+@pytest.mark.parametrize("items", ((), ({"id": 1, "name": "Birch", "latitude": 51.5, "longitude": -0.1},)))
+async def test_iter_geojson(items):
+    collection = orjson.loads(await collect(iter_geojson(aiter_items(*items))))
+
+    assert collection["type"] == "FeatureCollection"
+    assert [feature["properties"] for feature in collection["features"]] == [
+        {"id": item["id"], "name": item["name"]} for item in items
+    ]
+    assert [feature["geometry"]["coordinates"] for feature in collection["features"]] == [
+        [item["longitude"], item["latitude"]] for item in items
+    ]
@@ -0,0 +1,20 @@
+import gzip
+
+from brew_scout.libs.utils.streams import iter_buffered, iter_gzip
+
+
+async def aiter_chunks(*chunks):
+    for chunk in chunks:
+        yield chunk
+
+
+async def test_iter_buffered_joins_small_chunks():
+    chunks = [chunk async for chunk in iter_buffered(aiter_chunks(b"ab", b"cd", b"e"), size=4)]
+
+    assert chunks == [b"abcd", b"e"]
+
+
+async def test_iter_gzip_round_trip():
+    chunks = [chunk async for chunk in iter_gzip(aiter_chunks(*(b'{"id":1}\n' for _ in range(1000))))]
+
+    assert gzip.decompress(b"".join(chunks)) == b'{"id":1}\n' * 1000
@@ -0,0 +1,74 @@
+import datetime as dt
+from unittest import mock
+
+import pytest
+
+from brew_scout.libs.utils import tracing
+from brew_scout.libs.utils.tracing import TailSampler
+
+
+def make_event(duration, status="ok", spans=()):
+    started_at = dt.datetime(2024, 5, 19, tzinfo=dt.timezone.utc)
+
+    return {
+        "start_timestamp": started_at,
+        "timestamp": started_at + dt.timedelta(seconds=duration),
+        "contexts": {"trace": {"status": status}},
+        "spans": list(spans),
+    }
+
+
+@pytest.fixture()
+def sampler():
+    return TailSampler(slow_threshold=1.0, fast_sample_rate=0.1, rand=lambda: 0.5)
+
+
+def test_tail_sampler_keeps_slow_transactions(sampler):
+    event = make_event(duration=1.5)
+
+    assert sampler(event, {}) is event
+
+
+def test_tail_sampler_keeps_failed_transactions(sampler):
+    event = make_event(duration=0.1, status="internal_error")
+
+    assert sampler(event, {}) is event
+
+
+def test_tail_sampler_keeps_transactions_with_failed_spans(sampler):
+    spans = [{"op": "db", "status": "ok"}, {"op": "http.client", "status": "unavailable"}]
+    event = make_event(duration=0.1, spans=spans)
+
+    assert sampler(event, {}) is event
+
+
+def test_tail_sampler_samples_fast_transactions(sampler):
+    assert sampler(make_event(duration=0.1), {}) is None
+    assert TailSampler(1.0, 0.1, rand=lambda: 0.05)(make_event(duration=0.1), {}) is not None
+
+
+def test_tail_sampler_accepts_serialized_timestamps(sampler):
+    event = make_event(duration=2.0)
+    event["start_timestamp"], event["timestamp"] = event["start_timestamp"].isoformat(), event["timestamp"].isoformat()
+
+    assert sampler(event, {}) is event
+
+
+@pytest.mark.parametrize("with_query_spans", [False, True])
+def test_init_tracing_records_query_spans_on_demand(monkeypatch, with_query_spans):
+    from sentry_sdk.integrations.redis import RedisIntegration
+    from sentry_sdk.integrations.sqlalchemy import SqlalchemyIntegration
+
+    init = mock.Mock()
+    monkeypatch.setattr("sentry_sdk.init", init)
+    monkeypatch.setattr(tracing, "_sentry_sdk", None)
+
+    tracing.init_tracing(
+        "https://key@sentry.example.com/1", 1000, 0.1, sample_rate=0.5, with_query_spans=with_query_spans
+    )
+
+    options = init.call_args.kwargs
+    query_integrations = {RedisIntegration, SqlalchemyIntegration}
+    assert options["traces_sample_rate"] == 0.5
+    assert ({type(i) for i in options["integrations"]} >= query_integrations) is with_query_spans
+    assert ({type(i) for i in options["disabled_integrations"]} == query_integrations) is not with_query_spans